@@ -1,7 +1,9 @@
+import logging
+
+import click
 from flask import Flask, jsonify, Blueprint
 from flask_cors import CORS
-from flasgger import Swagger
-from swagger_spec import SWAGGER_SPEC
+from config import obtener_config
 from models import db, Calzado, Suela, DetalleSuela
 from controllers.calzado_controller import calzado_bp
 from controllers.suela_controller import suela_bp
@@ -12,54 +14,173 @@ from controllers.modelo_controller import modelo_bp
 from controllers.categoria_controller import categoria_bp
 from controllers.color_controller import color_bp
 from controllers.imputados_controller import imputados_bp
+from controllers.admin_controller import admin_bp
+from services.patrones import recalcular_patrones
+from services.catalogo import catalogo
+from services.similitud import indice_suelas
+from services.serializacion import ProveedorJson
+from sqlalchemy import text
+import migraciones
+
+
+def create_app(config=None):
+    # config puede ser el nombre de un perfil de config.py o un objeto de configuracion.
+    # Sin config se usa el perfil de APP_CONFIG.
+    app = Flask(__name__)
+    app.json = ProveedorJson(app)
+
+    CORS(app, origins=[
+        "http://localhost:3000",
+        "http://127.0.0.1:3000",
+        "http://localhost:5173",
+        "http://127.0.0.1:5173"
+    ], supports_credentials=True)
+
+    if config is None or isinstance(config, str):
+        config = obtener_config(config)
+    app.config.from_object(config)
+    configurar_logging(app.config["NIVEL_LOG"])
+
+    if app.config["MONTAR_SWAGGER"]:
+        montar_swagger(app)
+
+    db.init_app(app)
+
+    if app.config["INSTRUMENTAR_SQL"]:
+        from services.instrumentacion import instalar_instrumentacion
+        instalar_instrumentacion(app, app.config["UMBRAL_N1"])
+
+    if app.config["METRICAS"]:
+        from services.metricas import instalar_metricas
+        from controllers.metricas_controller import metricas_bp
+        instalar_metricas(app)
+        app.register_blueprint(metricas_bp)
+
+    if app.config["COMPRESION"]:
+        from services.compresion import instalar_compresion
+        instalar_compresion(app, app.config["COMPRESION_MINIMO"])
+
+    app.register_blueprint(calzado_bp)
+    app.register_blueprint(suela_bp)
+    app.register_blueprint(forma_bp)
+    app.register_blueprint(login_bp)
+    app.register_blueprint(marca_bp)
+    app.register_blueprint(modelo_bp)
+    app.register_blueprint(categoria_bp)
+    app.register_blueprint(color_bp)
+    app.register_blueprint(imputados_bp)
+    app.register_blueprint(admin_bp)
+
+    registrar_comandos(app)
+    return app
+
+
+def configurar_logging(nivel):
+    # Un solo formato para la app, SQLAlchemy y gunicorn; no pisa una configuracion previa
+    logging.basicConfig(
+        level=nivel,
+        format="%(asctime)s %(process)d %(levelname)s %(name)s: %(message)s"
+    )
+
+
+def montar_swagger(app):
+    # Flasgger y la especificacion (swagger_spec.py) se importan solo si se usan
+    from flasgger import Swagger
+    from swagger_spec import SWAGGER_SPEC
+
+    # Configuracion de Flasgger
+    swagger_config = {
+        "headers": [],
+        "specs": [
+            {
+                "endpoint": 'apispec_1',
+                "route": '/apispec_1.json',
+                "rule_filter": lambda rule: True,
+                "model_filter": lambda tag: True,
+            }
+        ],
+        "static_url_path": "/flasgger_static",
+        "swagger_ui": True,
+        "specs_route": "/apidocs/",
+        # diccionario SWAGGER_SPEC importado para todas las definiciones y rutas
+        **SWAGGER_SPEC
+    }
+
+    Swagger(app, config=swagger_config)
+
+    # La especificacion no cambia mientras corre el proceso: se arma una vez y se
+    # sirve ya comprimida (si la compresion esta activada)
+    if app.config["COMPRESION"]:
+        from services.compresion import servir_precomprimida
+        servir_precomprimida(app, 'flasgger.apispec_1')
+
+
+def calentar(app, conexiones=1):
+    # Deja cargado lo que la primera peticion de cada worker tendria que armar: las
+    # tablas de catalogo, el indice de suelas y `conexiones` conexiones abiertas en el pool.
+    with app.app_context():
+        catalogo.precargar()
+        indice_suelas.precargar()
+        abrir_conexiones(conexiones)
+
+
+def abrir_conexiones(cantidad):
+    # Se piden todas a la vez para que el pool abra `cantidad` conexiones distintas
+    abiertas = []
+    try:
+        for _ in range(cantidad):
+            conexion = db.engine.connect()
+            abiertas.append(conexion)
+            conexion.execute(text("SELECT 1"))
+    finally:
+        for conexion in abiertas:
+            conexion.close()
+
+
+def registrar_comandos(app):
+
+    @app.cli.command("recalcular-patrones")
+    def recalcular_patrones_command():
+        # Completa Suela.patron_bits para datos cargados antes de que existiera la columna
+        total = recalcular_patrones()
+        click.echo(f"Patrones recalculados para {total} suelas")
+
+    @app.cli.command("migrar")
+    @click.option("--hasta", type=int, default=None, help="Version hasta la que aplicar (por defecto todas)")
+    def migrar_command(hasta):
+        for nombre in migraciones.aplicar(db.engine, hasta):
+            click.echo(f"Aplicada {nombre}")
+
+    @app.cli.command("revertir-migracion")
+    @click.argument("version", type=int)
+    def revertir_migracion_command(version):
+        # Revierte las migraciones posteriores a la version indicada (0 = todas)
+        for nombre in migraciones.revertir(db.engine, version):
+            click.echo(f"Revertida {nombre}")
+
+    @app.cli.command("estado-migraciones")
+    def estado_migraciones_command():
+        for version, nombre, aplicada in migraciones.estado(db.engine):
+            click.echo(f"{'[x]' if aplicada else '[ ]'} {nombre}")
+        for diferencia in migraciones.diferencias(db.engine):
+            click.echo(diferencia)
+
+    @app.cli.command("perfil-arranque")
+    @click.option("--perfil", default=None, help="Perfil de config.py (por defecto APP_CONFIG)")
+    @click.option("--top", type=int, default=15)
+    @click.option("--presupuesto", type=int, default=None, help="Limite de arranque en ms (PRESUPUESTO_ARRANQUE_MS)")
+    def perfil_arranque_command(perfil, top, presupuesto):
+        # Tiempo de import por paquete (python -X importtime) al arrancar un worker nuevo
+        from benchmarks.importacion import PRESUPUESTO_MS, imprimir, perfil_importacion
+
+        reporte = perfil_importacion(perfil, top)
+        if not imprimir(reporte, presupuesto or PRESUPUESTO_MS):
+            raise SystemExit(1)
 
-app = Flask(__name__)
-
-CORS(app, origins=[
-    "http://localhost:3000",
-    "http://127.0.0.1:3000",
-    "http://localhost:5173",
-    "http://127.0.0.1:5173"
-], supports_credentials=True)
-
-app.config["SQLALCHEMY_DATABASE_URI"] = (
-    "mysql+mysqlconnector://root:@localhost:3306/huellasdb"
-)
-app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
-
-# Configuracion de Flasgger
-swagger_config = {
-    "headers": [],
-    "specs": [
-        {
-            "endpoint": 'apispec_1',
-            "route": '/apispec_1.json',
-            "rule_filter": lambda rule: True,
-            "model_filter": lambda tag: True,
-        }
-    ],
-    "static_url_path": "/flasgger_static",
-    "swagger_ui": True,
-    "specs_route": "/apidocs/",
-    # diccionario SWAGGER_SPEC importado para todas las definiciones y rutas
-    **SWAGGER_SPEC
-}
-
-swagger = Swagger(app, config=swagger_config)
-
-db.init_app(app)
-
-app.register_blueprint(calzado_bp)
-app.register_blueprint(suela_bp)
-app.register_blueprint(forma_bp)
-app.register_blueprint(login_bp)
-app.register_blueprint(marca_bp)
-app.register_blueprint(modelo_bp)
-app.register_blueprint(categoria_bp)
-app.register_blueprint(color_bp)
-app.register_blueprint(imputados_bp)
 
 if __name__ == "__main__":
+    # Servidor de desarrollo. En produccion: gunicorn -c gunicorn.conf.py wsgi:app
+    app = create_app()
     with app.app_context():
-        db.create_all()
-    app.run(host="0.0.0.0", debug=True)
+        migraciones.aplicar(db.engine)
+    app.run(host="0.0.0.0", debug=app.config["DEBUG"])
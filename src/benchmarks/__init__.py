@@ -0,0 +1 @@
+# Benchmarks que se corren a mano: python -m benchmarks.<modulo> --help
@@ -0,0 +1,111 @@
+import argparse
+import json
+import os
+import resource
+import sys
+import time
+
+# Mide la latencia de la primera peticion de un worker y su memoria, en tres casos:
+#   frio:     el worker importa y arma la app por su cuenta (sin preload)
+#   preload:  la app se arma en el maestro y el worker es un fork, sin calentar
+#   calentado: como preload, pero el maestro corre calentar() antes del fork
+# Usa la base de DATABASE_URL / APP_CONFIG, igual que la app.
+#
+#   python -m benchmarks.arranque --ruta /calzados/buscar?marca=nike --ruta /marcas/
+
+RUTAS_POR_DEFECTO = ['/marcas/', '/calzados/buscar?marca=a', '/calzados/1/candidatos']
+
+
+def memoria():
+    # rss y memoria privada (lo que no se comparte con el maestro) en KiB
+    datos = {'rss_max_kib': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}
+    try:
+        with open('/proc/self/smaps_rollup') as archivo:
+            for linea in archivo:
+                campo, _, valor = linea.partition(':')
+                if campo in ('Rss', 'Pss', 'Private_Clean', 'Private_Dirty'):
+                    datos[campo.lower() + '_kib'] = int(valor.split()[0])
+    except OSError:
+        pass
+    return datos
+
+
+def primeras_peticiones(app, rutas):
+    cliente = app.test_client()
+    tiempos = {}
+    for ruta in rutas:
+        inicio = time.perf_counter()
+        respuesta = cliente.get(ruta)
+        tiempos[ruta] = {
+            'ms': round((time.perf_counter() - inicio) * 1000, 2),
+            'status': respuesta.status_code
+        }
+    return tiempos
+
+
+def en_worker(funcion):
+    # Corre funcion() en un proceso hijo y devuelve su resultado
+    lectura, escritura = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(lectura)
+        try:
+            datos = json.dumps(funcion()).encode()
+        except Exception as e:
+            datos = json.dumps({'error': repr(e)}).encode()
+        with os.fdopen(escritura, 'wb') as salida:
+            salida.write(datos)
+        os._exit(0)
+
+    os.close(escritura)
+    with os.fdopen(lectura, 'rb') as entrada:
+        datos = entrada.read()
+    os.waitpid(pid, 0)
+    return json.loads(datos)
+
+
+def caso_frio(rutas):
+    def worker():
+        inicio = time.perf_counter()
+        from app import create_app
+        app = create_app()
+        arranque = round((time.perf_counter() - inicio) * 1000, 2)
+        return {'arranque_ms': arranque, 'peticiones': primeras_peticiones(app, rutas), 'memoria': memoria()}
+    return en_worker(worker)
+
+
+def caso_preload(rutas, calentar_antes):
+    def maestro():
+        from app import create_app, calentar
+        from models import db
+        app = create_app()
+        if calentar_antes:
+            calentar(app)
+            with app.app_context():
+                db.engine.dispose()
+
+        def worker():
+            with app.app_context():
+                db.engine.dispose(close=False)
+            return {'peticiones': primeras_peticiones(app, rutas), 'memoria': memoria()}
+        return en_worker(worker)
+    return en_worker(maestro)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.arranque')
+    parser.add_argument('--ruta', action='append', help='Ruta a pedir (se puede repetir)')
+    args = parser.parse_args()
+    rutas = args.ruta or RUTAS_POR_DEFECTO
+
+    resultados = {
+        'frio': caso_frio(rutas),
+        'preload': caso_preload(rutas, calentar_antes=False),
+        'calentado': caso_preload(rutas, calentar_antes=True),
+    }
+    json.dump(resultados, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == '__main__':
+    main()
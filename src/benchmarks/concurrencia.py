@@ -0,0 +1,109 @@
+import argparse
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+# Carga HTTP contra un servidor ya levantado, con concurrencia creciente. Sirve para
+# comprobar la guia de gunicorn.conf.py: las peticiones por segundo deberian crecer
+# hasta cerca de workers * threads y estabilizarse ahi, sin que suba la espera del pool.
+#
+#   python -m benchmarks.concurrencia --url http://localhost:5000 --token <JWT admin>
+
+
+def pedir(url, token):
+    pedido = urllib.request.Request(url)
+    if token:
+        pedido.add_header('Authorization', f'Bearer {token}')
+    inicio = time.perf_counter()
+    try:
+        with urllib.request.urlopen(pedido, timeout=60) as respuesta:
+            respuesta.read()
+            estado = respuesta.status
+    except urllib.error.HTTPError as e:
+        estado = e.code
+    except OSError:
+        estado = None
+    return time.perf_counter() - inicio, estado
+
+
+def percentil(valores, fraccion):
+    if not valores:
+        return 0.0
+    return valores[min(len(valores) - 1, int(len(valores) * fraccion))]
+
+
+def nivel(url, token, concurrencia, duracion):
+    fin = time.monotonic() + duracion
+    tiempos = []
+    errores = [0]
+    lock = threading.Lock()
+
+    def cliente():
+        while time.monotonic() < fin:
+            segundos, estado = pedir(url, token)
+            with lock:
+                if estado is not None and estado < 500:
+                    tiempos.append(segundos)
+                else:
+                    errores[0] += 1
+
+    inicio = time.monotonic()
+    with ThreadPoolExecutor(max_workers=concurrencia) as ejecutor:
+        for _ in range(concurrencia):
+            ejecutor.submit(cliente)
+    transcurrido = time.monotonic() - inicio
+
+    tiempos.sort()
+    return {
+        'concurrencia': concurrencia,
+        'peticiones': len(tiempos),
+        'errores': errores[0],
+        'rps': round(len(tiempos) / transcurrido, 1),
+        'p50_ms': round(percentil(tiempos, 0.50) * 1000, 2),
+        'p95_ms': round(percentil(tiempos, 0.95) * 1000, 2),
+        'media_ms': round(statistics.fmean(tiempos) * 1000, 2) if tiempos else 0.0,
+    }
+
+
+def estado_pool(base, token):
+    # Metricas del pool de un worker (el que atienda la peticion)
+    if not token:
+        return None
+    try:
+        pedido = urllib.request.Request(f'{base}/admin/pool', headers={'Authorization': f'Bearer {token}'})
+        with urllib.request.urlopen(pedido, timeout=10) as respuesta:
+            return json.load(respuesta)
+    except (OSError, ValueError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.concurrencia')
+    parser.add_argument('--url', default='http://localhost:5000')
+    parser.add_argument('--ruta', default='/calzados/buscar?marca=a')
+    parser.add_argument('--concurrencias', default='1,2,4,8,16,32')
+    parser.add_argument('--duracion', type=float, default=10.0, help='Segundos por nivel')
+    parser.add_argument('--token', help='JWT de un administrador, para leer /admin/pool')
+    args = parser.parse_args()
+
+    base = args.url.rstrip('/')
+    niveles = []
+    for concurrencia in (int(c) for c in args.concurrencias.split(',')):
+        resultado = nivel(base + args.ruta, args.token, concurrencia, args.duracion)
+        pool = estado_pool(base, args.token)
+        if pool:
+            resultado['pool_espera_p95_ms'] = pool['espera_ms']['p95']
+            resultado['pool_timeouts'] = pool['timeouts']
+        niveles.append(resultado)
+        print(json.dumps(resultado))
+
+    mejor = max(niveles, key=lambda n: n['rps'])
+    print(f"Maximo: {mejor['rps']} peticiones/s con concurrencia {mejor['concurrencia']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,279 @@
+import argparse
+import random
+import time
+
+import bcrypt
+from sqlalchemy import create_engine, func, insert, select
+
+import migraciones
+from models import (
+    Calzado, CalzadoImputado, Categoria, Color, Cuadrante, DetalleSuela, FormaGeometrica,
+    Imputado, Marca, Modelo, PatronBit, Suela, Usuario
+)
+from models.calzado import calzado_color
+from models.patron_bit import CANTIDAD_MAXIMA_BITS
+
+# Generador determinista de datos para los benchmarks: la misma semilla y cantidad
+# producen siempre las mismas filas, con los mismos ids, en SQLite o en MySQL. Las
+# filas se generan e insertan por lotes, sin tenerlas todas en memoria. El seed
+# (seed/db_seed.py) usa el mismo Generador con los catalogos reales.
+#
+#   python -m benchmarks.datos --url sqlite:////tmp/huellas_100k.db --escala 100k
+
+ESCALAS = {'1k': 1_000, '10k': 10_000, '100k': 100_000, '1m': 1_000_000}
+SEMILLA = 20240501
+TAMANO_LOTE = 5_000
+
+USUARIO_BENCHMARK = 'benchmark'
+PASSWORD_BENCHMARK = 'benchmark123'
+
+CUADRANTES = [
+    'Cuadrante Superior Izquierdo', 'Cuadrante Superior Derecho', 'Cuadrante Inferior Izquierdo',
+    'Cuadrante Inferior Derecho', 'Cuadrante Central'
+]
+# Los catalogos estan ordenados de mas a menos frecuente (ver EXPONENTES)
+FORMAS = ['Logo', 'Texto', 'Círculo', 'Rectángulo', 'Triángulo', 'Rombo', 'Pirámide']
+MARCAS = [
+    'Nike', 'Adidas', 'Topper', 'Puma', 'Reebok', 'Fila', 'New Balance', 'Converse', 'Vans',
+    'Asics', 'Le Coq Sportif', 'Diadora', 'Olympikus', 'Jaguar', 'Kappa', 'Umbro', 'Salomon',
+    'Merrell', 'Caterpillar', 'Timberland'
+]
+CATEGORIAS = ['Deportivo', 'Urbano', 'Trabajo', 'Vestir', 'Trekking', 'Botín', 'Sandalia', 'Ojota']
+COLORES = ['Negro', 'Blanco', 'Gris', 'Azul', 'Rojo', 'Verde', 'Marrón', 'Beige', 'Amarillo', 'Naranja', 'Rosa', 'Violeta']
+CANTIDAD_MODELOS = 120
+
+# Exponente de la distribucion de Zipf de cada catalogo: pocas marcas y modelos
+# concentran la mayoria de los calzados; los cuadrantes son equiprobables
+EXPONENTES = {'marca': 1.0, 'modelo': 0.8, 'categoria': 1.2, 'color': 1.0, 'forma': 0.6, 'cuadrante': 0.0}
+
+TIPOS_REGISTRO = ['indubitada_proveedor', 'dubitada', 'indubitada_comisaria']
+PESOS_TIPOS = [50, 30, 20]
+# Fraccion de dubitadas y de indubitadas de comisaria vinculadas a un imputado
+FRACCION_VINCULADA = 0.6
+
+COMISARIAS = [f'Comisaría {n}ª' for n in range(1, 31)]
+JURISDICCIONES = ['Capital', 'Norte', 'Sur', 'Este', 'Oeste', 'Centro']
+
+# Columnas de cada grupo de filas que devuelve Generador.lote, en orden de insercion
+COLUMNAS = {
+    'calzados': ('id_calzado', 'talle', 'ancho', 'alto', 'tipo_registro', 'id_marca', 'id_modelo', 'id_categoria'),
+    'colores': ('id_calzado', 'id_color'),
+    'suelas': ('id_suela', 'id_calzado', 'descripcion_general', 'patron_bits'),
+    'detalles': ('id_detalle', 'id_suela', 'id_cuadrante', 'id_forma', 'detalle_adicional'),
+    'imputados': ('id', 'nombre', 'dni', 'direccion', 'comisaria', 'jurisdiccion'),
+    'vinculos': ('calzado_id_calzado', 'imputado_id'),
+}
+
+
+# Tabla de cada grupo de filas de Generador.lote
+TABLAS = {
+    'calzados': Calzado.__table__,
+    'colores': calzado_color,
+    'suelas': Suela.__table__,
+    'detalles': DetalleSuela.__table__,
+    'imputados': Imputado.__table__,
+    'vinculos': CalzadoImputado.__table__,
+}
+
+
+class BaseNoVacia(Exception):
+    pass
+
+
+def cantidad_de_escala(escala):
+    # Acepta los nombres de ESCALAS o un numero ("2500")
+    escala = str(escala).lower()
+    if escala in ESCALAS:
+        return ESCALAS[escala]
+    return int(escala)
+
+
+def _zipf(cantidad, exponente):
+    return [1 / (k + 1) ** exponente for k in range(cantidad)]
+
+
+def asignar_bits(ids_cuadrante, ids_forma, existentes=None):
+    # Un bit por par (cuadrante, forma), igual que services/patrones.py: los pares que
+    # ya tienen bit lo conservan, los nuevos toman los bits libres mas bajos y los que
+    # no entran en CANTIDAD_MAXIMA_BITS quedan sin bit
+    bits = dict(existentes or {})
+    usados = set(bits.values())
+    libres = (bit for bit in range(CANTIDAD_MAXIMA_BITS) if bit not in usados)
+    for par in sorted((c, f) for c in ids_cuadrante for f in ids_forma):
+        if par not in bits:
+            bit = next(libres, None)
+            if bit is None:
+                break
+            bits[par] = bit
+    return bits
+
+
+class Generador:
+    # Genera calzados con sus colores, suelas, detalles e imputados. ids tiene las
+    # listas de ids de cada catalogo ('marca', 'modelo', 'categoria', 'color',
+    # 'cuadrante', 'forma') de mas a menos frecuente; bits es el mapa de PatronBit.
+    # La misma semilla y la misma secuencia de lotes dan siempre las mismas filas.
+
+    def __init__(self, ids, bits, semilla=SEMILLA):
+        self.ids = ids
+        self.bits = bits
+        self.azar = random.Random(semilla)
+        self.pesos = {clave: _zipf(len(valores), EXPONENTES[clave]) for clave, valores in ids.items()}
+        # Ultimos ids usados; el que carga en una base con datos los inicializa con los maximos
+        self.contadores = {'suela': 0, 'detalle': 0, 'imputado': 0}
+        self._restantes_imputado = 0
+
+    def _elegir(self, clave):
+        return self.azar.choices(self.ids[clave], self.pesos[clave])[0]
+
+    def lote(self, desde, hasta):
+        # Filas de los calzados con ids [desde, hasta), agrupadas como COLUMNAS
+        azar = self.azar
+        filas = {clave: [] for clave in COLUMNAS}
+
+        for id_calzado in range(desde, hasta):
+            tipo = azar.choices(TIPOS_REGISTRO, PESOS_TIPOS)[0]
+            filas['calzados'].append((
+                id_calzado,
+                str(min(46, max(34, round(azar.gauss(40.5, 2.8))))),
+                round(azar.gauss(10.2, 0.8), 2),
+                round(azar.gauss(28.0, 1.8), 2),
+                tipo,
+                self._elegir('marca'),
+                self._elegir('modelo'),
+                self._elegir('categoria'),
+            ))
+
+            cantidad_colores = min(len(self.ids['color']), azar.choices((1, 2, 3), (50, 35, 15))[0])
+            colores = set()
+            while len(colores) < cantidad_colores:
+                colores.add(self._elegir('color'))
+            filas['colores'].extend((id_calzado, id_color) for id_color in sorted(colores))
+
+            for _ in range(azar.choices((1, 2), (95, 5))[0]):
+                self.contadores['suela'] += 1
+                id_suela = self.contadores['suela']
+                patron = 0
+                for _ in range(azar.choices(range(1, 9), (6, 18, 24, 20, 14, 9, 6, 3))[0]):
+                    self.contadores['detalle'] += 1
+                    id_cuadrante = self._elegir('cuadrante')
+                    id_forma = self._elegir('forma')
+                    if (id_cuadrante, id_forma) in self.bits:
+                        patron |= 1 << self.bits[(id_cuadrante, id_forma)]
+                    filas['detalles'].append((self.contadores['detalle'], id_suela, id_cuadrante, id_forma, None))
+                filas['suelas'].append((id_suela, id_calzado, f'Suela sintética {id_suela}', patron))
+
+            # Cada imputado tiene entre 1 y 4 calzados, tomados en orden de las
+            # dubitadas y las indubitadas de comisaria
+            if tipo != 'indubitada_proveedor' and azar.random() < FRACCION_VINCULADA:
+                if self._restantes_imputado == 0:
+                    self.contadores['imputado'] += 1
+                    self._restantes_imputado = azar.choices((1, 2, 3, 4), (55, 25, 12, 8))[0]
+                    id_imputado = self.contadores['imputado']
+                    filas['imputados'].append((
+                        id_imputado,
+                        f'Imputado {id_imputado}',
+                        str(20_000_000 + id_imputado),
+                        f'Calle {azar.randint(1, 400)} N° {azar.randint(1, 5000)}',
+                        azar.choice(COMISARIAS),
+                        azar.choice(JURISDICCIONES),
+                    ))
+                self._restantes_imputado -= 1
+                filas['vinculos'].append((id_calzado, self.contadores['imputado']))
+
+        return filas
+
+
+def _catalogos():
+    return [
+        ('cuadrante', Cuadrante, 'id_cuadrante', CUADRANTES),
+        ('forma', FormaGeometrica, 'id_forma', FORMAS),
+        ('marca', Marca, 'id_marca', MARCAS),
+        ('modelo', Modelo, 'id_modelo', [f'Modelo {n:03d}' for n in range(1, CANTIDAD_MODELOS + 1)]),
+        ('categoria', Categoria, 'id_categoria', CATEGORIAS),
+        ('color', Color, 'id_color', COLORES),
+    ]
+
+
+def cargar(engine, cantidad, semilla=SEMILLA, tamano_lote=TAMANO_LOTE, progreso=None):
+    # Aplica las migraciones y carga `cantidad` calzados con sus suelas, detalles,
+    # colores e imputados. La base tiene que estar vacia (sin calzados).
+    migraciones.aplicar(engine)
+    with engine.connect() as conexion:
+        if conexion.execute(select(func.count()).select_from(Calzado.__table__)).scalar():
+            raise BaseNoVacia('La base ya tiene calzados; usar --reemplazar o una base vacía')
+
+    catalogos = _catalogos()
+    ids = {clave: list(range(1, len(nombres) + 1)) for clave, _, _, nombres in catalogos}
+    bits = asignar_bits(ids['cuadrante'], ids['forma'])
+
+    with engine.begin() as conexion:
+        for _, modelo, columna_id, nombres in catalogos:
+            conexion.execute(
+                insert(modelo.__table__),
+                [{columna_id: i, 'nombre': nombre} for i, nombre in enumerate(nombres, 1)]
+            )
+        conexion.execute(
+            insert(PatronBit.__table__),
+            [{'id_cuadrante': c, 'id_forma': f, 'bit': bit} for (c, f), bit in bits.items()]
+        )
+        existe = conexion.execute(
+            select(Usuario.id).where(Usuario.username == USUARIO_BENCHMARK)
+        ).first()
+        if not existe:
+            conexion.execute(insert(Usuario.__table__), {
+                'username': USUARIO_BENCHMARK,
+                'password_hash': bcrypt.hashpw(PASSWORD_BENCHMARK.encode(), bcrypt.gensalt()).decode('utf-8'),
+                'role': 'admin',
+            })
+
+    generador = Generador(ids, bits, semilla)
+    for desde in range(1, cantidad + 1, tamano_lote):
+        hasta = min(cantidad + 1, desde + tamano_lote)
+        filas = generador.lote(desde, hasta)
+        with engine.begin() as conexion:
+            for clave, tabla in TABLAS.items():
+                if filas[clave]:
+                    conexion.execute(insert(tabla), [dict(zip(COLUMNAS[clave], fila)) for fila in filas[clave]])
+        if progreso:
+            progreso(hasta - 1, cantidad)
+
+    return {
+        'calzados': cantidad,
+        'suelas': generador.contadores['suela'],
+        'detalles': generador.contadores['detalle'],
+        'imputados': generador.contadores['imputado'],
+    }
+
+
+def vaciar(engine):
+    # Revierte todas las migraciones (borra las tablas) y las vuelve a aplicar
+    migraciones.revertir(engine, 0)
+    migraciones.aplicar(engine)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.datos')
+    parser.add_argument('--url', required=True, help='URL de SQLAlchemy de la base a cargar')
+    parser.add_argument('--escala', default='1k', help=f"{', '.join(ESCALAS)} o una cantidad de calzados")
+    parser.add_argument('--semilla', type=int, default=SEMILLA)
+    parser.add_argument('--reemplazar', action='store_true', help='Borra las tablas existentes antes de cargar')
+    args = parser.parse_args()
+
+    engine = create_engine(args.url)
+    if args.reemplazar:
+        vaciar(engine)
+
+    inicio = time.perf_counter()
+    resumen = cargar(
+        engine, cantidad_de_escala(args.escala), args.semilla,
+        progreso=lambda hechas, total: print(f'\r{hechas}/{total} calzados', end='', flush=True)
+    )
+    print()
+    print(f"Cargados {resumen['calzados']} calzados, {resumen['suelas']} suelas, "
+          f"{resumen['detalles']} detalles y {resumen['imputados']} imputados "
+          f"en {time.perf_counter() - inicio:.1f} s")
+
+
+if __name__ == '__main__':
+    main()
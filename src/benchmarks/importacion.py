@@ -0,0 +1,109 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+# Perfil de arranque: corre `python -X importtime` en un proceso nuevo que arma la
+# app con create_app() y resume cuanto tarda cada paquete en importarse. Tambien
+# se expone como `flask perfil-arranque`.
+#
+#   python -m benchmarks.importacion --perfil produccion --presupuesto 1500
+
+DIRECTORIO_APP = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PRESUPUESTO_MS = int(os.getenv('PRESUPUESTO_ARRANQUE_MS', '1500'))
+
+_CODIGO = (
+    "import json, resource, time\n"
+    "inicio = time.perf_counter()\n"
+    "from app import create_app\n"
+    "create_app()\n"
+    "print(json.dumps({'arranque_ms': (time.perf_counter() - inicio) * 1000,"
+    " 'rss_kib': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}))\n"
+)
+
+
+def _leer_importtime(salida):
+    # Lineas "import time:  self [us] | cumulative | modulo"; la sangria del nombre
+    # indica quien lo importo. Devuelve (modulo, propio_us, acumulado_us, nivel).
+    modulos = []
+    for linea in salida.splitlines():
+        if not linea.startswith('import time:') or 'self [us]' in linea:
+            continue
+        propio, acumulado, nombre = linea[len('import time:'):].split('|')
+        nivel = (len(nombre) - len(nombre.lstrip()) - 1) // 2
+        modulos.append((nombre.strip(), int(propio), int(acumulado), nivel))
+    return modulos
+
+
+def perfil_importacion(perfil=None, top=15):
+    entorno = dict(os.environ)
+    if perfil:
+        entorno['APP_CONFIG'] = perfil
+    proceso = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', _CODIGO],
+        cwd=DIRECTORIO_APP, env=entorno, capture_output=True, text=True, check=False
+    )
+    if proceso.returncode != 0:
+        raise RuntimeError(proceso.stderr.strip().splitlines()[-1] if proceso.stderr else 'Error al arrancar la app')
+
+    modulos = _leer_importtime(proceso.stderr)
+    medido = json.loads(proceso.stdout.strip().splitlines()[-1])
+
+    por_paquete = defaultdict(int)
+    for nombre, propio, _, _ in modulos:
+        por_paquete[nombre.split('.')[0]] += propio
+
+    return {
+        'perfil': perfil or os.getenv('APP_CONFIG', 'desarrollo'),
+        'arranque_ms': round(medido['arranque_ms'], 1),
+        'imports_ms': round(sum(acumulado for _, _, acumulado, nivel in modulos if nivel == 0) / 1000, 1),
+        'rss_kib': medido['rss_kib'],
+        'modulos_importados': len(modulos),
+        'paquetes': [
+            {'paquete': paquete, 'ms': round(us / 1000, 1)}
+            for paquete, us in sorted(por_paquete.items(), key=lambda item: -item[1])[:top]
+        ],
+        'modulos': [
+            {'modulo': nombre, 'propio_ms': round(propio / 1000, 1), 'acumulado_ms': round(acumulado / 1000, 1)}
+            for nombre, propio, acumulado, _ in sorted(modulos, key=lambda m: -m[2])[:top]
+        ],
+    }
+
+
+def imprimir(reporte, presupuesto_ms, escribir=print):
+    escribir(f"Perfil {reporte['perfil']}: create_app() en {reporte['arranque_ms']} ms "
+             f"(imports {reporte['imports_ms']} ms, {reporte['modulos_importados']} modulos), "
+             f"RSS {reporte['rss_kib'] // 1024} MB")
+    escribir('Paquetes (tiempo propio de sus modulos):')
+    for fila in reporte['paquetes']:
+        escribir(f"  {fila['ms']:>8} ms  {fila['paquete']}")
+    escribir('Modulos mas lentos (acumulado):')
+    for fila in reporte['modulos']:
+        escribir(f"  {fila['acumulado_ms']:>8} ms  {fila['modulo']}")
+
+    dentro = reporte['arranque_ms'] <= presupuesto_ms
+    escribir(f"Presupuesto {presupuesto_ms} ms: {'OK' if dentro else 'EXCEDIDO'}")
+    return dentro
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.importacion')
+    parser.add_argument('--perfil', help='Perfil de config.py (por defecto APP_CONFIG)')
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--presupuesto', type=int, default=PRESUPUESTO_MS, help='Limite de arranque en ms')
+    parser.add_argument('--json', action='store_true', help='Imprime el reporte completo en JSON')
+    args = parser.parse_args()
+
+    reporte = perfil_importacion(args.perfil, args.top)
+    if args.json:
+        print(json.dumps(reporte, indent=2))
+        dentro = reporte['arranque_ms'] <= args.presupuesto
+    else:
+        dentro = imprimir(reporte, args.presupuesto)
+    sys.exit(0 if dentro else 1)
+
+
+if __name__ == '__main__':
+    main()
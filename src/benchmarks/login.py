@@ -0,0 +1,65 @@
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+from services import contrasenas
+
+# Verificaciones de contraseña por segundo con N hilos de peticion, calculando bcrypt
+# en el mismo hilo (BCRYPT_WORKERS=0) o en el pool de procesos. El login es lo unico
+# que paga este costo; /auth/refresh solo hace un sha256 y una consulta.
+#
+#   python -m benchmarks.login --hilos 1,4,8 --duracion 5
+
+
+def nivel(modo, hilos, duracion, password_hash, trabajadores):
+    contrasenas.TRABAJADORES = 0 if modo == 'inline' else trabajadores
+    # Se mide el rendimiento, no el rechazo por cola llena
+    contrasenas.MAXIMO_PENDIENTES = hilos
+    # El primer calculo arranca los procesos del pool; no se mide
+    contrasenas.verificar_password('secreto', password_hash)
+
+    fin = time.monotonic() + duracion
+    completadas = [0]
+    lock = threading.Lock()
+
+    def cliente():
+        while time.monotonic() < fin:
+            contrasenas.verificar_password('secreto', password_hash)
+            with lock:
+                completadas[0] += 1
+
+    inicio = time.monotonic()
+    with ThreadPoolExecutor(max_workers=hilos) as ejecutor:
+        for _ in range(hilos):
+            ejecutor.submit(cliente)
+    transcurrido = time.monotonic() - inicio
+
+    return {
+        'modo': modo,
+        'hilos': hilos,
+        'verificaciones': completadas[0],
+        'por_segundo': round(completadas[0] / transcurrido, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.login')
+    parser.add_argument('--hilos', default='1,4,8')
+    parser.add_argument('--duracion', type=float, default=5.0, help='Segundos por nivel')
+    parser.add_argument('--costo', type=int, default=12, help='Rondas de bcrypt (gensalt)')
+    args = parser.parse_args()
+
+    password_hash = bcrypt.hashpw(b'secreto', bcrypt.gensalt(args.costo)).decode('utf-8')
+    trabajadores = contrasenas.TRABAJADORES or 1
+
+    for modo in ('inline', 'pool'):
+        for hilos in (int(h) for h in args.hilos.split(',')):
+            print(json.dumps(nivel(modo, hilos, args.duracion, password_hash, trabajadores)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+import argparse
+import json
+import os
+import statistics
+import time
+
+from benchmarks import datos
+from benchmarks.concurrencia import percentil
+from benchmarks.suite import URL_POR_DEFECTO, preparar_base
+
+# Tiempo de codificacion y tamaño del cuerpo de un listado de calzados (el de
+# GET /calzados/) con el json de Flask, con ProveedorJson (orjson) y en MessagePack
+# (Accept: application/msgpack). Los datos salen de la misma base que benchmarks.suite.
+#
+#   python -m benchmarks.serializacion --filas 10000 --repeticiones 30
+
+
+def codificadores(app):
+    from flask.json.provider import DefaultJSONProvider
+    from services.serializacion import _decimal_como_numero, msgpack
+
+    estandar = DefaultJSONProvider(app)
+    codificadores = {
+        'json': lambda filas: estandar.dumps(filas, default=_decimal_como_numero, separators=(',', ':')).encode('utf-8'),
+        'orjson': app.json.codificar,
+    }
+    if msgpack is not None:
+        codificadores['msgpack'] = lambda filas: msgpack.packb(filas, default=_decimal_como_numero, use_bin_type=True)
+    return codificadores
+
+
+def medir(codificar, filas, repeticiones):
+    codificar(filas)
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        cuerpo = codificar(filas)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    tiempos.sort()
+    return {
+        'p50_ms': round(statistics.median(tiempos), 2),
+        'p95_ms': round(percentil(tiempos, 0.95), 2),
+        'bytes': len(cuerpo),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.serializacion')
+    parser.add_argument('--filas', type=int, default=10_000)
+    parser.add_argument('--repeticiones', type=int, default=30)
+    parser.add_argument('--escala', default='10k', help='Base de benchmarks.datos de donde salen las filas')
+    parser.add_argument('--url', default=URL_POR_DEFECTO)
+    parser.add_argument('--semilla', type=int, default=datos.SEMILLA)
+    args = parser.parse_args()
+
+    from app import create_app
+    from config import PruebasConfig
+    from controllers.calzado_controller import opciones_listado
+    from models import Calzado
+
+    url = args.url.format(escala=args.escala)
+    preparar_base(url, args.escala, args.semilla, recargar=False)
+    os.environ['DATABASE_URL'] = url
+    config = PruebasConfig()
+    config.MONTAR_SWAGGER = False
+    app = create_app(config)
+
+    with app.app_context():
+        query = Calzado.query.options(*opciones_listado()).order_by(Calzado.id_calzado)
+        filas = [c.to_dict() for c in query.limit(args.filas)]
+
+    resultados = {
+        nombre: medir(codificar, filas, args.repeticiones)
+        for nombre, codificar in codificadores(app).items()
+    }
+    base = resultados['json']
+    for resultado in resultados.values():
+        resultado['vs_json'] = round(base['p50_ms'] / resultado['p50_ms'], 2)
+        resultado['bytes_vs_json'] = round(resultado['bytes'] / base['bytes'], 2)
+
+    print(json.dumps({'filas': len(filas), 'codificadores': resultados}, indent=2, sort_keys=True))
+
+
+if __name__ == '__main__':
+    main()
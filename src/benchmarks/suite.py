@@ -0,0 +1,293 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from urllib.parse import urlencode
+
+from sqlalchemy import create_engine, delete, func, select
+
+from benchmarks import datos
+from benchmarks.concurrencia import percentil
+
+# Escenarios cronometrados contra la app en el mismo proceso (cliente de pruebas de
+# Flask, sin red), sobre una base generada con benchmarks/datos.py. Por escenario se
+# informan p50/p95/p99 y el RSS maximo mientras corria; el JSON de salida tiene
+# orden estable para poder compararlo entre versiones:
+#
+#   python -m benchmarks.suite --escalas 1k,100k --salida bench.json
+#   python -m benchmarks.suite --escalas 1k --comparar bench_anterior.json
+#
+# Por defecto cada escala usa su propia base SQLite en el directorio temporal y la
+# carga si esta vacia. Para MySQL: --url 'mysql+mysqlconnector://root:@localhost/bench_{escala}'.
+
+URL_POR_DEFECTO = 'sqlite:///' + os.path.join(tempfile.gettempdir(), 'huellas_bench_{escala}.db')
+VERSION_FORMATO = 1
+
+# parametro de /calzados/buscar -> figura buscada, en el orden en que se agregan los filtros
+FILTROS_CUADRANTES = [
+    ('figurasSuperiorIzquierdo', 'Logo'),
+    ('figurasInferiorDerecho', 'Texto'),
+    ('figurasCentral', 'Círculo'),
+    ('figurasSuperiorDerecho', 'Rectángulo'),
+    ('figurasInferiorIzquierdo', 'Logo'),
+]
+FILAS_CARGA_MASIVA = 500
+
+
+class MedidorRss:
+    # Muestrea el RSS del proceso cada `intervalo` segundos mientras corre un
+    # escenario. ru_maxrss solo da el maximo de toda la vida del proceso.
+
+    def __init__(self, intervalo=0.01):
+        self.intervalo = intervalo
+        self.maximo_kib = 0
+        self._detener = threading.Event()
+        self._hilo = None
+
+    def __enter__(self):
+        self.maximo_kib = _rss_kib()
+        self._hilo = threading.Thread(target=self._muestrear, daemon=True)
+        self._hilo.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._detener.set()
+        self._hilo.join()
+        self.maximo_kib = max(self.maximo_kib, _rss_kib())
+
+    def _muestrear(self):
+        while not self._detener.wait(self.intervalo):
+            self.maximo_kib = max(self.maximo_kib, _rss_kib())
+
+
+def _rss_kib():
+    try:
+        with open('/proc/self/status') as estado:
+            for linea in estado:
+                if linea.startswith('VmRSS:'):
+                    return int(linea.split()[1])
+    except OSError:
+        pass
+    # Sin /proc (macOS): el maximo historico del proceso
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _busqueda(cuadrantes):
+    return '/calzados/buscar?' + urlencode([(f'{param}[]', figura) for param, figura in FILTROS_CUADRANTES[:cuadrantes]])
+
+
+def _filas_carga_masiva():
+    return [
+        {'talle': str(38 + i % 8), 'ancho': 10.5, 'alto': 28.0, 'tipo_registro': 'indubitada_proveedor',
+         'id_marca': 1 + i % len(datos.MARCAS), 'id_modelo': 1 + i % datos.CANTIDAD_MODELOS,
+         'id_categoria': 1 + i % len(datos.CATEGORIAS), 'id_colores': [1 + i % len(datos.COLORES)]}
+        for i in range(FILAS_CARGA_MASIVA)
+    ]
+
+
+def escenarios():
+    # (nombre, metodo, ruta, kwargs del cliente, status esperado)
+    lista = [
+        ('listar_calzados', 'get', '/calzados/', {}, 200),
+        ('listar_calzados_pagina', 'get', '/calzados/?limit=100', {}, 200),
+    ]
+    for cuadrantes in range(1, len(FILTROS_CUADRANTES) + 1):
+        lista.append((f'buscar_{cuadrantes}_cuadrantes', 'get', _busqueda(cuadrantes), {}, 200))
+    lista += [
+        ('imputados_con_calzados', 'get', '/calzados/todos_imputados_con_calzados', {}, 200),
+        ('reporte_pdf', 'get', '/calzados/generar_reporte_pdf?marca=Topper', {}, 200),
+        ('login', 'post', '/auth/login',
+         {'json': {'username': datos.USUARIO_BENCHMARK, 'password': datos.PASSWORD_BENCHMARK}}, 200),
+        ('carga_masiva', 'post', '/calzados/bulk', {'json': _filas_carga_masiva()}, 201),
+    ]
+    return lista
+
+
+def medir(cliente, metodo, ruta, kwargs, esperado, repeticiones, calentamiento, segundos_maximos):
+    # Corre el escenario hasta `repeticiones` veces o hasta agotar `segundos_maximos`
+    # (con un minimo de 3 mediciones), despues de `calentamiento` corridas sin medir
+    for _ in range(calentamiento):
+        _pedir(cliente, metodo, ruta, kwargs, esperado)
+
+    tiempos = []
+    limite = time.monotonic() + segundos_maximos
+    with MedidorRss() as rss:
+        while len(tiempos) < repeticiones and (len(tiempos) < 3 or time.monotonic() < limite):
+            inicio = time.perf_counter()
+            _pedir(cliente, metodo, ruta, kwargs, esperado)
+            tiempos.append(time.perf_counter() - inicio)
+
+    tiempos.sort()
+    return {
+        'repeticiones': len(tiempos),
+        'p50_ms': round(percentil(tiempos, 0.50) * 1000, 2),
+        'p95_ms': round(percentil(tiempos, 0.95) * 1000, 2),
+        'p99_ms': round(percentil(tiempos, 0.99) * 1000, 2),
+        'min_ms': round(tiempos[0] * 1000, 2),
+        'max_ms': round(tiempos[-1] * 1000, 2),
+        'rss_pico_mb': round(rss.maximo_kib / 1024, 1),
+    }
+
+
+def _pedir(cliente, metodo, ruta, kwargs, esperado):
+    respuesta = getattr(cliente, metodo)(ruta, **kwargs)
+    # El cuerpo se consume completo: los PDF y las exportaciones se envian por bloques
+    respuesta.get_data()
+    respuesta.close()
+    if respuesta.status_code != esperado:
+        raise RuntimeError(f'{metodo.upper()} {ruta} respondio {respuesta.status_code}: {respuesta.get_data(as_text=True)[:200]}')
+
+
+def _deshacer_carga_masiva(engine, ultimo_id):
+    # Las filas de carga_masiva se borran para no cambiar la base entre corridas
+    from models import Calzado
+    from models.calzado import calzado_color
+
+    with engine.begin() as conexion:
+        conexion.execute(delete(calzado_color).where(calzado_color.c.id_calzado > ultimo_id))
+        conexion.execute(delete(Calzado.__table__).where(Calzado.id_calzado > ultimo_id))
+
+
+def preparar_base(url, escala, semilla, recargar):
+    engine = create_engine(url)
+    if recargar:
+        datos.vaciar(engine)
+    try:
+        resumen = datos.cargar(engine, datos.cantidad_de_escala(escala), semilla)
+        print(f"  base cargada: {resumen['calzados']} calzados, {resumen['detalles']} detalles", file=sys.stderr)
+    except datos.BaseNoVacia:
+        pass
+    return engine
+
+
+def correr_escala(url, escala, args):
+    # Corre en un proceso propio por escala: los caches de la app (catalogo, indice
+    # de suelas, tokens) son globales del proceso y el RSS queda separado
+    from app import calentar, create_app
+    from config import PruebasConfig
+    from models import Calzado, db
+    from services.cache_busqueda import cache_busqueda
+
+    engine = preparar_base(url, escala, args.semilla, args.recargar)
+    with engine.connect() as conexion:
+        ultimo_id = conexion.execute(select(func.max(Calzado.id_calzado))).scalar() or 0
+        cantidad = conexion.execute(select(func.count()).select_from(Calzado.__table__)).scalar()
+
+    os.environ['DATABASE_URL'] = url
+    config = PruebasConfig()
+    config.MONTAR_SWAGGER = False
+    app = create_app(config)
+    calentar(app)
+    # Los escenarios de busqueda repiten los mismos criterios: sin esto se mediria el cache
+    cache_busqueda.maximo = 0
+    cliente = app.test_client()
+
+    resultados = {}
+    for nombre, metodo, ruta, kwargs, esperado in escenarios():
+        if args.escenarios and nombre not in args.escenarios:
+            continue
+        print(f'  {escala} {nombre}...', file=sys.stderr)
+        try:
+            resultado = medir(cliente, metodo, ruta, kwargs, esperado,
+                              args.repeticiones, args.calentamiento, args.segundos)
+        finally:
+            if nombre == 'carga_masiva':
+                _deshacer_carga_masiva(engine, ultimo_id)
+        resultado.update(metodo=metodo.upper(), ruta=ruta)
+        resultados[nombre] = resultado
+
+    with app.app_context():
+        db.engine.dispose()
+    engine.dispose()
+    return {
+        'calzados': cantidad,
+        'base': engine.dialect.name,
+        'rss_pico_proceso_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'escenarios': resultados,
+    }
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparar(anterior, actual, escribir=print):
+    # Variacion de p50 y p95 por escenario respecto de un JSON anterior de esta suite
+    for escala, datos_escala in actual['escalas'].items():
+        previos = anterior.get('escalas', {}).get(escala, {}).get('escenarios', {})
+        for nombre, resultado in datos_escala['escenarios'].items():
+            previo = previos.get(nombre)
+            if not previo:
+                continue
+            variaciones = []
+            for clave in ('p50_ms', 'p95_ms'):
+                if previo[clave]:
+                    variaciones.append(f"{clave} {previo[clave]} -> {resultado[clave]} "
+                                       f"({(resultado[clave] - previo[clave]) * 100 / previo[clave]:+.1f} %)")
+            escribir(f"{escala:>5} {nombre:<28} " + ', '.join(variaciones))
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.suite')
+    parser.add_argument('--escalas', default='1k', help=f"Separadas por coma: {', '.join(datos.ESCALAS)} o cantidades")
+    parser.add_argument('--url', default=URL_POR_DEFECTO, help='URL de la base; {escala} se reemplaza por cada escala')
+    parser.add_argument('--escenarios', type=lambda s: s.split(','), help='Solo estos escenarios (separados por coma)')
+    parser.add_argument('--repeticiones', type=int, default=20)
+    parser.add_argument('--calentamiento', type=int, default=2)
+    parser.add_argument('--segundos', type=float, default=60.0, help='Tiempo maximo de medicion por escenario')
+    parser.add_argument('--semilla', type=int, default=datos.SEMILLA)
+    parser.add_argument('--recargar', action='store_true', help='Borra y vuelve a generar los datos')
+    parser.add_argument('--salida', help='Archivo JSON de resultados (por defecto se imprime)')
+    parser.add_argument('--comparar', help='JSON de una corrida anterior para mostrar variaciones')
+    args = parser.parse_args()
+
+    # Un solo proceso por corrida: sin pool de bcrypt, el login mide bcrypt en el hilo
+    os.environ.setdefault('BCRYPT_WORKERS', '0')
+    os.environ.setdefault('SECRET_KEY', 'benchmark')
+    os.environ.setdefault('METRICAS', 'false')
+
+    reporte = {
+        'version_formato': VERSION_FORMATO,
+        'fecha': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': _commit(),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'cpus': os.cpu_count(),
+        'semilla': args.semilla,
+        'escalas': {},
+    }
+    for escala in args.escalas.split(','):
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as ejecutor:
+            reporte['escalas'][escala] = ejecutor.submit(
+                correr_escala, args.url.format(escala=escala), escala, args
+            ).result()
+
+    texto = json.dumps(reporte, indent=2, sort_keys=True, ensure_ascii=False)
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as archivo:
+            archivo.write(texto + '\n')
+    else:
+        print(texto)
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as archivo:
+            comparar(json.load(archivo), reporte)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+URI_POR_DEFECTO = "mysql+mysqlconnector://root:@localhost:3306/huellasdb"
+
+
+def _entero(nombre, por_defecto):
+    return int(os.getenv(nombre, por_defecto))
+
+
+def _booleano(nombre, por_defecto):
+    return os.getenv(nombre, por_defecto).lower() in ('1', 'true', 'si', 'yes')
+
+
+def opciones_engine(uri, pool_size, max_overflow, pool_recycle, pool_timeout, pool_pre_ping):
+    # SQLite (desarrollo/pruebas) usa el pool que elige Flask-SQLAlchemy; con el
+    # resto se usa PoolMedido, que es un QueuePool que ademas mide la espera.
+    if uri.startswith('sqlite'):
+        return {}
+
+    from services.pool import PoolMedido
+    return {
+        'poolclass': PoolMedido,
+        'pool_size': pool_size,
+        'max_overflow': max_overflow,
+        # Menor que el wait_timeout de MySQL (28800 s por defecto) para no reutilizar
+        # conexiones que el servidor ya cerro
+        'pool_recycle': pool_recycle,
+        'pool_timeout': pool_timeout,
+        'pool_pre_ping': pool_pre_ping,
+    }
+
+
+class Config:
+    # Los valores se leen del entorno; cada perfil solo cambia los valores por defecto
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    DEBUG = False
+    TESTING = False
+
+    uri_base = URI_POR_DEFECTO
+    pool_size = '10'
+    max_overflow = '5'
+    pool_recycle = '1800'
+    pool_timeout = '10'
+    pool_pre_ping = 'true'
+    swagger = 'false'
+    instrumentar_sql = 'true'
+    umbral_n1 = '5'
+    metricas = 'true'
+    compresion = 'true'
+    nivel_log = 'INFO'
+
+    def __init__(self):
+        # /apidocs/ solo se monta si se pide: Flasgger y SWAGGER_SPEC no se importan si no
+        self.MONTAR_SWAGGER = _booleano('SWAGGER', self.swagger)
+        # Server-Timing con las consultas de cada peticion y aviso de posibles N+1
+        self.INSTRUMENTAR_SQL = _booleano('INSTRUMENTAR_SQL', self.instrumentar_sql)
+        self.UMBRAL_N1 = _entero('SQL_UMBRAL_N1', self.umbral_n1)
+        # /metrics y las metricas por peticion (services/metricas.py)
+        self.METRICAS = _booleano('METRICAS', self.metricas)
+        # gzip/brotli/zstd segun Accept-Encoding para respuestas de al menos COMPRESION_MINIMO bytes
+        self.COMPRESION = _booleano('COMPRESION', self.compresion)
+        self.COMPRESION_MINIMO = _entero('COMPRESION_MINIMO_BYTES', '1024')
+        self.NIVEL_LOG = os.getenv('LOG_LEVEL', self.nivel_log).upper()
+        self.SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', self.uri_base)
+        self.SQLALCHEMY_ENGINE_OPTIONS = opciones_engine(
+            self.SQLALCHEMY_DATABASE_URI,
+            pool_size=_entero('DB_POOL_SIZE', self.pool_size),
+            max_overflow=_entero('DB_MAX_OVERFLOW', self.max_overflow),
+            pool_recycle=_entero('DB_POOL_RECYCLE', self.pool_recycle),
+            pool_timeout=_entero('DB_POOL_TIMEOUT', self.pool_timeout),
+            pool_pre_ping=_booleano('DB_POOL_PRE_PING', self.pool_pre_ping),
+        )
+
+
+class DesarrolloConfig(Config):
+    DEBUG = True
+    nivel_log = 'DEBUG'
+    pool_size = '5'
+    swagger = 'true'
+
+
+class ProduccionConfig(Config):
+    # pool_size conviene igualarlo a los hilos por worker (ver /admin/pool)
+    pool_size = '10'
+    max_overflow = '10'
+    pool_recycle = '3600'
+
+
+class PruebasConfig(Config):
+    TESTING = True
+    uri_base = 'sqlite://'
+
+
+PERFILES = {
+    'desarrollo': DesarrolloConfig,
+    'produccion': ProduccionConfig,
+    'pruebas': PruebasConfig,
+}
+
+
+def obtener_config(nombre=None):
+    # El perfil se elige con APP_CONFIG (por defecto desarrollo)
+    nombre = nombre or os.getenv('APP_CONFIG', 'desarrollo')
+    if nombre not in PERFILES:
+        raise ValueError(f"Perfil de configuración desconocido: {nombre}. Opciones: {', '.join(PERFILES)}")
+    return PERFILES[nombre]()
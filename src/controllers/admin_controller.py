@@ -0,0 +1,17 @@
+from flask import Blueprint, g, jsonify
+
+from models import db
+from controllers.auth import token_required
+from services.pool import metricas_pool
+
+admin_bp = Blueprint('admin_bp', __name__, url_prefix='/admin')
+
+
+@admin_bp.route('/pool', methods=['GET'])
+@token_required
+def estado_pool():
+    if g.usuario["role"] != "admin":
+        return jsonify({"error": "Solo los administradores pueden ver el estado del pool"}), 403
+
+    # Las metricas son de este proceso: con varios workers cada uno tiene su pool
+    return jsonify(metricas_pool.resumen(db.engine.pool)), 200
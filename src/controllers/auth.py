@@ -1,12 +1,86 @@
 from functools import wraps
 from flask import g, request, jsonify
+from collections import OrderedDict
+import hashlib
+import threading
+import time
 import jwt
 from dotenv import load_dotenv
 import os
 
+from models import Usuario
+
 load_dotenv()
 secret_key = os.getenv("SECRET_KEY")
 
+# Cache de tokens ya verificados. Cada proceso tiene el suyo: una baja o un cambio
+# de rol hecho en otro worker se nota a lo sumo SEGUNDOS_DE_VIDA despues.
+MAXIMO_TOKENS = int(os.getenv("JWT_CACHE_MAX", "10000"))
+SEGUNDOS_DE_VIDA = int(os.getenv("JWT_CACHE_TTL", "300"))
+
+
+class CacheTokens:
+    # LRU acotado: clave = sha256 del token, valor = (vence_en, claims, usuario).
+    # Una entrada vence en el exp del token o a los SEGUNDOS_DE_VIDA, lo que ocurra antes.
+
+    def __init__(self, maximo=MAXIMO_TOKENS, segundos_de_vida=SEGUNDOS_DE_VIDA):
+        self._lock = threading.Lock()
+        self._entradas = OrderedDict()
+        self._por_usuario = {}
+        self.maximo = maximo
+        self.segundos_de_vida = segundos_de_vida
+
+    def obtener(self, clave):
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                return None
+            if entrada[0] <= time.time():
+                self._quitar(clave)
+                return None
+            self._entradas.move_to_end(clave)
+            return entrada[1], entrada[2]
+
+    def guardar(self, clave, claims, usuario):
+        vence_en = time.time() + self.segundos_de_vida
+        if "exp" in claims:
+            vence_en = min(vence_en, float(claims["exp"]))
+
+        with self._lock:
+            self._quitar(clave)
+            self._entradas[clave] = (vence_en, claims, usuario)
+            self._por_usuario.setdefault(usuario["id"], set()).add(clave)
+            while len(self._entradas) > self.maximo:
+                self._quitar(next(iter(self._entradas)))
+
+    def invalidar_usuario(self, id_usuario):
+        with self._lock:
+            for clave in list(self._por_usuario.get(id_usuario, ())):
+                self._quitar(clave)
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+            self._por_usuario.clear()
+
+    def _quitar(self, clave):
+        entrada = self._entradas.pop(clave, None)
+        if entrada is not None:
+            claves = self._por_usuario.get(entrada[2]["id"])
+            if claves is not None:
+                claves.discard(clave)
+                if not claves:
+                    del self._por_usuario[entrada[2]["id"]]
+
+
+cache_tokens = CacheTokens()
+
+
+def invalidar_usuario(id_usuario):
+    # Llamar despues de modificar o borrar un usuario
+    cache_tokens.invalidar_usuario(id_usuario)
+
+
 def token_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
@@ -19,14 +93,25 @@ def token_required(f):
         if not token:
             return jsonify({"error": "Token es requerido"}), 401
 
-        try:
-            data = jwt.decode(token, secret_key, algorithms=["HS256"])
-            g.user = data
-        except jwt.ExpiredSignatureError:
-            return jsonify({"error": "Token expirado"}), 401
-        except jwt.InvalidTokenError:
-            return jsonify({"error": "Token inválido"}), 401
+        clave = hashlib.sha256(token.encode()).digest()
+        cacheado = cache_tokens.obtener(clave)
+        if cacheado is None:
+            try:
+                data = jwt.decode(token, secret_key, algorithms=["HS256"])
+            except jwt.ExpiredSignatureError:
+                return jsonify({"error": "Token expirado"}), 401
+            except jwt.InvalidTokenError:
+                return jsonify({"error": "Token inválido"}), 401
+
+            # El usuario se lee una vez por token y queda en el cache junto a los claims
+            usuario = Usuario.query.get(data["user_id"]) if "user_id" in data else None
+            if not usuario:
+                return jsonify({"error": "Usuario no encontrado"}), 401
+
+            cacheado = (data, {"id": usuario.id, "username": usuario.username, "role": usuario.role})
+            cache_tokens.guardar(clave, *cacheado)
 
+        g.user, g.usuario = cacheado
         return f(*args, **kwargs)
 
     return decorated
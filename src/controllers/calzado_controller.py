@@ -1,42 +1,119 @@
-from flask import Blueprint, jsonify, request, send_file, make_response
-from models import db, Calzado, Marca, Modelo, Categoria, Color, FormaGeometrica, Cuadrante, Suela, DetalleSuela
+from flask import Blueprint, Response, current_app, jsonify, request, send_file, stream_with_context, url_for
+from models import db, Calzado, Suela, DetalleSuela
 from models import Imputado
 from models import CalzadoImputado
-from sqlalchemy.orm import joinedload
-import io
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import ParagraphStyle
-from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT
-from reportlab.lib import colors
-from reportlab.lib.units import inch
+from sqlalchemy.orm import joinedload, selectinload
+from services.paginacion import ParametroInvalido, iterar_por_lotes, leer_paginacion, paginar_keyset, stream_ndjson
+from services.proyeccion import leer_proyeccion
+from services.similitud import TOLERANCIA_POR_DEFECTO, indice_suelas, refrescar_indice
+from services.catalogo import IdInvalido, catalogo
+from services.busqueda import filtrar_busqueda, leer_criterios_busqueda, opciones_busqueda, resultado_busqueda
+from services.cache_busqueda import NOMBRE_CACHE, cache_busqueda, clave_busqueda
+from services.colores import ColorInexistente, asignar_colores
+from services.exportacion import FORMATOS, fila_exportacion
+from services.carga_masiva import FilaInvalida, cargar_calzados, leer_filas
+from services.reportes import generar_pdf, leer_criterios
+from services.serializacion import responder
+from services.cola_reportes import TERMINADO, ColaLlena, cola_reportes
+import math
+import os
+import tempfile
 
 calzado_bp = Blueprint('calzado_bp', __name__, url_prefix='/calzados')
 
 
-@calzado_bp.route('/', methods=['GET'])
-def get_all_calzados():
-    calzados = Calzado.query.options(
+def opciones_listado():
+    return (
         joinedload(Calzado.marca),
         joinedload(Calzado.modelo),
         joinedload(Calzado.categoria),
-        joinedload(Calzado.colores)
-    ).all()
-    resultado = []
-    for c in calzados:
-        resultado.append(c.to_dict())
-    return jsonify(resultado)
+        selectinload(Calzado.colores)
+    )
+
+
+def listar_calzados(query):
+    # ?after=&limit= pagina por id_calzado y ?stream=ndjson envia las filas por lotes.
+    # Sin esos parametros se mantiene la respuesta original con la lista completa.
+    # ?fields= y ?include= eligen que se devuelve de cada calzado (ver services/proyeccion.py).
+    try:
+        after, limit = leer_paginacion()
+        proyeccion = leer_proyeccion(request.args)
+    except ParametroInvalido as e:
+        return jsonify({'error': str(e)}), 400
+
+    query = query.options(*proyeccion.opciones(opciones_listado()))
+    serializar = proyeccion.serializar
+
+    if request.args.get('stream') == 'ndjson':
+        return stream_ndjson(query, Calzado.id_calzado, serializar, after, limit)
+
+    if limit is None:
+        calzados = query.order_by(Calzado.id_calzado).all()
+        return responder([serializar(c) for c in calzados])
+
+    return responder(paginar_keyset(query, Calzado.id_calzado, after, limit, serializar))
+
+
+@calzado_bp.route('/', methods=['GET'])
+def get_all_calzados():
+    return listar_calzados(Calzado.query)
 
 
 @calzado_bp.route('/<int:id_calzado>', methods=['GET'])
 def get_calzado(id_calzado):
-    calzado = Calzado.query.options(
+    try:
+        proyeccion = leer_proyeccion(request.args)
+    except ParametroInvalido as e:
+        return jsonify({'error': str(e)}), 400
+
+    calzado = Calzado.query.options(*proyeccion.opciones((
         joinedload(Calzado.marca),
         joinedload(Calzado.modelo),
         joinedload(Calzado.categoria),
         joinedload(Calzado.colores)
-    ).get_or_404(id_calzado)
-    return jsonify(calzado.to_dict())
+    ))).get_or_404(id_calzado)
+    return jsonify(proyeccion.serializar(calzado))
+
+
+@calzado_bp.route('/<int:id_calzado>/candidatos', methods=['GET'])
+def get_candidatos(id_calzado):
+    calzado = Calzado.query.get_or_404(id_calzado)
+    if calzado.tipo_registro != 'dubitada':
+        return jsonify({"error": "Este calzado no es dubitado"}), 400
+
+    try:
+        top = int(request.args.get('top', 10))
+        tolerancia = float(request.args.get('tolerancia', TOLERANCIA_POR_DEFECTO))
+    except ValueError:
+        return jsonify({'error': 'Los parámetros top y tolerancia deben ser numéricos'}), 400
+    if not math.isfinite(tolerancia) or tolerancia < 0:
+        return jsonify({'error': 'El parámetro tolerancia debe ser un número finito mayor o igual a 0'}), 400
+    top = max(1, min(top, 100))
+
+    pares = db.session.query(DetalleSuela.id_cuadrante, DetalleSuela.id_forma)\
+        .join(Suela, Suela.id_suela == DetalleSuela.id_suela)\
+        .filter(Suela.id_calzado == id_calzado)\
+        .all()
+    if not pares:
+        return jsonify({'error': 'El calzado no tiene detalles de suela cargados'}), 400
+
+    candidatos = indice_suelas.buscar_candidatos(
+        [tuple(par) for par in pares], calzado.ancho, calzado.alto, top, tolerancia
+    )
+
+    calzados = Calzado.query.options(
+        joinedload(Calzado.marca),
+        joinedload(Calzado.modelo),
+        joinedload(Calzado.categoria),
+        selectinload(Calzado.colores)
+    ).filter(Calzado.id_calzado.in_([c['id_calzado'] for c in candidatos])).all()
+    por_id = {c.id_calzado: c for c in calzados}
+
+    for candidato in candidatos:
+        encontrado = por_id.get(candidato['id_calzado'])
+        candidato['calzado'] = encontrado.to_dict() if encontrado else None
+
+    return jsonify({'id_calzado': id_calzado, 'candidatos': candidatos}), 200
 
 
 @calzado_bp.route('/', methods=['POST'])
@@ -45,18 +122,15 @@ def create_calzado():
         data = request.get_json()
         
         if 'id_marca' in data and data['id_marca']:
-            marca = Marca.query.get(data['id_marca'])
-            if not marca:
+            if not catalogo.existe('marca', data['id_marca']):
                 return jsonify({'error': 'Marca no encontrada'}), 400
         
         if 'id_modelo' in data and data['id_modelo']:
-            modelo = Modelo.query.get(data['id_modelo'])
-            if not modelo:
+            if not catalogo.existe('modelo', data['id_modelo']):
                 return jsonify({'error': 'Modelo no encontrado'}), 400
         
         if 'id_categoria' in data and data['id_categoria']:
-            categoria = Categoria.query.get(data['id_categoria'])
-            if not categoria:
+            if not catalogo.existe('categoria', data['id_categoria']):
                 return jsonify({'error': 'Categoría no encontrada'}), 400
 
         nuevo_calzado = Calzado(
@@ -74,33 +148,33 @@ def create_calzado():
         
         # Manejar colores si se proporcionan
         if 'id_colores' in data and data['id_colores']:
-            for color_id in data['id_colores']:
-                color = Color.query.get(color_id)
-                if color:
-                    nuevo_calzado.colores.append(color)
-                else:
-                    return jsonify({'error': f'Color con ID {color_id} no encontrado'}), 400
+            asignar_colores(nuevo_calzado.id_calzado, data['id_colores'], nuevo=True)
         
         db.session.commit()
         return jsonify({'message': 'Calzado creado exitosamente', 'calzado': nuevo_calzado.to_dict()}), 201
         
+    except (ColorInexistente, IdInvalido) as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 400
 
 
+@calzado_bp.route('/bulk', methods=['POST'])
+def create_calzados_bulk():
+    try:
+        resultado = cargar_calzados(leer_filas())
+    except FilaInvalida as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify(resultado), 201 if resultado['insertados'] else 400
+
+
 @calzado_bp.route('/getAllDubitadas', methods=['GET'])
 def get_all_dubitadas():
-    calzados = Calzado.query.options(
-        joinedload(Calzado.marca),
-        joinedload(Calzado.modelo),
-        joinedload(Calzado.categoria),
-        joinedload(Calzado.colores)
-    ).filter(Calzado.tipo_registro == 'dubitada').all()
-    resultado = []
-    for c in calzados:
-        resultado.append(c.to_dict())
-    return jsonify(resultado)
+    return listar_calzados(Calzado.query.filter(Calzado.tipo_registro == 'dubitada'))
 
 
 @calzado_bp.route('/getDubitadaById/<int:id_calzado>', methods=['GET'])
@@ -119,16 +193,9 @@ def get_dubitada_by_id(id_calzado):
 
 @calzado_bp.route('/getAllIndubitadas', methods=['GET'])
 def get_all_indubitadas():
-    calzados = Calzado.query.options(
-        joinedload(Calzado.marca),
-        joinedload(Calzado.modelo),
-        joinedload(Calzado.categoria),
-        joinedload(Calzado.colores)
-    ).filter(Calzado.tipo_registro.in_(['indubitada_proveedor', 'indubitada_comisaria'])).all()
-    resultado = []
-    for c in calzados:
-        resultado.append(c.to_dict())
-    return jsonify(resultado)
+    return listar_calzados(
+        Calzado.query.filter(Calzado.tipo_registro.in_(['indubitada_proveedor', 'indubitada_comisaria']))
+    )
 
 
 @calzado_bp.route('/getIndubitadaById/<int:id_calzado>', methods=['GET'])
@@ -162,38 +229,32 @@ def update_calzado(id_calzado):
 
         if 'id_marca' in data:
             if data['id_marca']:
-                marca = Marca.query.get(data['id_marca'])
-                if not marca:
+                if not catalogo.existe('marca', data['id_marca']):
                     return jsonify({'error': 'Marca no encontrada'}), 400
             calzado.id_marca = data['id_marca']
 
         if 'id_modelo' in data:
             if data['id_modelo']:
-                modelo = Modelo.query.get(data['id_modelo'])
-                if not modelo:
+                if not catalogo.existe('modelo', data['id_modelo']):
                     return jsonify({'error': 'Modelo no encontrado'}), 400
             calzado.id_modelo = data['id_modelo']
 
         if 'id_categoria' in data:
             if data['id_categoria']:
-                categoria = Categoria.query.get(data['id_categoria'])
-                if not categoria:
+                if not catalogo.existe('categoria', data['id_categoria']):
                     return jsonify({'error': 'Categoría no encontrada'}), 400
             calzado.id_categoria = data['id_categoria']
 
         if 'id_colores' in data:
-            calzado.colores.clear()
-            
-            for color_id in data['id_colores']:
-                color = Color.query.get(color_id)
-                if color:
-                    calzado.colores.append(color)
-                else:
-                    return jsonify({'error': f'Color con ID {color_id} no encontrado'}), 400
+            asignar_colores(id_calzado, data['id_colores'])
 
         db.session.commit()
+        refrescar_indice([id_calzado])
         return jsonify({'message': 'Calzado actualizado exitosamente', 'calzado': calzado.to_dict()}), 200
         
+    except (ColorInexistente, IdInvalido) as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 400
@@ -207,6 +268,7 @@ def delete_calzado(id_calzado):
         
         db.session.delete(calzado)
         db.session.commit()
+        refrescar_indice([id_calzado])
         return jsonify({'message': f'Calzado con id {id_calzado} eliminado correctamente'}), 200
 
     except Exception as e:
@@ -258,12 +320,7 @@ def cargar_calzado_imputado():
         
         # Manejar colores si se proporcionan
         if 'id_colores' in calzado_data and calzado_data['id_colores']:
-            for color_id in calzado_data['id_colores']:
-                color = Color.query.get(color_id)
-                if color:
-                    nuevo_calzado.colores.append(color)
-                else:
-                    return jsonify({'error': f'Color con ID {color_id} no encontrado'}), 400
+            asignar_colores(nuevo_calzado.id_calzado, calzado_data['id_colores'], nuevo=True)
 
         relacion = CalzadoImputado(
             calzado_id_calzado=nuevo_calzado.id_calzado,
@@ -279,42 +336,43 @@ def cargar_calzado_imputado():
             'calzado_id': nuevo_calzado.id_calzado
         }), 201
     
+    except ColorInexistente as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 
+def opciones_calzados_de_imputado():
+    # Cantidad fija de consultas: los calzados de todos los imputados se traen en lotes
+    # IN (selectinload) y los colores en otro lote, en lugar de una consulta por vinculo.
+    calzados = selectinload(Imputado.calzados)
+    return (
+        calzados.joinedload(Calzado.marca),
+        calzados.joinedload(Calzado.modelo),
+        calzados.joinedload(Calzado.categoria),
+        calzados.selectinload(Calzado.colores)
+    )
+
+
+def imputado_con_calzados(imputado):
+    return {
+        'imputado': imputado.to_dict(),
+        'calzados': [calzado.to_dict() for calzado in imputado.calzados]
+    }
+
+
 @calzado_bp.route('/buscar_por_dni/<dni>', methods=['GET'])
 def buscar_calzados_por_dni(dni):
     try:
 
-        imputado = Imputado.query.filter_by(dni=dni).first()
+        imputado = Imputado.query.options(*opciones_calzados_de_imputado()).filter_by(dni=dni).first()
         
         if not imputado:
             return jsonify({'error': f'No se encontró imputado con DNI: {dni}'}), 404
 
-        calzados_imputado = CalzadoImputado.query.filter_by(
-            imputado_id=imputado.id
-        ).all()
-        
-        calzados_data = []
-        for relacion in calzados_imputado:
-            calzado = Calzado.query.options(
-                joinedload(Calzado.marca),
-                joinedload(Calzado.modelo),
-                joinedload(Calzado.categoria),
-                joinedload(Calzado.colores)
-            ).get(relacion.calzado_id_calzado)
-            
-            if calzado:
-                calzados_data.append(calzado.to_dict())
-        
-        resultado = {
-            'imputado': imputado.to_dict(),
-            'calzados': calzados_data
-        }
-        
-        return jsonify(resultado), 200
+        return jsonify(imputado_con_calzados(imputado)), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -323,286 +381,171 @@ def buscar_calzados_por_dni(dni):
 @calzado_bp.route('/todos_imputados_con_calzados', methods=['GET'])
 def get_todos_imputados_con_calzados():
     try:
+        after, limit = leer_paginacion()
+    except ParametroInvalido as e:
+        return jsonify({'error': str(e)}), 400
 
-        imputados = Imputado.query.all()
-        
-        resultado = []
-        
-        for imputado in imputados:
-            calzados_imputado = CalzadoImputado.query.filter_by(
-                imputado_id=imputado.id
-            ).all()
-            
-            calzados_data = []
-            for relacion in calzados_imputado:
-                calzado = Calzado.query.options(
-                    joinedload(Calzado.marca),
-                    joinedload(Calzado.modelo),
-                    joinedload(Calzado.categoria),
-                    joinedload(Calzado.colores)
-                ).get(relacion.calzado_id_calzado)
-                
-                if calzado:
-                    calzados_data.append(calzado.to_dict())
-            
-            resultado.append({
-                'imputado': imputado.to_dict(),
-                'calzados': calzados_data
-            })
-        
-        return jsonify(resultado), 200
+    try:
+        query = Imputado.query.options(*opciones_calzados_de_imputado())
+
+        if limit is None:
+            imputados = query.order_by(Imputado.id).all()
+            return responder([imputado_con_calzados(imputado) for imputado in imputados])
+
+        return responder(paginar_keyset(query, Imputado.id, after, limit, imputado_con_calzados))
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
     
 @calzado_bp.route('/buscar', methods=['GET'])
 def buscar_calzados():
+    # Sin ?limit/?after se devuelve la lista completa como antes. Con paginacion la
+    # respuesta es {items, limit, next_cursor} y ?total=true agrega la cantidad total.
     try:
-        # Recopilar Criterios de Búsqueda
-        criterios = {
-            'categoria': request.args.get('categoria', '').strip(),
-            'marca': request.args.get('marca', '').strip(),
-            'modelo': request.args.get('modelo', '').strip(),
-            'talle': request.args.get('talle', '').strip(),
-            'figurasSuperiorIzquierdo': request.args.getlist('figurasSuperiorIzquierdo[]'),
-            'figurasSuperiorDerecho': request.args.getlist('figurasSuperiorDerecho[]'),
-            'figurasCentral': request.args.getlist('figurasCentral[]'),
-            'figurasInferiorIzquierdo': request.args.getlist('figurasInferiorIzquierdo[]'),
-            'figurasInferiorDerecho': request.args.getlist('figurasInferiorDerecho[]')
-        }
-
-        #  Construir la Consulta Base
-        query = Calzado.query.options(
-            joinedload(Calzado.marca),
-            joinedload(Calzado.modelo),
-            joinedload(Calzado.categoria),
-            joinedload(Calzado.colores),
-            joinedload(Calzado.suelas).joinedload(Suela.detalles).joinedload(DetalleSuela.cuadrante),
-            joinedload(Calzado.suelas).joinedload(Suela.detalles).joinedload(DetalleSuela.forma)
-        )
+        after, limit = leer_paginacion()
+    except ParametroInvalido as e:
+        return jsonify({'error': str(e)}), 400
 
-        #  Aplicar Filtros Condicionalmente
-        if criterios['categoria']:
-            query = query.join(Categoria).filter(Categoria.nombre.ilike(f"%{criterios['categoria']}%"))
-        
-        if criterios['marca']:
-            query = query.join(Marca).filter(Marca.nombre.ilike(f"%{criterios['marca']}%"))
-            
-        if criterios['modelo']:
-            query = query.join(Modelo).filter(Modelo.nombre.ilike(f"%{criterios['modelo']}%"))
-
-        if criterios['talle']:
-            query = query.filter(Calzado.talle.ilike(f"%{criterios['talle']}%"))
-
-        #  Filtros para figuras por cuadrante
-        cuadrantes = {
-            'figurasSuperiorIzquierdo': 'Cuadrante Superior Izquierdo',
-            'figurasSuperiorDerecho': 'Cuadrante Superior Derecho',
-            'figurasCentral': 'Cuadrante Central',
-            'figurasInferiorIzquierdo': 'Cuadrante Inferior Izquierdo',
-            'figurasInferiorDerecho': 'Cuadrante Inferior Derecho'
-        }
-
-        for param, cuadrante_nombre in cuadrantes.items():
-            figuras = criterios[param]
-            if figuras:
-                print(f"Buscando {figuras} en {cuadrante_nombre}")  # Debug
-        
-        # Verifica primero si las figuras existen
-                formas_existentes = db.session.query(FormaGeometrica.nombre)\
-                                    .filter(FormaGeometrica.nombre.in_(figuras))\
-                                    .all()
-        
-                if len(formas_existentes) != len(figuras):
-                    print(f"Advertencia: Figuras no encontradas. Buscadas: {figuras}. Encontradas: {formas_existentes}")
-                    continue
-
-        # Busca los IDs de las formas
-                formas_ids = [f.id_forma for f in db.session.query(FormaGeometrica.id_forma)
-                            .filter(FormaGeometrica.nombre.in_(figuras))
-                            .all()]
-        
-        # Filtrado con joins explícitos
-                subquery = db.session.query(Calzado.id_calzado)\
-                        .join(Suela, Calzado.id_calzado == Suela.id_calzado)\
-                        .join(DetalleSuela, Suela.id_suela == DetalleSuela.id_suela)\
-                        .filter(
-                            DetalleSuela.cuadrante.has(Cuadrante.nombre == cuadrante_nombre),
-                            DetalleSuela.id_forma.in_(formas_ids)
-                   )
-        
-                query = query.filter(Calzado.id_calzado.in_(subquery))
+    try:
+        criterios = leer_criterios_busqueda(request.args)
+        total = limit is not None and request.args.get('total', '').lower() in ('1', 'true')
+
+        # Los analistas repiten las mismas busquedas: el resultado se guarda por criterio
+        clave = clave_busqueda(criterios, after, limit, total)
+        cacheado = cache_busqueda.obtener(clave)
+        if cacheado is not None:
+            resultado, restante = cacheado
+            respuesta = responder(resultado)
+            respuesta.headers['Cache-Status'] = f'{NOMBRE_CACHE}; hit; ttl={int(restante)}'
+            return respuesta
+
+        generacion = cache_busqueda.generacion
+        filtrada = filtrar_busqueda(Calzado.query, criterios)
+        query = filtrada.options(*opciones_busqueda())
+
+        if limit is None:
+            calzados = query.order_by(Calzado.id_calzado).all()
+            resultado = [resultado_busqueda(c) for c in calzados]
+        else:
+            resultado = paginar_keyset(query, Calzado.id_calzado, after, limit, resultado_busqueda)
+            if total:
+                resultado['total'] = filtrada.order_by(None).count()
 
-        #  Ejecutar la Consulta y formatear respuesta
-        calzados = query.all()
-        
-        resultados = [{
-            "id": c.id_calzado,
-            "marca": c.marca.nombre if c.marca else None,
-            "modelo": c.modelo.nombre if c.modelo else None,
-            "categoria": c.categoria.nombre if c.categoria else None,
-            "talle": c.talle,
-            "colores": [color.nombre for color in c.colores],
-            "figuras": [
-                {
-                    "cuadrante": detalle.cuadrante.nombre,
-                    "forma": detalle.forma.nombre
-                } 
-                for suela in c.suelas 
-                for detalle in suela.detalles
-            ]
-        } for c in calzados]
-
-        # Siempre devuelve los resultados encontrados (puede ser lista vacía)
-        return jsonify(resultados), 200
+        guardado = cache_busqueda.guardar(clave, generacion, resultado)
+        respuesta = responder(resultado)
+        respuesta.headers['Cache-Status'] = f'{NOMBRE_CACHE}; fwd=miss' + ('; stored' if guardado else '')
+        return respuesta
 
     except Exception as e:
         db.session.rollback()
         return jsonify({"error": str(e)}), 500
 
 
+@calzado_bp.route('/exportar', methods=['GET'])
+def exportar_calzados():
+    formato = request.args.get('formato', 'csv').lower()
+    if formato not in FORMATOS:
+        return jsonify({'error': f'formato inválido. Valores permitidos: {", ".join(FORMATOS)}'}), 400
+
+    try:
+        criterios = leer_criterios_busqueda(request.args)
+        query = filtrar_busqueda(Calzado.query, criterios).options(*opciones_busqueda())
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
 
+    # Las filas se leen por lotes y se escriben en la respuesta a medida que se generan
+    generar, mimetype = FORMATOS[formato]
+    filas = (fila_exportacion(c) for c in iterar_por_lotes(query, Calzado.id_calzado))
+    return Response(
+        stream_with_context(generar(filas)),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename=calzados.{formato}'}
+    )
+
+
+def leer_y_borrar(ruta, tamano_bloque=64 * 1024):
+    # Envia el archivo por bloques y lo borra al terminar (o si el cliente corta)
+    try:
+        with open(ruta, 'rb') as archivo:
+            while True:
+                bloque = archivo.read(tamano_bloque)
+                if not bloque:
+                    break
+                yield bloque
+    finally:
+        os.remove(ruta)
 
 
 @calzado_bp.route('/generar_reporte_pdf', methods=['GET'])
 def generar_reporte_pdf():
     try: 
         
-        criterios_busqueda = {
-            'categoria': request.args.get('categoria'),
-            'marca': request.args.get('marca'),
-            'modelo': request.args.get('modelo'),
-            'talle': request.args.get('talle'),
-            'color': request.args.get('color')
-        }
-
-        
-        criterios_busqueda = {k: v for k, v in criterios_busqueda.items() if v is not None and v != ''}
-
-
-        query = Calzado.query.options(
-            joinedload(Calzado.marca),
-            joinedload(Calzado.modelo),
-            joinedload(Calzado.categoria),
-            joinedload(Calzado.colores)
+        criterios_busqueda = leer_criterios(request.args)
+
+        # El PDF se escribe en un archivo temporal y se envia desde disco
+        descriptor, ruta = tempfile.mkstemp(prefix='reporte_calzados_', suffix='.pdf')
+        os.close(descriptor)
+        try:
+            generar_pdf(criterios_busqueda, ruta)
+        except Exception:
+            os.remove(ruta)
+            raise
+
+        return Response(
+            leer_y_borrar(ruta),
+            mimetype='application/pdf',
+            headers={
+                'Content-Disposition': 'attachment; filename=reporte_calzados.pdf',
+                'Content-Length': str(os.path.getsize(ruta))
+            }
         )
 
-        if 'categoria' in criterios_busqueda and criterios_busqueda['categoria']:
-            query = query.join(Categoria).filter(Categoria.nombre.ilike(f"%{criterios_busqueda['categoria']}%"))
-
-        if 'marca' in criterios_busqueda and criterios_busqueda['marca']:
-            query = query.join(Marca).filter(Marca.nombre.ilike(f"%{criterios_busqueda['marca']}%"))
-
-        if 'modelo' in criterios_busqueda and criterios_busqueda['modelo']:
-            query = query.join(Modelo).filter(Modelo.nombre.ilike(f"%{criterios_busqueda['modelo']}%"))
-
-        if 'talle' in criterios_busqueda and criterios_busqueda['talle']:
-            query = query.filter(Calzado.talle.ilike(f"%{criterios_busqueda['talle']}%"))
-            
-        if 'color' in criterios_busqueda and criterios_busqueda['color']:
-            query = query.join(Calzado.colores).filter(Color.nombre.ilike(f"%{criterios_busqueda['color']}%"))
-            
-            try: 
-                talle_int = int(criterios_busqueda['talle'])
-                query = query.filter(Calzado.talle == talle_int)
-            except ValueError:
-                pass 
-
-        calzados = query.all() 
-
-
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter) 
-
-       
-        styles = {
-            'h1': ParagraphStyle(
-                name='h1',
-                fontSize=24,
-                leading=28,
-                alignment=TA_CENTER,
-                fontName='Helvetica-Bold'
-            ),
-            'h3': ParagraphStyle(
-                name='h3',
-                fontSize=18,
-                leading=20,
-                alignment=TA_CENTER,
-                fontName='Helvetica-Bold'
-            ),
-            'Normal': ParagraphStyle(
-                name='Normal',
-                fontSize=12,
-                leading=14,
-                alignment=TA_LEFT,
-                fontName='Helvetica'
-            )
-        }
-
-        story = []
-
-        
-        story.append(Paragraph("Reporte de Calzados", styles['h1']))
-        story.append(Spacer(1, 0.2 * inch))
-
-       
-        criterios_aplicados = [f"{k.capitalize()}: {v}" for k, v in criterios_busqueda.items()]
-        if criterios_aplicados:
-            story.append(Paragraph("Criterios de Búsqueda Aplicados:", styles['h3']))
-            for criterio in criterios_aplicados:
-                story.append(Paragraph(criterio, styles['Normal']))
-            story.append(Spacer(1, 0.2 * inch))
-        else:
-            story.append(Paragraph("Mostrando todos los calzados (sin filtros).", styles['Normal']))
-            story.append(Spacer(1, 0.2 * inch))
-
-       
-        if calzados:
-            data = [['ID', 'Marca', 'Modelo', 'Categoría', 'Talle', 'Alto', 'Ancho', 'Tipo Registro', 'Colores']]
-            for c in calzados:
-                colores_str = ", ".join([color.nombre for color in c.colores]) if c.colores else "N/A"
-                data.append([
-                    str(c.id_calzado),
-                    c.marca.nombre if c.marca else 'N/A',
-                    c.modelo.nombre if c.modelo else 'N/A',
-                    c.categoria.nombre if c.categoria else 'N/A',
-                    str(c.talle) if c.talle else 'N/A',
-                    str(c.alto) if c.alto else 'N/A',
-                    str(c.ancho) if c.ancho else 'N/A',
-                    c.tipo_registro if c.tipo_registro else 'N/A',
-                    colores_str
-                ])
-
-            table = Table(data)
-            table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-            story.append(table)
-        else:
-            story.append(Paragraph("No se encontraron calzados con los criterios especificados.", styles['Normal']))
-
-        doc.build(story) 
-
-        buffer.seek(0)
-
-        pdf_data = buffer.getvalue()
-        response = make_response(pdf_data)
-        response.headers['Content-Type'] = 'application/pdf'
-        response.headers['Content-Disposition'] = 'attachment; filename=reporte_calzados.pdf'
-        response.headers['Content-Length'] = len(pdf_data)
-        return response
-
     except Exception as e: 
         db.session.rollback()
-        print(f"ERROR EN generar_reporte_pdf: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        current_app.logger.exception("Error en generar_reporte_pdf")
         return jsonify({'error': f'Error al generar el PDF: {str(e)}'}), 500
 
 
+@calzado_bp.route('/reportes', methods=['POST'])
+def crear_reporte():
+    # Encola el reporte en el pool de la aplicacion y responde enseguida con el id
+    datos = request.get_json(silent=True)
+    if datos is not None and not isinstance(datos, dict):
+        return jsonify({'error': 'El cuerpo debe ser un objeto JSON con los criterios del reporte'}), 400
+    criterios_busqueda = leer_criterios(datos or request.args)
+
+    try:
+        estado = cola_reportes.encolar(current_app._get_current_object(), criterios_busqueda)
+    except ColaLlena as e:
+        return jsonify({'error': str(e)}), 503, {'Retry-After': '30'}
+
+    url = url_for('calzado_bp.estado_reporte', id_reporte=estado['id'])
+    return jsonify({'id': estado['id'], 'estado': estado['estado'], 'url': url}), 202, {'Location': url}
+
+
+@calzado_bp.route('/reportes/<id_reporte>', methods=['GET'])
+def estado_reporte(id_reporte):
+    estado = cola_reportes.estado(id_reporte)
+    if estado is None:
+        return jsonify({'error': 'Reporte no encontrado'}), 404
+
+    if estado['estado'] == TERMINADO:
+        estado['descarga'] = url_for('calzado_bp.descargar_reporte', id_reporte=id_reporte)
+    return jsonify(estado), 200
+
+
+@calzado_bp.route('/reportes/<id_reporte>/pdf', methods=['GET'])
+def descargar_reporte(id_reporte):
+    estado = cola_reportes.estado(id_reporte)
+    if estado is None:
+        return jsonify({'error': 'Reporte no encontrado'}), 404
+    if estado['estado'] != TERMINADO:
+        return jsonify({'error': 'El reporte todavía no está listo', 'estado': estado['estado']}), 409
+
+    return send_file(
+        cola_reportes.ruta_pdf(id_reporte),
+        mimetype='application/pdf',
+        as_attachment=True,
+        download_name='reporte_calzados.pdf'
+    )
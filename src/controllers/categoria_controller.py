@@ -1,19 +1,18 @@
 from flask import Blueprint, jsonify, request
 from models import db, Categoria
+from services.catalogo import catalogo, respuesta_listado, respuesta_por_id
 
 categoria_bp = Blueprint('categoria_bp', __name__, url_prefix='/categorias')
 
 
 @categoria_bp.route('/', methods=['GET'])
 def get_all_categorias():
-    categorias = Categoria.query.all()
-    return jsonify([categoria.to_dict() for categoria in categorias])
+    return respuesta_listado('categoria')
 
 
 @categoria_bp.route('/<int:id_categoria>', methods=['GET'])
 def get_categoria(id_categoria):
-    categoria = Categoria.query.get_or_404(id_categoria)
-    return jsonify(categoria.to_dict())
+    return respuesta_por_id('categoria', id_categoria)
 
 
 @categoria_bp.route('/', methods=['POST'])
@@ -35,6 +34,7 @@ def create_categoria():
         nueva_categoria = Categoria(nombre=data['nombre'].strip())
         db.session.add(nueva_categoria)
         db.session.commit()
+        catalogo.invalidar('categoria')
         
         return jsonify({'message': 'Categoría creada exitosamente', 'categoria': nueva_categoria.to_dict()}), 201
         
@@ -63,6 +63,7 @@ def update_categoria(id_categoria):
         
         categoria.nombre = data['nombre'].strip()
         db.session.commit()
+        catalogo.invalidar('categoria')
         
         return jsonify({'message': 'Categoría actualizada exitosamente', 'categoria': categoria.to_dict()}), 200
         
@@ -81,6 +82,7 @@ def delete_categoria(id_categoria):
         
         db.session.delete(categoria)
         db.session.commit()
+        catalogo.invalidar('categoria')
         
         return jsonify({'message': 'Categoría eliminada exitosamente'}), 200
         
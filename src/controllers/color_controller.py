@@ -1,19 +1,18 @@
 from flask import Blueprint, jsonify, request
 from models import db, Color
+from services.catalogo import catalogo, respuesta_listado, respuesta_por_id
 
 color_bp = Blueprint('color_bp', __name__, url_prefix='/colores')
 
 
 @color_bp.route('/', methods=['GET'])
 def get_all_colores():
-    colores = Color.query.all()
-    return jsonify([color.to_dict() for color in colores])
+    return respuesta_listado('color')
 
 
 @color_bp.route('/<int:id_color>', methods=['GET'])
 def get_color(id_color):
-    color = Color.query.get_or_404(id_color)
-    return jsonify(color.to_dict())
+    return respuesta_por_id('color', id_color)
 
 
 @color_bp.route('/', methods=['POST'])
@@ -35,6 +34,7 @@ def create_color():
         nuevo_color = Color(nombre=data['nombre'].strip())
         db.session.add(nuevo_color)
         db.session.commit()
+        catalogo.invalidar('color')
         
         return jsonify({'message': 'Color creado exitosamente', 'color': nuevo_color.to_dict()}), 201
         
@@ -63,6 +63,7 @@ def update_color(id_color):
         
         color.nombre = data['nombre'].strip()
         db.session.commit()
+        catalogo.invalidar('color')
         
         return jsonify({'message': 'Color actualizado exitosamente', 'color': color.to_dict()}), 200
         
@@ -81,6 +82,7 @@ def delete_color(id_color):
         
         db.session.delete(color)
         db.session.commit()
+        catalogo.invalidar('color')
         
         return jsonify({'message': 'Color eliminado exitosamente'}), 200
         
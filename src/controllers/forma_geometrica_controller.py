@@ -1,13 +1,14 @@
 from flask import Blueprint, jsonify, request
 from models import db, FormaGeometrica, DetalleSuela
+from services.patrones import olvidar_forma
+from services.catalogo import catalogo, respuesta_listado, respuesta_por_id
 
 forma_bp = Blueprint("forma_bp", __name__, url_prefix="/formas")
 
 
 @forma_bp.route("/", methods=["GET"])
 def get_all_formas():
-    formas = FormaGeometrica.query.all()
-    return jsonify([forma.to_dict() for forma in formas])
+    return respuesta_listado('forma')
 
 
 @forma_bp.route("/", methods=["POST"])
@@ -29,6 +30,7 @@ def create_forma():
         nueva_forma = FormaGeometrica(nombre=data['nombre'].strip())
         db.session.add(nueva_forma)
         db.session.commit()
+        catalogo.invalidar('forma')
 
         return jsonify({"message": "Forma geométrica creada exitosamente", "forma": nueva_forma.to_dict()}), 201
         
@@ -57,6 +59,7 @@ def update_forma(id_forma):
 
         forma.nombre = data['nombre'].strip()
         db.session.commit()
+        catalogo.invalidar('forma')
 
         return jsonify({"message": "Forma geométrica actualizada exitosamente", "forma": forma.to_dict()}), 200
         
@@ -67,8 +70,7 @@ def update_forma(id_forma):
 
 @forma_bp.route("/<int:id_forma>", methods=["GET"])
 def get_forma_by_id(id_forma):
-    forma = FormaGeometrica.query.get_or_404(id_forma)
-    return jsonify(forma.to_dict())
+    return respuesta_por_id('forma', id_forma)
 
 
 @forma_bp.route("/<int:id_forma>", methods=["DELETE"])
@@ -80,8 +82,10 @@ def delete_forma(id_forma):
         if detalles:
             return jsonify({'error': 'No se puede eliminar la forma geométrica porque está siendo utilizada en detalles de suela'}), 400
         
+        olvidar_forma(id_forma)
         db.session.delete(forma)
         db.session.commit()
+        catalogo.invalidar('forma')
         
         return jsonify({"message": "Forma geométrica eliminada exitosamente"}), 200
         
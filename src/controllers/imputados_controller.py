@@ -1,12 +1,13 @@
 from flask import Blueprint, jsonify, request
 from models import db, Imputado
+from services.serializacion import responder
 
 imputados_bp = Blueprint('imputados_bp', __name__, url_prefix='/imputados')
 
 @imputados_bp.route('/', methods=['GET'])
 def get_all_imputados():
     imputados = Imputado.query.all()
-    return jsonify([imputado.to_dict() for imputado in imputados])
+    return responder([imputado.to_dict() for imputado in imputados])
 
 @imputados_bp.route('/<int:id_imputado>', methods=['GET'])
 def get_imputado(id_imputado):
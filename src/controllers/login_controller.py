@@ -1,10 +1,11 @@
 import datetime
 import jwt
-import bcrypt
-from flask import Blueprint, Response, g, json, jsonify, request
+from flask import Blueprint, Response, current_app, g, json, jsonify, request
 from flask_cors import CORS
 from models import db, Usuario
-from controllers.auth import token_required
+from controllers.auth import invalidar_usuario, token_required
+from services.contrasenas import BcryptSaturado, hashear_password, verificar_password
+from services.sesiones import RefreshInvalido, borrar_de_usuario, emitir_refresh, revocar_de_usuario, rotar_refresh
 from dotenv import load_dotenv
 import os
 from pathlib import Path # Importa Path para manejo de rutas de archivos.
@@ -20,6 +21,27 @@ login_bp = Blueprint('login_bp', __name__)
 CORS(login_bp, origins=["http://localhost:3000", "http://127.0.0.1:3000"], supports_credentials=True)
 
 
+def emitir_token(usuario):
+    payload = {
+        "user_id": usuario.id,
+        "username": usuario.username,
+        "exp": datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(hours=1)  # token válido 1 hora
+    }
+
+    token = jwt.encode(payload, secret_key, algorithm="HS256")
+    # Si el token es bytes, lo decodifica a una cadena UTF-8.
+    if isinstance(token, bytes):
+        token = token.decode("utf-8")
+    return token
+
+
+def respuesta_saturado(e):
+    respuesta = jsonify({"error": str(e)})
+    respuesta.status_code = 503
+    respuesta.headers["Retry-After"] = "1"
+    return respuesta
+
+
 @login_bp.route("/auth/login", methods=["POST", "OPTIONS"])
 def login():
     if request.method == "OPTIONS":
@@ -37,31 +59,57 @@ def login():
         
         usuario = Usuario.query.filter_by(username=username).first()
         
-        if not usuario or not bcrypt.checkpw(password.encode(), usuario.password_hash.encode()):
+        if not usuario or not verificar_password(password, usuario.password_hash):
             return jsonify({"error": "Credenciales incorrectas"}), 401
-        
-        payload = {
-            "user_id": usuario.id,
-            "username": usuario.username,
-            "exp": datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(hours=1)
-        }
 
-        token = jwt.encode(payload, secret_key, algorithm="HS256")
-        # Si el token es bytes, lo decodifica a una cadena UTF-8.
-        if isinstance(token, bytes):
-            token = token.decode("utf-8")
+        token = emitir_token(usuario)
+        refresh_token = emitir_refresh(usuario.id)
+        db.session.commit()
 
         return jsonify({
             "success": True,
             "message": "Inicio válido",
             "token": token,
+            "refresh_token": refresh_token,
             "user": {"id": usuario.id, "username": usuario.username, "role": usuario.role}
         }), 200
 
+    except BcryptSaturado as e:
+        return respuesta_saturado(e)
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.exception("Error en login")
+        return jsonify({"error": "Error interno del servidor"}), 500
+
+
+@login_bp.route("/auth/refresh", methods=["POST"])
+def refresh():
+    # Cambia un refresh token por un access token nuevo y otro refresh token (el
+    # recibido queda revocado). No usa bcrypt.
+    data = request.get_json(silent=True) or {}
+    refresh_token = data.get("refresh_token")
+    if not refresh_token:
+        return jsonify({"error": "El refresh_token es obligatorio"}), 400
+
+    try:
+        id_usuario, nuevo_refresh = rotar_refresh(refresh_token)
+        usuario = Usuario.query.get(id_usuario)
+        if not usuario:
+            # No se guarda el refresh token que rotar_refresh acaba de emitir
+            db.session.rollback()
+            return jsonify({"error": "Usuario no encontrado"}), 401
+        token = emitir_token(usuario)
+        db.session.commit()
+    except RefreshInvalido as e:
+        # Se confirma la revocacion de la familia si hubo reutilizacion
+        db.session.commit()
+        return jsonify({"error": str(e)}), 401
     except Exception as e:
-        print("Error en login:", e)
+        db.session.rollback()
         return jsonify({"error": "Error interno del servidor"}), 500
 
+    return jsonify({"token": token, "refresh_token": nuevo_refresh}), 200
+
     
 @login_bp.route("/usuarios", methods = ["POST"])
 def create_user():
@@ -81,14 +129,12 @@ def create_user():
         if len(password) < 6:
             return jsonify({"error": "La contraseña debe tener al menos 6 caracteres"}), 400
         
-        password_hash = bcrypt.hashpw(password.encode(), bcrypt.gensalt())
-
         if Usuario.query.filter_by(username=username).first():
             return jsonify({"error": "El usuario ya existe"}), 400
 
         nuevo_usuario = Usuario(
             username=username,
-            password_hash=password_hash.decode('utf-8'),  # guardamos como string
+            password_hash=hashear_password(password),
             role=role
         )
 
@@ -96,33 +142,28 @@ def create_user():
         db.session.commit()
 
         return jsonify({"message": "Usuario creado exitosamente"}), 201
+    except BcryptSaturado as e:
+        return respuesta_saturado(e)
     except Exception as e:
         db.session.rollback()
-        print(f"Error al crear usuario: {str(e)}")
+        current_app.logger.exception("Error al crear usuario")
         return jsonify({"error": f"Error interno del servidor: {str(e)}"}), 500
 
 @login_bp.route("/me", methods=["GET"])
+@token_required
 def obtener_usuario_actual():
-    usuario = Usuario.query.get(g.user["user_id"])
-    if not usuario:
-        return jsonify({"error": "Usuario no encontrado"}), 404
-
-    return jsonify({
-        "id": usuario.id,
-        "username": usuario.username,
-        "role": usuario.role
-    }), 200
+    # token_required ya dejo el usuario (id, username, role) en g.usuario
+    return jsonify(g.usuario), 200
 
 @login_bp.route("/usuarios/<int:user_id>", methods=["PATCH"])
+@token_required
 def actualizar_usuario(user_id):
     try:
         data = request.get_json()
         
-        current_user = Usuario.query.get(g.user["user_id"])
-        if not current_user:
-            return jsonify({"error": "Usuario actual no encontrado"}), 404
+        current_user = g.usuario
         
-        if current_user.id != user_id and current_user.role != "admin":
+        if current_user["id"] != user_id and current_user["role"] != "admin":
             return jsonify({"error": "No tienes permisos para actualizar este usuario"}), 403
         
         usuario = Usuario.query.get(user_id)
@@ -133,7 +174,7 @@ def actualizar_usuario(user_id):
         new_password = data.get("password")
         new_role = data.get("role")
 
-        if new_role and current_user.role != "admin":
+        if new_role and current_user["role"] != "admin":
             return jsonify({"error": "Solo los administradores pueden cambiar roles"}), 403
         
         if new_role:
@@ -149,7 +190,9 @@ def actualizar_usuario(user_id):
         if new_password:
             if len(new_password) < 6:
                 return jsonify({"error": "La contraseña debe tener al menos 6 caracteres"}), 400
-            usuario.password_hash = bcrypt.hashpw(new_password.encode(), bcrypt.gensalt()).decode('utf-8')
+            usuario.password_hash = hashear_password(new_password)
+            # Cambiar la contraseña cierra las sesiones abiertas con refresh token
+            revocar_de_usuario(usuario.id)
         
         if new_role:
             usuario.role = new_role
@@ -158,18 +201,14 @@ def actualizar_usuario(user_id):
             return jsonify({"error": "No se dieron datos para actualizar"}), 400
 
         db.session.commit()
+        invalidar_usuario(usuario.id)
 
-        new_payload = {
-            "user_id": usuario.id,
-            "username": usuario.username,
-            "exp": datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(hours=1)  # token válido 1 hora
-        }
-
-        new_token = jwt.encode(new_payload, secret_key, algorithm="HS256")
-        if isinstance(new_token, bytes):
-            new_token = new_token.decode("utf-8")
+        new_token = emitir_token(usuario)
             
         return jsonify({"message": "Usuario actualizado exitosamente", "new_token": new_token}), 200
+    except BcryptSaturado as e:
+        db.session.rollback()
+        return respuesta_saturado(e)
     except Exception as e:
         db.session.rollback()
         return jsonify({"error": "Error interno del servidor"}), 500
@@ -195,8 +234,10 @@ def delete_user_by_id(id):
     if not usuario:
         return jsonify({"error": "Usuario no encontrado"}), 404
     
+    borrar_de_usuario(id)
     db.session.delete(usuario)
     db.session.commit()
+    invalidar_usuario(id)
 
     return jsonify({"message": "Usuario eliminado exitosamente"}), 200
 
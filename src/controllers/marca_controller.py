@@ -1,19 +1,18 @@
 from flask import Blueprint, jsonify, request
 from models import db, Marca
+from services.catalogo import catalogo, respuesta_listado, respuesta_por_id
 
 marca_bp = Blueprint('marca_bp', __name__, url_prefix='/marcas')
 
 
 @marca_bp.route('/', methods=['GET'])
 def get_all_marcas():
-    marcas = Marca.query.all()
-    return jsonify([marca.to_dict() for marca in marcas])
+    return respuesta_listado('marca')
 
 
 @marca_bp.route('/<int:id_marca>', methods=['GET'])
 def get_marca(id_marca):
-    marca = Marca.query.get_or_404(id_marca)
-    return jsonify(marca.to_dict())
+    return respuesta_por_id('marca', id_marca)
 
 
 @marca_bp.route('/', methods=['POST'])
@@ -35,6 +34,7 @@ def create_marca():
         nueva_marca = Marca(nombre=data['nombre'].strip())
         db.session.add(nueva_marca)
         db.session.commit()
+        catalogo.invalidar('marca')
         
         return jsonify({'message': 'Marca creada exitosamente', 'marca': nueva_marca.to_dict()}), 201
         
@@ -63,6 +63,7 @@ def update_marca(id_marca):
         
         marca.nombre = data['nombre'].strip()
         db.session.commit()
+        catalogo.invalidar('marca')
         
         return jsonify({'message': 'Marca actualizada exitosamente', 'marca': marca.to_dict()}), 200
         
@@ -81,6 +82,7 @@ def delete_marca(id_marca):
         
         db.session.delete(marca)
         db.session.commit()
+        catalogo.invalidar('marca')
         
         return jsonify({'message': 'Marca eliminada exitosamente'}), 200
         
@@ -0,0 +1,13 @@
+from flask import Blueprint, Response
+
+from services.metricas import exponer
+
+metricas_bp = Blueprint('metricas_bp', __name__)
+
+
+@metricas_bp.route('/metrics', methods=['GET'])
+def metricas():
+    # Formato de texto de Prometheus. Con varios workers suma los valores de todos.
+    # No pide token: el scraper no lo tiene; restringir el acceso en el proxy.
+    contenido, tipo = exponer()
+    return Response(contenido, content_type=tipo)
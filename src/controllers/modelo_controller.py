@@ -1,19 +1,18 @@
 from flask import Blueprint, jsonify, request
 from models import db, Modelo
+from services.catalogo import catalogo, respuesta_listado, respuesta_por_id
 
 modelo_bp = Blueprint('modelo_bp', __name__, url_prefix='/modelos')
 
 
 @modelo_bp.route('/', methods=['GET'])
 def get_all_modelos():
-    modelos = Modelo.query.all()
-    return jsonify([modelo.to_dict() for modelo in modelos])
+    return respuesta_listado('modelo')
 
 
 @modelo_bp.route('/<int:id_modelo>', methods=['GET'])
 def get_modelo(id_modelo):
-    modelo = Modelo.query.get_or_404(id_modelo)
-    return jsonify(modelo.to_dict())
+    return respuesta_por_id('modelo', id_modelo)
 
 
 @modelo_bp.route('/', methods=['POST'])
@@ -35,6 +34,7 @@ def create_modelo():
         nuevo_modelo = Modelo(nombre=data['nombre'].strip())
         db.session.add(nuevo_modelo)
         db.session.commit()
+        catalogo.invalidar('modelo')
         
         return jsonify({'message': 'Modelo creado exitosamente', 'modelo': nuevo_modelo.to_dict()}), 201
         
@@ -63,6 +63,7 @@ def update_modelo(id_modelo):
         
         modelo.nombre = data['nombre'].strip()
         db.session.commit()
+        catalogo.invalidar('modelo')
         
         return jsonify({'message': 'Modelo actualizado exitosamente', 'modelo': modelo.to_dict()}), 200
         
@@ -81,6 +82,7 @@ def delete_modelo(id_modelo):
         
         db.session.delete(modelo)
         db.session.commit()
+        catalogo.invalidar('modelo')
         
         return jsonify({'message': 'Modelo eliminado exitosamente'}), 200
         
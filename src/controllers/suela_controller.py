@@ -1,5 +1,8 @@
 from flask import Blueprint, jsonify, request
 from models import db, Suela, DetalleSuela
+from services.similitud import refrescar_indice
+from services.patrones import calcular_patron
+from services.serializacion import responder
 
 suela_bp = Blueprint("suela_bp", __name__, url_prefix="/suelas")
 
@@ -30,8 +33,13 @@ def create_suela():
                 "id_forma": nuevo_detalle.id_forma,
                 "detalle_adicional": nuevo_detalle.detalle_adicional
             })
+
+        nueva_suela.patron_bits = calcular_patron(
+            (d["id_cuadrante"], d["id_forma"]) for d in detalles
+        )
             
         db.session.commit()
+        refrescar_indice([nueva_suela.id_calzado])
         
         return jsonify({
             "msg": "Suela creada exitosamente",
@@ -72,7 +80,7 @@ def get_all_suelas():
     try:
         suelas = Suela.query.all()
         suelas_list = [suela.to_dict() for suela in suelas]
-        return jsonify(suelas_list), 200
+        return responder(suelas_list)
     except Exception as e:
         return jsonify({"message": "Error al obtener todas las suelas", "error": str(e)}), 500
 
@@ -89,6 +97,8 @@ def update_suela(id_suela):
         if not data:
             return jsonify({"message": "No se recibieron datos JSON para la actualizacion"}), 400
 
+        id_calzado_anterior = suela.id_calzado
+
         if "id_calzado" in data:
             from models.calzado import Calzado
             if Calzado.query.get(data["id_calzado"]) is None:
@@ -99,6 +109,7 @@ def update_suela(id_suela):
             suela.descripcion_general = data["descripcion_general"]
 
         db.session.commit()
+        refrescar_indice([id_calzado_anterior, suela.id_calzado])
 
         return jsonify({
             "message": "Suela actualizada exitosamente",
@@ -118,8 +129,10 @@ def delete_suela(id_suela):
         if suela is None:
             return jsonify({"message": "Suela no encontrada"}), 404
         
+        id_calzado = suela.id_calzado
         db.session.delete(suela)
         db.session.commit()
+        refrescar_indice([id_calzado])
         
         return jsonify({"message": "Suela eliminada exitosamente"}), 200
     
@@ -138,6 +151,8 @@ def partial_update_suela(id_suela):
         if not data:
             return jsonify({"message": "No se recibieron datos JSON para la actualización"}), 400
 
+        id_calzado_anterior = suela.id_calzado
+
         if "id_calzado" in data:
             from models.calzado import Calzado
             if Calzado.query.get(data["id_calzado"]) is None:
@@ -163,8 +178,12 @@ def partial_update_suela(id_suela):
                     "id_forma": nuevo_detalle.id_forma,
                     "detalle_adicional": nuevo_detalle.detalle_adicional
                 })
+            suela.patron_bits = calcular_patron(
+                (d["id_cuadrante"], d["id_forma"]) for d in detalles
+            )
 
         db.session.commit()
+        refrescar_indice([id_calzado_anterior, suela.id_calzado])
 
         return jsonify({
             "message": "Suela actualizada parcialmente con éxito",
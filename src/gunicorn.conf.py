@@ -0,0 +1,78 @@
+import glob
+import multiprocessing
+import os
+
+# gunicorn -c gunicorn.conf.py wsgi:app
+#
+# Guia de dimensionamiento
+# ------------------------
+# - workers: uno por nucleo. bcrypt, reportlab, numpy y el armado de JSON usan CPU
+#   y el GIL no deja que dos hilos de un mismo proceso la compartan.
+# - threads: cubren la espera de MySQL dentro de cada worker. Con 4 hilos un worker
+#   suele llegar al limite de CPU antes que al de la base; subir solo si
+#   benchmarks/concurrencia.py muestra CPU libre con latencias que crecen.
+# - DB_POOL_SIZE: hilos + REPORTES_WORKERS, porque cada hilo usa como maximo una
+#   conexion por peticion y los reportes en segundo plano usan el mismo pool.
+#   DB_MAX_OVERFLOW chico (2-5) para absorber picos sin agotar MySQL.
+# - MySQL max_connections >= workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) + margen
+#   para migraciones y consultas manuales.
+# - bcrypt (services/contrasenas.py): cada worker tiene BCRYPT_WORKERS procesos, por
+#   defecto nucleos / workers, y rechaza con 503 los logins que superan
+#   BCRYPT_MAX_PENDIENTES, por defecto la mitad de los hilos. Los defaults se calculan
+#   con GUNICORN_WORKERS y GUNICORN_THREADS: pasar -w o --threads por linea de
+#   comandos no los cambia.
+#
+# Para verificarlo: correr `python -m benchmarks.concurrencia --url ... --token ...`
+# contra el servidor. Las peticiones por segundo deberian estabilizarse cerca de
+# workers * threads de concurrencia, con la espera p95 de /admin/pool en pocos ms.
+# Si la espera del pool crece antes que el uso de CPU, falta pool_size; si la CPU
+# llega al 100 % con menos concurrencia, sobran hilos.
+
+# /metrics suma los workers: cada proceso escribe sus metricas en este directorio.
+# Se prepara al leer esta configuracion, antes de que preload_app importe la app
+# (y prometheus_client); los archivos de una ejecucion anterior se borran para no
+# sumarlos a los contadores nuevos.
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/huellas_metricas')
+os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+for _archivo in glob.glob(os.path.join(os.environ['PROMETHEUS_MULTIPROC_DIR'], '*.db')):
+    os.remove(_archivo)
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count()))
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+worker_class = 'gthread'
+
+# La app se carga y se calienta una vez en el maestro (ver wsgi.py) y los workers
+# comparten esa memoria por copy-on-write
+preload_app = True
+
+# Los PDF sincronicos (/calzados/generar_reporte_pdf) pueden tardar
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '120'))
+graceful_timeout = 30
+keepalive = 5
+
+# Reciclar workers limita el crecimiento de memoria; con preload el reemplazo es
+# un fork del maestro ya calentado
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '5000'))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', '500'))
+
+
+def child_exit(server, worker):
+    # Las metricas "en vivo" (peticiones en curso, pool) de un worker que termino dejan de sumarse
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def post_fork(server, worker):
+    # Cada worker descarta las conexiones heredadas del maestro (sin cerrarlas: el
+    # socket es compartido) y abre las suyas antes de recibir peticiones
+    from wsgi import app
+    from app import abrir_conexiones
+    from models import db
+    from sqlalchemy.pool import QueuePool
+
+    with app.app_context():
+        db.engine.dispose(close=False)
+        pool = db.engine.pool
+        tamano = pool.size() if isinstance(pool, QueuePool) else 1
+        abrir_conexiones(min(threads, tamano))
@@ -0,0 +1,182 @@
+import importlib
+import pkgutil
+import re
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, UniqueConstraint, inspect, select
+from sqlalchemy.schema import AddConstraint, CreateIndex, DropIndex
+
+from models import db
+
+# Cada migracion es un modulo vNNN_nombre.py de este paquete con las funciones
+# aplicar(conexion) y revertir(conexion). Las que crean tablas las definen ellas
+# mismas, fijas; las que alinean columnas o agregan indices los toman por nombre
+# de los modelos con las operaciones de mas abajo.
+
+_NOMBRE_MIGRACION = re.compile(r'^v(\d{3})_\w+$')
+
+_metadata_versiones = MetaData()
+versiones = Table(
+    'schema_version', _metadata_versiones,
+    Column('version', Integer, primary_key=True),
+    Column('nombre', String(100), nullable=False)
+)
+
+
+class ErrorMigracion(Exception):
+    pass
+
+
+def migraciones():
+    encontradas = []
+    for modulo in pkgutil.iter_modules(__path__):
+        coincidencia = _NOMBRE_MIGRACION.match(modulo.name)
+        if coincidencia:
+            encontradas.append((int(coincidencia.group(1)), modulo.name))
+    return sorted(encontradas)
+
+
+def _cargar(nombre):
+    return importlib.import_module(f'{__name__}.{nombre}')
+
+
+def versiones_aplicadas(conexion):
+    versiones.create(conexion, checkfirst=True)
+    return {version for (version,) in conexion.execute(select(versiones.c.version))}
+
+
+def aplicar(engine, hasta=None):
+    # Aplica en orden las migraciones pendientes hasta la version indicada (o todas).
+    # Cada una va en su propia transaccion; en MySQL el DDL hace commit implicito,
+    # por eso las operaciones de las migraciones son idempotentes.
+    aplicadas = []
+    for version, nombre in migraciones():
+        if hasta is not None and version > hasta:
+            break
+        with engine.begin() as conexion:
+            if version in versiones_aplicadas(conexion):
+                continue
+            _cargar(nombre).aplicar(conexion)
+            conexion.execute(versiones.insert().values(version=version, nombre=nombre))
+        aplicadas.append(nombre)
+    return aplicadas
+
+
+def revertir(engine, hasta):
+    # Revierte, de la mas nueva a la mas vieja, las migraciones con version > hasta
+    revertidas = []
+    for version, nombre in reversed(migraciones()):
+        if version <= hasta:
+            break
+        with engine.begin() as conexion:
+            if version not in versiones_aplicadas(conexion):
+                continue
+            _cargar(nombre).revertir(conexion)
+            conexion.execute(versiones.delete().where(versiones.c.version == version))
+        revertidas.append(nombre)
+    return revertidas
+
+
+def estado(engine):
+    with engine.begin() as conexion:
+        hechas = versiones_aplicadas(conexion)
+    return [(version, nombre, version in hechas) for version, nombre in migraciones()]
+
+
+def diferencias(engine):
+    # Compara la base con los modelos: tablas, columnas e indices que faltan
+    inspector = inspect(engine)
+    existentes = set(inspector.get_table_names())
+    faltantes = []
+    for tabla in db.metadata.sorted_tables:
+        if tabla.name not in existentes:
+            faltantes.append(f'Falta la tabla {tabla.name}')
+            continue
+        columnas = {columna['name'] for columna in inspector.get_columns(tabla.name)}
+        for columna in tabla.columns:
+            if columna.name not in columnas:
+                faltantes.append(f'Falta la columna {tabla.name}.{columna.name}')
+        indices = {indice['name'] for indice in inspector.get_indexes(tabla.name)}
+        for indice in tabla.indexes:
+            if indice.name not in indices:
+                faltantes.append(f'Falta el índice {indice.name} en {tabla.name}')
+    return faltantes
+
+
+# Operaciones para usar desde las migraciones
+
+def tabla(nombre):
+    return db.metadata.tables[nombre]
+
+
+def indice(nombre_tabla, nombre):
+    for encontrado in tabla(nombre_tabla).indexes:
+        if encontrado.name == nombre:
+            return encontrado
+    raise ErrorMigracion(f'El modelo de {nombre_tabla} no define el índice {nombre}')
+
+
+def existe_indice(conexion, nombre_tabla, nombre):
+    return any(i['name'] == nombre for i in inspect(conexion).get_indexes(nombre_tabla))
+
+
+def crear_indice(conexion, nombre_tabla, nombre):
+    if not existe_indice(conexion, nombre_tabla, nombre):
+        conexion.execute(CreateIndex(indice(nombre_tabla, nombre)))
+
+
+def quitar_indice(conexion, nombre_tabla, nombre):
+    if not existe_indice(conexion, nombre_tabla, nombre):
+        return
+
+    inspector = inspect(conexion)
+    if conexion.dialect.name == 'mysql':
+        # InnoDB descarta el indice implicito de una clave foranea cuando otro indice
+        # empieza por la misma columna; antes de borrar el nuestro se lo vuelve a crear.
+        primera = indice(nombre_tabla, nombre).columns[0].name
+        claves = {fk['constrained_columns'][0] for fk in inspector.get_foreign_keys(nombre_tabla)}
+        otros = [i for i in inspector.get_indexes(nombre_tabla)
+                 if i['name'] != nombre and i['column_names'][0] == primera]
+        pk = inspector.get_pk_constraint(nombre_tabla)['constrained_columns']
+        if primera in claves and not otros and (not pk or pk[0] != primera):
+            conexion.exec_driver_sql(f'CREATE INDEX `{primera}` ON `{nombre_tabla}` (`{primera}`)')
+
+    conexion.execute(DropIndex(indice(nombre_tabla, nombre)))
+
+
+def existe_columna(conexion, nombre_tabla, nombre):
+    return any(c['name'] == nombre for c in inspect(conexion).get_columns(nombre_tabla))
+
+
+def agregar_columna(conexion, nombre_tabla, nombre):
+    if existe_columna(conexion, nombre_tabla, nombre):
+        return
+    columna = tabla(nombre_tabla).c[nombre]
+    tipo = columna.type.compile(dialect=conexion.dialect)
+    sql = f'ALTER TABLE {nombre_tabla} ADD COLUMN {nombre} {tipo}'
+    if columna.server_default is not None:
+        sql += f' DEFAULT {columna.server_default.arg}'
+    if not columna.nullable:
+        sql += ' NOT NULL'
+    conexion.exec_driver_sql(sql)
+
+
+def alinear_columna(conexion, nombre_tabla, nombre):
+    # Solo MySQL: SQLite no modifica columnas y sus bases siempre se crean desde los modelos
+    if conexion.dialect.name != 'mysql':
+        return
+    columna = tabla(nombre_tabla).c[nombre]
+    tipo = columna.type.compile(dialect=conexion.dialect)
+    nulo = 'NULL' if columna.nullable else 'NOT NULL'
+    conexion.exec_driver_sql(f'ALTER TABLE `{nombre_tabla}` MODIFY `{nombre}` {tipo} {nulo}')
+
+
+def agregar_unicos(conexion, nombre_tabla):
+    # Crea las restricciones UNIQUE de columna (unique=True) que falten en la base
+    inspector = inspect(conexion)
+    existentes = {tuple(u['column_names']) for u in inspector.get_unique_constraints(nombre_tabla)}
+    existentes |= {tuple(i['column_names']) for i in inspector.get_indexes(nombre_tabla) if i['unique']}
+    for restriccion in tabla(nombre_tabla).constraints:
+        if not isinstance(restriccion, UniqueConstraint):
+            continue
+        if tuple(c.name for c in restriccion.columns) not in existentes:
+            conexion.execute(AddConstraint(restriccion))
@@ -0,0 +1,49 @@
+import argparse
+import os
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import URL
+
+from migraciones import aplicar, diferencias, estado, revertir
+
+
+def url_desde_entorno():
+    if os.getenv('DATABASE_URL'):
+        return os.getenv('DATABASE_URL')
+    return URL.create(
+        'mysql+mysqlconnector',
+        username=os.getenv('MYSQL_USER', 'root'),
+        password=os.getenv('MYSQL_ROOT_PASSWORD') or None,
+        host=os.getenv('MYSQL_HOST', 'localhost'),
+        port=int(os.getenv('MYSQL_PORT', '3306')),
+        database=os.getenv('MYSQL_DATABASE', 'huellasdb')
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m migraciones')
+    parser.add_argument('--url', help='URL de SQLAlchemy (por defecto DATABASE_URL o las variables MYSQL_*)')
+    comandos = parser.add_subparsers(dest='comando', required=True)
+    aplicar_parser = comandos.add_parser('aplicar', help='Aplica las migraciones pendientes')
+    aplicar_parser.add_argument('--hasta', type=int, default=None)
+    revertir_parser = comandos.add_parser('revertir', help='Revierte hasta la version indicada (0 = todo)')
+    revertir_parser.add_argument('version', type=int)
+    comandos.add_parser('estado', help='Muestra las migraciones aplicadas y las diferencias con los modelos')
+    args = parser.parse_args()
+
+    engine = create_engine(args.url or url_desde_entorno())
+    if args.comando == 'aplicar':
+        for nombre in aplicar(engine, args.hasta):
+            print(f'Aplicada {nombre}')
+    elif args.comando == 'revertir':
+        for nombre in revertir(engine, args.version):
+            print(f'Revertida {nombre}')
+    else:
+        for version, nombre, aplicada in estado(engine):
+            print(f"{'[x]' if aplicada else '[ ]'} {nombre}")
+        for diferencia in diferencias(engine):
+            print(diferencia)
+
+
+if __name__ == '__main__':
+    main()
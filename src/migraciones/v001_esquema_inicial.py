@@ -0,0 +1,128 @@
+from sqlalchemy import (
+    BigInteger, Column, Enum, ForeignKey, Index, Integer, MetaData, Numeric, SmallInteger, String, Table, Text
+)
+
+# Esquema completo tal como estaba cuando se escribio esta migracion. Queda fijo
+# aca (no se toma de los modelos) para que esta version cree siempre lo mismo; los
+# cambios posteriores van en migraciones nuevas. En una base creada por las
+# versiones anteriores de setup_db.py solo agrega lo que no existia (por ejemplo
+# calzado_has_imputado).
+
+metadata = MetaData()
+
+Table(
+    'Marca', metadata,
+    Column('id_marca', Integer, primary_key=True),
+    Column('nombre', String(50), nullable=False, unique=True),
+)
+
+Table(
+    'Modelo', metadata,
+    Column('id_modelo', Integer, primary_key=True),
+    Column('nombre', String(100), nullable=False, unique=True),
+)
+
+Table(
+    'Categoria', metadata,
+    Column('id_categoria', Integer, primary_key=True),
+    Column('nombre', String(50), nullable=False, unique=True),
+)
+
+Table(
+    'Colores', metadata,
+    Column('id_color', Integer, primary_key=True),
+    Column('nombre', String(50), nullable=False, unique=True),
+)
+
+Table(
+    'Cuadrante', metadata,
+    Column('id_cuadrante', Integer, primary_key=True),
+    Column('nombre', String(50), nullable=False),
+)
+
+Table(
+    'FormaGeometrica', metadata,
+    Column('id_forma', Integer, primary_key=True),
+    Column('nombre', String(50), nullable=False),
+)
+
+Table(
+    'Usuarios', metadata,
+    Column('id', Integer, primary_key=True, autoincrement=True),
+    Column('username', String(50), unique=True, nullable=False),
+    Column('password_hash', String(128), nullable=False),
+    Column('role', String(20), nullable=False),
+)
+
+Table(
+    'Imputado', metadata,
+    Column('id', Integer, primary_key=True, autoincrement=True),
+    Column('nombre', String(100), nullable=False),
+    Column('dni', String(20), nullable=False, unique=True),
+    Column('direccion', String(200), nullable=True),
+    Column('comisaria', String(100), nullable=True),
+    Column('jurisdiccion', String(100), nullable=True),
+)
+
+Table(
+    'Calzado', metadata,
+    Column('id_calzado', Integer, primary_key=True),
+    Column('talle', String(10), nullable=True),
+    Column('ancho', Numeric(5, 2), nullable=True),
+    Column('alto', Numeric(5, 2), nullable=True),
+    Column('tipo_registro', Enum('indubitada_proveedor', 'indubitada_comisaria', 'dubitada'), nullable=True),
+    Column('id_marca', Integer, ForeignKey('Marca.id_marca'), nullable=True),
+    Column('id_modelo', Integer, ForeignKey('Modelo.id_modelo'), nullable=True),
+    Column('id_categoria', Integer, ForeignKey('Categoria.id_categoria'), nullable=True),
+    Index('ix_calzado_tipo_registro', 'tipo_registro', 'id_calzado'),
+)
+
+Table(
+    'calzado_color', metadata,
+    Column('id_calzado', Integer, ForeignKey('Calzado.id_calzado'), primary_key=True),
+    Column('id_color', Integer, ForeignKey('Colores.id_color'), primary_key=True),
+    Index('ix_calzado_color_color', 'id_color', 'id_calzado'),
+)
+
+Table(
+    'Suela', metadata,
+    Column('id_suela', Integer, primary_key=True),
+    Column('id_calzado', Integer, ForeignKey('Calzado.id_calzado'), nullable=False),
+    Column('descripcion_general', Text, nullable=True),
+    Column('patron_bits', BigInteger, nullable=False, server_default='0'),
+    Index('ix_suela_patron_bits', 'patron_bits', 'id_calzado'),
+    Index('ix_suela_calzado', 'id_calzado'),
+)
+
+Table(
+    'DetalleSuela', metadata,
+    Column('id_detalle', Integer, primary_key=True),
+    Column('id_suela', Integer, ForeignKey('Suela.id_suela'), nullable=False),
+    Column('id_cuadrante', Integer, ForeignKey('Cuadrante.id_cuadrante'), nullable=False),
+    Column('id_forma', Integer, ForeignKey('FormaGeometrica.id_forma'), nullable=False),
+    Column('detalle_adicional', Text, nullable=True),
+    Index('ix_detalle_cuadrante_forma_suela', 'id_cuadrante', 'id_forma', 'id_suela'),
+    Index('ix_detalle_suela', 'id_suela'),
+)
+
+Table(
+    'calzado_has_imputado', metadata,
+    Column('calzado_id_calzado', Integer, ForeignKey('Calzado.id_calzado'), primary_key=True),
+    Column('imputado_id', Integer, ForeignKey('Imputado.id'), primary_key=True),
+    Index('ix_calzado_imputado_imputado', 'imputado_id', 'calzado_id_calzado'),
+)
+
+Table(
+    'PatronBit', metadata,
+    Column('id_cuadrante', Integer, ForeignKey('Cuadrante.id_cuadrante'), primary_key=True),
+    Column('id_forma', Integer, ForeignKey('FormaGeometrica.id_forma'), primary_key=True),
+    Column('bit', SmallInteger, nullable=False, unique=True),
+)
+
+
+def aplicar(conexion):
+    metadata.create_all(conexion, checkfirst=True)
+
+
+def revertir(conexion):
+    metadata.drop_all(conexion, checkfirst=True)
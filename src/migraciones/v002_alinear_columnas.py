@@ -0,0 +1,34 @@
+from migraciones import agregar_columna, agregar_unicos, alinear_columna, crear_indice
+
+# Lleva las bases creadas con setup_db.py / create_schema.sql a los tipos de los
+# modelos: Imputado.dni pasa de INT a VARCHAR(20) UNIQUE, los nombres de catalogo
+# son NOT NULL y Suela.patron_bits (con su indice) existe en todas las bases.
+
+COLUMNAS = [
+    ('Imputado', 'nombre'),
+    ('Imputado', 'dni'),
+    ('Imputado', 'direccion'),
+    ('Imputado', 'comisaria'),
+    ('Imputado', 'jurisdiccion'),
+    ('Marca', 'nombre'),
+    ('Modelo', 'nombre'),
+    ('Categoria', 'nombre'),
+    ('Colores', 'nombre'),
+    ('Cuadrante', 'nombre'),
+    ('FormaGeometrica', 'nombre'),
+]
+
+
+def aplicar(conexion):
+    for nombre_tabla, columna in COLUMNAS:
+        alinear_columna(conexion, nombre_tabla, columna)
+    agregar_unicos(conexion, 'Imputado')
+
+    agregar_columna(conexion, 'Suela', 'patron_bits')
+    crear_indice(conexion, 'Suela', 'ix_suela_patron_bits')
+
+
+def revertir(conexion):
+    # No se vuelve a los tipos anteriores: pasar dni a INT o acortar columnas puede
+    # perder datos, y patron_bits lo necesita la busqueda por figuras.
+    pass
@@ -0,0 +1,21 @@
+from migraciones import crear_indice, quitar_indice
+
+# Indices secundarios de las consultas mas frecuentes (definidos en los modelos)
+INDICES = [
+    ('Calzado', 'ix_calzado_tipo_registro'),
+    ('Suela', 'ix_suela_calzado'),
+    ('DetalleSuela', 'ix_detalle_suela'),
+    ('DetalleSuela', 'ix_detalle_cuadrante_forma_suela'),
+    ('calzado_color', 'ix_calzado_color_color'),
+    ('calzado_has_imputado', 'ix_calzado_imputado_imputado'),
+]
+
+
+def aplicar(conexion):
+    for nombre_tabla, nombre in INDICES:
+        crear_indice(conexion, nombre_tabla, nombre)
+
+
+def revertir(conexion):
+    for nombre_tabla, nombre in reversed(INDICES):
+        quitar_indice(conexion, nombre_tabla, nombre)
@@ -0,0 +1,29 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, MetaData, String, Table
+
+# Tabla de refresh tokens para /auth/refresh. Como en v001, la tabla queda fija aca.
+
+metadata = MetaData()
+
+# Solo para resolver la clave foranea; la tabla ya existe desde v001
+Table('Usuarios', metadata, Column('id', Integer, primary_key=True))
+
+refresh_token = Table(
+    'RefreshToken', metadata,
+    Column('id', Integer, primary_key=True, autoincrement=True),
+    Column('id_usuario', Integer, ForeignKey('Usuarios.id'), nullable=False),
+    Column('token_hash', String(64), nullable=False, unique=True),
+    Column('familia', String(32), nullable=False),
+    Column('creado_en', DateTime, nullable=False),
+    Column('expira_en', DateTime, nullable=False),
+    Column('revocado_en', DateTime, nullable=True),
+    Index('ix_refresh_token_familia', 'familia'),
+    Index('ix_refresh_token_usuario', 'id_usuario'),
+)
+
+
+def aplicar(conexion):
+    refresh_token.create(conexion, checkfirst=True)
+
+
+def revertir(conexion):
+    refresh_token.drop(conexion, checkfirst=True)
@@ -14,5 +14,7 @@ from .categoria import Categoria
 from .modelo import Modelo
 from .calzado_imputado import CalzadoImputado
 from .imputado import Imputado
+from .patron_bit import PatronBit
+from .refresh_token import RefreshToken
 
 
@@ -4,7 +4,9 @@ from . import db
 # Tabla intermedia para la relación muchos a muchos entre Calzado y Color
 calzado_color = db.Table('calzado_color',
     db.Column('id_calzado', db.Integer, db.ForeignKey('Calzado.id_calzado'), primary_key=True),
-    db.Column('id_color', db.Integer, db.ForeignKey('Colores.id_color'), primary_key=True)
+    db.Column('id_color', db.Integer, db.ForeignKey('Colores.id_color'), primary_key=True),
+    # La PK cubre la busqueda por calzado; este indice cubre "calzados de un color"
+    db.Index('ix_calzado_color_color', 'id_color', 'id_calzado')
 )
 
 class Calzado(db.Model):
@@ -12,8 +14,9 @@ class Calzado(db.Model):
 
     id_calzado = db.Column(db.Integer, primary_key=True)
     talle = db.Column(db.String(10), nullable=True)
-    ancho = db.Column(db.Numeric(5, 2), nullable=True)
-    alto = db.Column(db.Numeric(5, 2), nullable=True)
+    # asdecimal=False: el driver los devuelve como float, que orjson codifica directo
+    ancho = db.Column(db.Numeric(5, 2, asdecimal=False), nullable=True)
+    alto = db.Column(db.Numeric(5, 2, asdecimal=False), nullable=True)
     tipo_registro = db.Column(
         db.Enum('indubitada_proveedor', 'indubitada_comisaria', 'dubitada'),
         nullable=True
@@ -22,18 +25,30 @@ class Calzado(db.Model):
     id_modelo = db.Column(db.Integer, db.ForeignKey('Modelo.id_modelo'), nullable=True)
     id_categoria = db.Column(db.Integer, db.ForeignKey('Categoria.id_categoria'), nullable=True)
 
+    __table_args__ = (
+        # Listados de dubitadas/indubitadas paginados por id_calzado
+        db.Index('ix_calzado_tipo_registro', 'tipo_registro', 'id_calzado'),
+    )
+
     suelas = db.relationship('Suela', backref='calzado', cascade="all, delete-orphan")
     marca = db.relationship('Marca', backref='calzados')
     modelo = db.relationship('Modelo', backref='calzados')
     categoria = db.relationship('Categoria', backref='calzados')
     colores = db.relationship('Color', secondary=calzado_color, backref='calzados')
+    # Solo lectura, como Imputado.calzados: los vinculos se crean a traves de CalzadoImputado
+    imputados = db.relationship(
+        'Imputado',
+        secondary='calzado_has_imputado',
+        viewonly=True,
+        order_by='Imputado.id'
+    )
 
     def to_dict(self):
         return {
             'id_calzado': self.id_calzado,
             'talle': self.talle,
-            'ancho': float(self.ancho) if self.ancho else None,
-            'alto': float(self.alto) if self.alto else None,
+            'ancho': self.ancho if self.ancho else None,
+            'alto': self.alto if self.alto else None,
             'tipo_registro': self.tipo_registro,
             'id_marca': self.id_marca,
             'marca': self.marca.nombre if self.marca else None,
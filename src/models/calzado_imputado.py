@@ -3,4 +3,9 @@ from . import db
 class CalzadoImputado(db.Model):
     __tablename__ = 'calzado_has_imputado'
     calzado_id_calzado = db.Column(db.Integer, db.ForeignKey('Calzado.id_calzado'), primary_key=True)
-    imputado_id = db.Column(db.Integer, db.ForeignKey('Imputado.id'), primary_key=True)
\ No newline at end of file
+    imputado_id = db.Column(db.Integer, db.ForeignKey('Imputado.id'), primary_key=True)
+
+    # La PK empieza por calzado; este indice cubre "calzados de un imputado"
+    __table_args__ = (
+        db.Index('ix_calzado_imputado_imputado', 'imputado_id', 'calzado_id_calzado'),
+    )
@@ -9,6 +9,12 @@ class DetalleSuela(db.Model):
     id_forma = db.Column(db.Integer, db.ForeignKey('FormaGeometrica.id_forma'), nullable=False)
     detalle_adicional = db.Column(db.Text, nullable=True)
 
+    __table_args__ = (
+        # Busqueda de suelas por figura en un cuadrante
+        db.Index('ix_detalle_cuadrante_forma_suela', 'id_cuadrante', 'id_forma', 'id_suela'),
+        db.Index('ix_detalle_suela', 'id_suela'),
+    )
+
     def to_dict(self):
         return {
             "id_detalle": self.id_detalle,
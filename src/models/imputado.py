@@ -11,6 +11,14 @@ class Imputado(db.Model):
     comisaria = db.Column(db.String(100), nullable=True)
     jurisdiccion = db.Column(db.String(100), nullable=True)
 
+    # Solo lectura: los vinculos se crean a traves de CalzadoImputado
+    calzados = db.relationship(
+        'Calzado',
+        secondary='calzado_has_imputado',
+        viewonly=True,
+        order_by='Calzado.id_calzado'
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -0,0 +1,22 @@
+from . import db
+
+# Suela.patron_bits es un BIGINT con signo: se usan los bits 0 a 62
+CANTIDAD_MAXIMA_BITS = 63
+
+
+# Asigna a cada par (cuadrante, forma) un bit de Suela.patron_bits.
+# Los pares reciben bit la primera vez que aparecen en una suela; los bits de una
+# forma eliminada quedan libres para otros pares.
+class PatronBit(db.Model):
+    __tablename__ = 'PatronBit'
+
+    id_cuadrante = db.Column(db.Integer, db.ForeignKey('Cuadrante.id_cuadrante'), primary_key=True)
+    id_forma = db.Column(db.Integer, db.ForeignKey('FormaGeometrica.id_forma'), primary_key=True)
+    bit = db.Column(db.SmallInteger, nullable=False, unique=True)
+
+    def to_dict(self):
+        return {
+            'id_cuadrante': self.id_cuadrante,
+            'id_forma': self.id_forma,
+            'bit': self.bit
+        }
@@ -0,0 +1,20 @@
+from . import db
+
+# Refresh tokens de larga duracion. Solo se guarda el sha256 del token. Cada uso lo
+# revoca y emite uno nuevo de la misma familia; si llega uno ya revocado se asume
+# que fue robado y se revoca la familia completa.
+class RefreshToken(db.Model):
+    __tablename__ = 'RefreshToken'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    id_usuario = db.Column(db.Integer, db.ForeignKey('Usuarios.id'), nullable=False)
+    token_hash = db.Column(db.String(64), nullable=False, unique=True)
+    familia = db.Column(db.String(32), nullable=False)
+    creado_en = db.Column(db.DateTime, nullable=False)
+    expira_en = db.Column(db.DateTime, nullable=False)
+    revocado_en = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        db.Index('ix_refresh_token_familia', 'familia'),
+        db.Index('ix_refresh_token_usuario', 'id_usuario'),
+    )
@@ -9,6 +9,13 @@ class Suela(db.Model):
     id_suela = db.Column(db.Integer, primary_key=True)
     id_calzado = db.Column(db.Integer, db.ForeignKey('Calzado.id_calzado'), nullable=False)
     descripcion_general = db.Column(db.Text, nullable=True)
+    # Un bit por cada par (cuadrante, forma) presente en los detalles, ver PatronBit
+    patron_bits = db.Column(db.BigInteger, nullable=False, default=0, server_default='0')
+
+    __table_args__ = (
+        db.Index('ix_suela_patron_bits', 'patron_bits', 'id_calzado'),
+        db.Index('ix_suela_calzado', 'id_calzado'),
+    )
 
     detalles = db.relationship('DetalleSuela', backref='suela', cascade="all, delete-orphan")
 
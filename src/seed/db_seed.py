@@ -1,46 +1,32 @@
+import argparse
+import csv
 import os
+import sys
+import tempfile
+import time
+
+import bcrypt
 import mysql.connector
 from dotenv import load_dotenv
-import bcrypt
 
+# models, migraciones y benchmarks estan en src/ (en la imagen del seed se copian junto a este archivo)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.datos import COLUMNAS, SEMILLA, Generador, asignar_bits
 
-load_dotenv() 
+# Carga los usuarios, los catalogos y --scale calzados generados (con suelas, detalles,
+# colores e imputados). Se puede correr de nuevo: solo agrega lo que falta para llegar
+# a --scale calzados.
+#
+#   python db_seed.py --scale 1000000
+#
+# Los calzados se insertan por lotes con LOAD DATA LOCAL INFILE desde CSV temporales
+# (necesita local_infile=1 en el servidor: `mysqld --local-infile=1`) o, si no esta
+# habilitado, con INSERT de varias filas.
 
-print(f"MYSQL_PORT: {os.getenv('MYSQL_PORT', '3306')}")
-print(f"MYSQL_DATABASE: {os.getenv('MYSQL_DATABASE', "huellasdb")}")
-print(f"Host: localhost")
+load_dotenv()
 
-try:
-    conn = mysql.connector.connect(
-        host="localhost",
-        user="root",
-        password=os.getenv("MYSQL_ROOT_PASSWORD"),
-        port=3306  
-    )
-    print("Conexión exitosa a MySQL")
-    
-    cursor = conn.cursor()
-    
-    database_name = os.getenv("MYSQL_DATABASE", "huellasdb")
-    cursor.execute(f"CREATE DATABASE IF NOT EXISTS {database_name}")
-    print(f"Base de datos '{database_name}' creada/verificada")
-    
-    cursor.execute(f"USE {database_name}")
-    print(f"Usando base de datos '{database_name}'")
-    
-except Exception as e:
-    print(f"Error al conectar a MySQL: {e}")
-    raise
-
-cursor = conn.cursor()
-
-cursor.execute("SELECT COUNT(*) FROM Calzado")
-cantidad = cursor.fetchone()[0]
-
-if cantidad > 0:
-    print("Seed ya ejecutado.")
-else:
-    print("Ejecutando seed...")
+CALZADOS_POR_LOTE = 20_000
+FILAS_POR_INSERT = 1_000
 
 usuarios = [
     ("admin", "admin123", "admin"),
@@ -48,197 +34,276 @@ usuarios = [
     ("analista", "analista123", "analyst")
 ]
 
-# Itera sobre una lista de usuarios, verifica si cada usuario existe en la DB;
-# si no, hashea la contraseña y lo inserta en la tabla 'Usuarios'.
-for username, password, role in usuarios:
-    cursor.execute("SELECT COUNT(*) FROM Usuarios WHERE username = %s", (username,))
-    if cursor.fetchone()[0] == 0:
-        hashed = bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode("utf-8")
-        cursor.execute("""
-            INSERT INTO Usuarios (username, password_hash, role)
-            VALUES (%s, %s, %s)
-        """, (username, hashed, role))
-
-    # Insertar cuadrantes
-    cuadrantes = [
-        "Cuadrante Superior Izquierdo",
-        "Cuadrante Superior Derecho",
-        "Cuadrante Inferior Izquierdo",
-        "Cuadrante Inferior Derecho",
-        "Cuadrante Central"
-    ]
-
-    for nombre in cuadrantes:
-        cursor.execute("INSERT INTO Cuadrante (nombre) VALUES (%s)", (nombre,))
-
-    # Insertar formas geométricas
-    formas = ["Círculo", "Rombo", "Pirámide", "Texto", "Logo", "Triángulo", "Rectángulo"]
-
-    for forma in formas:
-        cursor.execute("INSERT INTO FormaGeometrica (nombre) VALUES (%s)", (forma,))
-
-    # Insertar todos los modelos
-    modelos = [
-        "Air Zoom",
-        "Superstar", 
-        "SteelToe",
-        "Classic",
-        "Pro Runner"
-    ]
-
-    for modelo_nombre in modelos:
-        cursor.execute("""
-            INSERT IGNORE INTO Modelo (nombre)
-            VALUES (%s)
-        """, (modelo_nombre,))
-
-    # Insertar todos los colores
-    colores = [
-        "Negro",
-        "Blanco",
-        "Amarillo",
-        "Beige",
-        "Azul",
-        "Celeste",
-        "Turquesa",
-        "Verde",
-        "Rojo",
-        "Naranja",
-        "Violeta",
-        "Magenta",
-        "Gris",
-        "Rosa",
-        "Bordo",
-        "Marrón"
-    ]
-
-    for color_nombre in colores:
-        cursor.execute("""
-            INSERT IGNORE INTO Colores (nombre)
-            VALUES (%s)
-        """, (color_nombre,))
-
-    # Insertar todas las categorías
-    categorias = [
-        "Deportivo",
-        "Urbano",
-        "Trabajo",
-        "Casual",
-        "Formal"
-    ]
-
-    for categoria_nombre in categorias:
-        cursor.execute("""
-            INSERT IGNORE INTO Categoria (nombre)
-            VALUES (%s)
-        """, (categoria_nombre,))
-
-    # Insertar todas las marcas
-    marcas = [
-        "Nike",
-        "Adidas",
-        "Caterpillar",
-        "Timberland",
-        "Pampero",
-        "Havaianas",
-        "Converse",
-        "Puma",
-        "Vans",
-        "Reebok",
-        "New Balance",
-        "Asics",
-        "Under Armour",
-        "Fila",
-        "Skechers",
-        "Hoka",
-        "Salomon",
-        "John Foos",
-        "Topper"
-    ]
-
-    for marca_nombre in marcas:
-        cursor.execute("""
-            INSERT IGNORE INTO Marca (nombre)
-            VALUES (%s)
-        """, (marca_nombre,))
-
-    # Obtener IDs de las tablas independientes
-    cursor.execute("SELECT id_marca FROM Marca")
-    marca_ids = [row[0] for row in cursor.fetchall()]
-    
-    cursor.execute("SELECT id_modelo FROM Modelo")
-    modelo_ids = [row[0] for row in cursor.fetchall()]
-    
-    cursor.execute("SELECT id_categoria FROM Categoria")
-    categoria_ids = [row[0] for row in cursor.fetchall()]
-    
-    cursor.execute("SELECT id_color FROM Colores")
-    color_ids = [row[0] for row in cursor.fetchall()]
-
-    # Insertar calzados con referencias a las tablas independientes
-    calzados = [
-        ("42", 10.5, 28.0, "indubitada_proveedor", marca_ids[0], modelo_ids[0], categoria_ids[0]),
-        ("41", 10.0, 27.5, "indubitada_comisaria", marca_ids[1], modelo_ids[1], categoria_ids[1]),
-        ("43", 11.0, 29.0, "dubitada", marca_ids[2], modelo_ids[2], categoria_ids[2]),
-        ("40", 9.5, 26.5, "indubitada_proveedor", marca_ids[3], modelo_ids[3], categoria_ids[3]),
-        ("44", 11.5, 29.5, "dubitada", marca_ids[4], modelo_ids[4], categoria_ids[4])
-    ]
-
-    for c in calzados:
-        cursor.execute("""
-            INSERT INTO Calzado (talle, ancho, alto, tipo_registro, id_marca, id_modelo, id_categoria)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
-        """, c)
-
-    conn.commit()
-
-    cursor.execute("SELECT id_calzado FROM Calzado")
-    calzado_ids = [row[0] for row in cursor.fetchall()]
-
-    # Tabla intermedia
-    for i, calzado_id in enumerate(calzado_ids):
-        color_id = color_ids[i % len(color_ids)]
-        cursor.execute("""
-            INSERT IGNORE INTO calzado_color (id_calzado, id_color)
-            VALUES (%s, %s)
-        """, (calzado_id, color_id))
-
-    conn.commit()
-
-    # Insertar suelas para cada calzado
-    for id_calzado in calzado_ids:
-        cursor.execute("""
-            INSERT INTO Suela (id_calzado, descripcion_general)
-            VALUES (%s, %s)
-        """, (id_calzado, "Suela con dibujo estándar para pruebas"))
-
-    conn.commit()
-
-    # Obtener IDs para las relaciones
-    cursor.execute("SELECT id_cuadrante FROM Cuadrante")
-    cuadrante_ids = [row[0] for row in cursor.fetchall()]
-
-    cursor.execute("SELECT id_forma FROM FormaGeometrica")
-    forma_ids = [row[0] for row in cursor.fetchall()]
-
-    cursor.execute("SELECT id_suela FROM Suela")
-    suela_ids = [row[0] for row in cursor.fetchall()]
-
-    # Insertar detalles de suela
-    for suela_id in suela_ids:
-        for i in range(3): 
+cuadrantes = [
+    "Cuadrante Superior Izquierdo",
+    "Cuadrante Superior Derecho",
+    "Cuadrante Inferior Izquierdo",
+    "Cuadrante Inferior Derecho",
+    "Cuadrante Central"
+]
+
+formas = ["Círculo", "Rombo", "Pirámide", "Texto", "Logo", "Triángulo", "Rectángulo"]
+
+modelos = [
+    "Air Zoom",
+    "Superstar",
+    "SteelToe",
+    "Classic",
+    "Pro Runner"
+]
+
+colores = [
+    "Negro",
+    "Blanco",
+    "Amarillo",
+    "Beige",
+    "Azul",
+    "Celeste",
+    "Turquesa",
+    "Verde",
+    "Rojo",
+    "Naranja",
+    "Violeta",
+    "Magenta",
+    "Gris",
+    "Rosa",
+    "Bordo",
+    "Marrón"
+]
+
+categorias = [
+    "Deportivo",
+    "Urbano",
+    "Trabajo",
+    "Casual",
+    "Formal"
+]
+
+marcas = [
+    "Nike",
+    "Adidas",
+    "Caterpillar",
+    "Timberland",
+    "Pampero",
+    "Havaianas",
+    "Converse",
+    "Puma",
+    "Vans",
+    "Reebok",
+    "New Balance",
+    "Asics",
+    "Under Armour",
+    "Fila",
+    "Skechers",
+    "Hoka",
+    "Salomon",
+    "John Foos",
+    "Topper"
+]
+
+# clave del generador -> (tabla, columna id, nombres)
+catalogos = {
+    'cuadrante': ("Cuadrante", "id_cuadrante", cuadrantes),
+    'forma': ("FormaGeometrica", "id_forma", formas),
+    'modelo': ("Modelo", "id_modelo", modelos),
+    'color': ("Colores", "id_color", colores),
+    'categoria': ("Categoria", "id_categoria", categorias),
+    'marca': ("Marca", "id_marca", marcas),
+}
+
+# grupo de filas del generador -> tabla
+tablas = {
+    'calzados': "Calzado",
+    'colores': "calzado_color",
+    'suelas': "Suela",
+    'detalles': "DetalleSuela",
+    'imputados': "Imputado",
+    'vinculos': "calzado_has_imputado",
+}
+
+
+def conectar():
+    print(f"MYSQL_PORT: {os.getenv('MYSQL_PORT', '3306')}")
+    print(f"MYSQL_DATABASE: {os.getenv('MYSQL_DATABASE', 'huellasdb')}")
+    print(f"Host: {os.getenv('MYSQL_HOST', 'localhost')}")
+
+    conn = mysql.connector.connect(
+        host=os.getenv("MYSQL_HOST", "localhost"),
+        user="root",
+        password=os.getenv("MYSQL_ROOT_PASSWORD"),
+        port=3306,
+        database=os.getenv("MYSQL_DATABASE", "huellasdb"),
+        allow_local_infile=True
+    )
+    print("Conexión exitosa a MySQL")
+    return conn
+
+
+def cargar_usuarios(cursor):
+    cursor.execute("SELECT username FROM Usuarios")
+    existentes = {username for (username,) in cursor.fetchall()}
+
+    for username, password, role in usuarios:
+        if username not in existentes:
+            hashed = bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode("utf-8")
             cursor.execute("""
-                INSERT INTO DetalleSuela (id_suela, id_cuadrante, id_forma, detalle_adicional)
-                VALUES (%s, %s, %s, %s)
-            """, (
-                suela_id,
-                cuadrante_ids[i % len(cuadrante_ids)],
-                forma_ids[i % len(forma_ids)],
-                f"Detalle de prueba {i+1}"
-            ))
-
-    conn.commit()
-    print("Se han cargado los datos correctamente.")
-
-cursor.close()
-conn.close()
+                INSERT INTO Usuarios (username, password_hash, role)
+                VALUES (%s, %s, %s)
+            """, (username, hashed, role))
+
+
+def cargar_catalogo(cursor, tabla, columna_id, nombres):
+    # Inserta los nombres que falten y devuelve sus ids en el orden de `nombres`
+    cursor.execute(f"SELECT nombre, {columna_id} FROM {tabla}")
+    ids = dict(cursor.fetchall())
+
+    faltantes = [(nombre,) for nombre in nombres if nombre not in ids]
+    if faltantes:
+        cursor.executemany(f"INSERT INTO {tabla} (nombre) VALUES (%s)", faltantes)
+        cursor.execute(f"SELECT nombre, {columna_id} FROM {tabla}")
+        ids = dict(cursor.fetchall())
+
+    return [ids[nombre] for nombre in nombres]
+
+
+def cargar_bits(cursor, ids_cuadrante, ids_forma):
+    # Completa PatronBit para todos los pares (cuadrante, forma) del seed
+    cursor.execute("SELECT id_cuadrante, id_forma, bit FROM PatronBit")
+    existentes = {(c, f): bit for c, f, bit in cursor.fetchall()}
+
+    bits = asignar_bits(ids_cuadrante, ids_forma, existentes)
+    nuevos = [(c, f, bit) for (c, f), bit in bits.items() if (c, f) not in existentes]
+    if nuevos:
+        cursor.executemany("INSERT INTO PatronBit (id_cuadrante, id_forma, bit) VALUES (%s, %s, %s)", nuevos)
+    return bits
+
+
+def maximo(cursor, tabla, columna):
+    cursor.execute(f"SELECT COALESCE(MAX({columna}), 0) FROM {tabla}")
+    return cursor.fetchone()[0]
+
+
+def insertar_filas(cursor, tabla, columnas, filas):
+    # mysql-connector convierte el executemany de un INSERT en INSERT de varias filas
+    sentencia = f"INSERT INTO {tabla} ({', '.join(columnas)}) VALUES ({', '.join(['%s'] * len(columnas))})"
+    for inicio in range(0, len(filas), FILAS_POR_INSERT):
+        cursor.executemany(sentencia, filas[inicio:inicio + FILAS_POR_INSERT])
+
+
+def cargar_archivo(cursor, tabla, columnas, filas, directorio):
+    ruta = os.path.join(directorio, f"{tabla}.csv")
+    with open(ruta, "w", newline="", encoding="utf-8") as archivo:
+        escritor = csv.writer(archivo, lineterminator="\n")
+        for fila in filas:
+            # Con ENCLOSED BY, la palabra NULL sin comillas se lee como NULL
+            escritor.writerow("NULL" if valor is None else valor for valor in fila)
+
+    try:
+        cursor.execute(f"""
+            LOAD DATA LOCAL INFILE '{ruta}' INTO TABLE {tabla}
+            CHARACTER SET utf8mb4
+            FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"' ESCAPED BY ''
+            LINES TERMINATED BY '\\n'
+            ({', '.join(columnas)})
+        """)
+    finally:
+        os.remove(ruta)
+
+
+class Escritor:
+    # Elige LOAD DATA o INSERT; con metodo "auto" prueba LOAD DATA y si el servidor
+    # no lo permite sigue con INSERT
+
+    def __init__(self, cursor, metodo, directorio):
+        self.cursor = cursor
+        self.metodo = metodo
+        self.directorio = directorio
+
+    def escribir(self, tabla, columnas, filas):
+        if self.metodo in ("auto", "infile"):
+            try:
+                cargar_archivo(self.cursor, tabla, columnas, filas, self.directorio)
+                self.metodo = "infile"
+                return
+            except mysql.connector.Error as e:
+                if self.metodo == "infile":
+                    raise
+                print(f"LOAD DATA LOCAL INFILE no disponible ({e.msg}); se usa INSERT de varias filas")
+                self.metodo = "insert"
+        insertar_filas(self.cursor, tabla, columnas, filas)
+
+
+def cargar_calzados(conn, cursor, cantidad, ids, bits, semilla, metodo):
+    ultimo_id = maximo(cursor, "Calzado", "id_calzado")
+    cursor.execute("SELECT COUNT(*) FROM Calzado")
+    faltan = cantidad - cursor.fetchone()[0]
+    if faltan <= 0:
+        print(f"Seed ya ejecutado: hay {cantidad} calzados o más.")
+        return
+
+    generador = Generador(ids, bits, semilla + ultimo_id)
+    generador.contadores.update(
+        suela=maximo(cursor, "Suela", "id_suela"),
+        detalle=maximo(cursor, "DetalleSuela", "id_detalle"),
+        imputado=maximo(cursor, "Imputado", "id"),
+    )
+
+    # Sin chequeos de unicidad ni de claves foraneas durante la carga: los ids y
+    # las referencias los arma el generador. Se restauran aunque la carga falle.
+    cursor.execute("SET unique_checks = 0")
+    cursor.execute("SET foreign_key_checks = 0")
+    inicio = time.perf_counter()
+    try:
+        with tempfile.TemporaryDirectory(prefix="seed_") as directorio:
+            escritor = Escritor(cursor, metodo, directorio)
+            desde = ultimo_id + 1
+            hasta_final = desde + faltan
+            while desde < hasta_final:
+                hasta = min(hasta_final, desde + CALZADOS_POR_LOTE)
+                filas = generador.lote(desde, hasta)
+                for clave, tabla in tablas.items():
+                    if filas[clave]:
+                        escritor.escribir(tabla, COLUMNAS[clave], filas[clave])
+                conn.commit()
+
+                hechos = hasta - ultimo_id - 1
+                segundos = time.perf_counter() - inicio
+                print(f"{hechos}/{faltan} calzados ({hechos / segundos:.0f}/s)")
+                desde = hasta
+    finally:
+        cursor.execute("SET foreign_key_checks = 1")
+        cursor.execute("SET unique_checks = 1")
+
+    print(f"Cargados {faltan} calzados en {time.perf_counter() - inicio:.1f} s ({escritor.metodo})")
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="db_seed.py")
+    parser.add_argument("--scale", type=int, default=int(os.getenv("SEED_SCALE", "5")),
+                        help="Cantidad total de calzados (por defecto SEED_SCALE o 5)")
+    parser.add_argument("--seed", type=int, default=SEMILLA, help="Semilla del generador")
+    parser.add_argument("--metodo", choices=("auto", "infile", "insert"), default="auto",
+                        help="LOAD DATA LOCAL INFILE, INSERT de varias filas, o auto (infile si se puede)")
+    args = parser.parse_args()
+
+    conn = conectar()
+    cursor = conn.cursor()
+    try:
+        cargar_usuarios(cursor)
+        ids = {
+            clave: cargar_catalogo(cursor, tabla, columna_id, nombres)
+            for clave, (tabla, columna_id, nombres) in catalogos.items()
+        }
+        bits = cargar_bits(cursor, ids['cuadrante'], ids['forma'])
+        conn.commit()
+        print("Usuarios y catálogos cargados")
+
+        cargar_calzados(conn, cursor, args.scale, ids, bits, args.seed, args.metodo)
+        print("Se han cargado los datos correctamente.")
+    finally:
+        cursor.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
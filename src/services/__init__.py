@@ -0,0 +1 @@
+# Este archivo hace que el directorio services sea un paquete de Python
\ No newline at end of file
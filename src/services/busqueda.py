@@ -0,0 +1,125 @@
+from sqlalchemy import false, or_
+from sqlalchemy.orm import joinedload, selectinload
+
+from models import db, Calzado, DetalleSuela, Suela
+from services.catalogo import catalogo
+from services.patrones import mascara
+
+# parametro de la query string -> nombre del cuadrante
+CUADRANTES = {
+    'figurasSuperiorIzquierdo': 'Cuadrante Superior Izquierdo',
+    'figurasSuperiorDerecho': 'Cuadrante Superior Derecho',
+    'figurasCentral': 'Cuadrante Central',
+    'figurasInferiorIzquierdo': 'Cuadrante Inferior Izquierdo',
+    'figurasInferiorDerecho': 'Cuadrante Inferior Derecho'
+}
+
+
+def leer_criterios_busqueda(args):
+    criterios = {
+        'categoria': args.get('categoria', '').strip(),
+        'marca': args.get('marca', '').strip(),
+        'modelo': args.get('modelo', '').strip(),
+        'talle': args.get('talle', '').strip(),
+    }
+    for param in CUADRANTES:
+        criterios[param] = args.getlist(f'{param}[]')
+    return criterios
+
+
+def filtrar_busqueda(query, criterios):
+    # Los nombres de catalogo se resuelven a ids en memoria, sin joins
+    if criterios['categoria']:
+        query = query.filter(Calzado.id_categoria.in_(catalogo.ids_que_contienen('categoria', criterios['categoria'])))
+
+    if criterios['marca']:
+        query = query.filter(Calzado.id_marca.in_(catalogo.ids_que_contienen('marca', criterios['marca'])))
+
+    if criterios['modelo']:
+        query = query.filter(Calzado.id_modelo.in_(catalogo.ids_que_contienen('modelo', criterios['modelo'])))
+
+    if criterios['talle']:
+        query = query.filter(Calzado.talle.ilike(f"%{criterios['talle']}%"))
+
+    figuras_pedidas = {f for param in CUADRANTES for f in criterios[param]}
+    cuadrantes_pedidos = [nombre for param, nombre in CUADRANTES.items() if criterios[param]]
+
+    ids_forma = {}
+    for figura in figuras_pedidas:
+        id_forma = catalogo.id_por_nombre('forma', figura)
+        if id_forma is not None:
+            ids_forma[figura] = id_forma
+    ids_cuadrante = {}
+    for nombre in cuadrantes_pedidos:
+        id_cuadrante = catalogo.id_por_nombre('cuadrante', nombre)
+        if id_cuadrante is not None:
+            ids_cuadrante[nombre] = id_cuadrante
+
+    # Las figuras se resuelven contra Suela.patron_bits, con una subconsulta por
+    # cuadrante como el JOIN de antes: cada cuadrante lo puede cumplir una suela
+    # distinta del mismo calzado. Los pares que quedaron sin bit (ver
+    # patrones.asignar_bits) se buscan en DetalleSuela.
+    for param, cuadrante_nombre in CUADRANTES.items():
+        figuras = criterios[param]
+        if figuras:
+            # Igual que antes: si alguna figura no existe el cuadrante no filtra
+            if any(figura not in ids_forma for figura in figuras):
+                continue
+
+            if cuadrante_nombre not in ids_cuadrante:
+                query = query.filter(false())
+                continue
+
+            id_cuadrante = ids_cuadrante[cuadrante_nombre]
+            mascara_cuadrante, sin_bit = mascara(id_cuadrante, [ids_forma[figura] for figura in figuras])
+            condiciones = []
+            if mascara_cuadrante:
+                condiciones.append(Suela.patron_bits.op('&')(mascara_cuadrante) != 0)
+            if sin_bit:
+                suelas = db.session.query(DetalleSuela.id_suela).filter(
+                    DetalleSuela.id_cuadrante == id_cuadrante, DetalleSuela.id_forma.in_(sin_bit)
+                )
+                condiciones.append(Suela.id_suela.in_(suelas))
+            subquery = db.session.query(Suela.id_calzado).filter(or_(*condiciones))
+            query = query.filter(Calzado.id_calzado.in_(subquery))
+
+    return query
+
+
+def opciones_busqueda():
+    # Marca, modelo y categoria son muchos-a-uno y van en el mismo SELECT. Colores,
+    # suelas y detalles se traen con un IN por coleccion para no multiplicar filas.
+    return (
+        joinedload(Calzado.marca),
+        joinedload(Calzado.modelo),
+        joinedload(Calzado.categoria),
+        selectinload(Calzado.colores),
+        selectinload(Calzado.suelas).selectinload(Suela.detalles)
+    )
+
+
+def figuras_de(c):
+    # Los nombres de cuadrante y forma salen del cache de catalogo; las suelas y
+    # detalles deben venir cargadas con selectinload para no disparar una consulta por fila.
+    figuras = []
+    for suela in sorted(c.suelas, key=lambda s: s.id_suela):
+        for detalle in sorted(suela.detalles, key=lambda d: d.id_detalle):
+            cuadrante = catalogo.por_id('cuadrante', detalle.id_cuadrante)
+            forma = catalogo.por_id('forma', detalle.id_forma)
+            figuras.append({
+                "cuadrante": cuadrante['nombre'] if cuadrante else None,
+                "forma": forma['nombre'] if forma else None
+            })
+    return figuras
+
+
+def resultado_busqueda(c):
+    return {
+        "id": c.id_calzado,
+        "marca": c.marca.nombre if c.marca else None,
+        "modelo": c.modelo.nombre if c.modelo else None,
+        "categoria": c.categoria.nombre if c.categoria else None,
+        "talle": c.talle,
+        "colores": [color.nombre for color in c.colores],
+        "figuras": figuras_de(c)
+    }
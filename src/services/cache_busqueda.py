@@ -0,0 +1,162 @@
+import os
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from models import (
+    Calzado, Categoria, Color, Cuadrante, DetalleSuela, FormaGeometrica, Marca, Modelo, PatronBit, Suela
+)
+from services.busqueda import CUADRANTES
+from services.catalogo import normalizar
+from services.metricas import BUSQUEDA_CACHE
+
+# Escribir cualquiera de estos modelos puede cambiar el resultado de una busqueda
+MODELOS_BUSQUEDA = (Calzado, Suela, DetalleSuela, Marca, Modelo, Categoria, Color, FormaGeometrica, Cuadrante, PatronBit)
+TABLAS_BUSQUEDA = {modelo.__table__.name for modelo in MODELOS_BUSQUEDA} | {'calzado_color'}
+
+MAXIMO_ENTRADAS = int(os.getenv('BUSQUEDA_CACHE_TAMANO', '256'))
+# Las escrituras hechas por la app en cualquier worker vacian el cache de todos (ver
+# ARCHIVO_GENERACION); el vencimiento cubre las que se hacen por fuera (seed, scripts)
+SEGUNDOS_DE_VIDA = int(os.getenv('BUSQUEDA_CACHE_TTL', '60'))
+# Como REPORTES_DIR, tiene que ser un directorio compartido por todos los workers
+DIRECTORIO = os.getenv('BUSQUEDA_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'huellas_busqueda'))
+ARCHIVO_GENERACION = os.path.join(DIRECTORIO, 'generacion')
+NOMBRE_CACHE = 'huellas-buscar'
+
+
+def clave_busqueda(criterios, after, limit, total):
+    # Dos busquedas que filtran lo mismo dan la misma clave: los textos se comparan
+    # sin mayusculas ni acentos (como el catalogo) y el orden de las figuras no importa
+    textos = tuple(normalizar(criterios[campo]) for campo in ('categoria', 'marca', 'modelo', 'talle'))
+    figuras = tuple(
+        tuple(sorted({normalizar(figura) for figura in criterios[param]}))
+        for param in CUADRANTES
+    )
+    return textos, figuras, after, limit, total
+
+
+class CacheBusqueda:
+    # LRU con vencimiento de los resultados de /calzados/buscar. Cada escritura sobre
+    # los modelos de MODELOS_BUSQUEDA sube la generacion y vacia el cache; un resultado
+    # que se empezo a calcular en una generacion anterior no se guarda.
+    #
+    # Cada worker tiene su propio cache. Para que una escritura en un worker invalide
+    # los demas, invalidar() deja un valor nuevo en archivo_generacion y cada consulta
+    # lo compara con el ultimo que vio (una lectura de pocos bytes, sin ir a la base).
+
+    def __init__(self, maximo=MAXIMO_ENTRADAS, segundos_de_vida=SEGUNDOS_DE_VIDA, archivo_generacion=ARCHIVO_GENERACION):
+        self.maximo = maximo
+        self.segundos_de_vida = segundos_de_vida
+        self.archivo_generacion = archivo_generacion
+        self._lock = threading.Lock()
+        self._entradas = OrderedDict()
+        self.generacion = 0
+        self._compartida = self._leer_compartida()
+
+    def _leer_compartida(self):
+        try:
+            with open(self.archivo_generacion, 'rb') as archivo:
+                return archivo.read()
+        except FileNotFoundError:
+            return b''
+
+    def _escribir_compartida(self):
+        # Se reemplaza el archivo entero (os.replace es atomico): nadie lee uno a medias
+        valor = uuid.uuid4().hex.encode()
+        os.makedirs(os.path.dirname(self.archivo_generacion), exist_ok=True)
+        temporal = f'{self.archivo_generacion}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(temporal, 'wb') as archivo:
+            archivo.write(valor)
+        os.replace(temporal, self.archivo_generacion)
+        return valor
+
+    def _sincronizar(self):
+        # Con el lock tomado: si otro proceso invalido, se descarta lo guardado
+        compartida = self._leer_compartida()
+        if compartida != self._compartida:
+            self._compartida = compartida
+            self.generacion += 1
+            self._entradas.clear()
+
+    def obtener(self, clave):
+        # Devuelve (resultado, segundos que le quedan) o None
+        with self._lock:
+            self._sincronizar()
+            entrada = self._entradas.get(clave)
+            if entrada is not None:
+                resultado, vence_en = entrada
+                restante = vence_en - time.monotonic()
+                if restante > 0:
+                    self._entradas.move_to_end(clave)
+                    BUSQUEDA_CACHE.labels('hit').inc()
+                    return resultado, restante
+                del self._entradas[clave]
+        BUSQUEDA_CACHE.labels('miss').inc()
+        return None
+
+    def guardar(self, clave, generacion, resultado):
+        # Devuelve si quedo guardado
+        if self.maximo <= 0:
+            return False
+        with self._lock:
+            self._sincronizar()
+            if generacion != self.generacion:
+                return False
+            self._entradas[clave] = (resultado, time.monotonic() + self.segundos_de_vida)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.maximo:
+                self._entradas.popitem(last=False)
+        return True
+
+    def invalidar(self):
+        with self._lock:
+            self.generacion += 1
+            self._entradas.clear()
+            self._compartida = self._escribir_compartida()
+
+
+cache_busqueda = CacheBusqueda()
+
+
+# La generacion se sube al hacer flush (para descartar busquedas que ya estaban en
+# curso) y otra vez al hacer commit (para descartar las que leyeron entre el flush y
+# el commit, todavia sin ver los cambios).
+
+@event.listens_for(Session, 'after_flush')
+def _al_hacer_flush(sesion, contexto):
+    for objeto in (*sesion.new, *sesion.dirty, *sesion.deleted):
+        if isinstance(objeto, MODELOS_BUSQUEDA):
+            sesion.info['invalidar_busqueda'] = True
+            cache_busqueda.invalidar()
+            return
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _al_ejecutar(estado):
+    # INSERT/UPDATE/DELETE masivos (carga masiva, query.update) no pasan por el flush
+    if not (estado.is_insert or estado.is_update or estado.is_delete):
+        return
+    tabla = getattr(estado.statement, 'table', None)
+    if tabla is not None and tabla.name in TABLAS_BUSQUEDA:
+        estado.session.info['invalidar_busqueda'] = True
+        cache_busqueda.invalidar()
+
+
+@event.listens_for(Session, 'after_commit')
+def _al_hacer_commit(sesion):
+    # Tambien se llama al liberar un savepoint: solo cuenta el commit de la transaccion
+    if sesion.in_nested_transaction():
+        return
+    if sesion.info.pop('invalidar_busqueda', False):
+        cache_busqueda.invalidar()
+
+
+@event.listens_for(Session, 'after_transaction_end')
+def _al_terminar(sesion, transaccion):
+    if transaccion.parent is None:
+        sesion.info.pop('invalidar_busqueda', None)
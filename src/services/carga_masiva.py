@@ -0,0 +1,242 @@
+from flask import json, request
+from sqlalchemy import insert, text
+
+from models import db, Calzado, Categoria, Color, Marca, Modelo
+from models.calzado import calzado_color
+
+TAMANO_LOTE = 500
+MAXIMO_ERRORES_INFORMADOS = 1000
+TIPOS_REGISTRO = ('indubitada_proveedor', 'indubitada_comisaria', 'dubitada')
+
+# campo -> (columna de la clave primaria, mensaje si no existe)
+CLAVES_FORANEAS = {
+    'id_marca': (Marca.id_marca, 'Marca no encontrada'),
+    'id_modelo': (Modelo.id_modelo, 'Modelo no encontrado'),
+    'id_categoria': (Categoria.id_categoria, 'Categoría no encontrada'),
+}
+
+
+class FilaInvalida(ValueError):
+    pass
+
+
+def leer_filas():
+    # Devuelve (indice, fila). Con NDJSON se lee el cuerpo linea por linea, sin
+    # cargarlo completo en memoria; con JSON se acepta una lista o {"calzados": [...]}.
+    if request.mimetype in ('application/x-ndjson', 'application/jsonlines'):
+        indice = 0
+        for linea in request.stream:
+            linea = linea.strip()
+            if not linea:
+                continue
+            try:
+                yield indice, json.loads(linea)
+            except ValueError:
+                yield indice, FilaInvalida('Línea JSON inválida')
+            indice += 1
+        return
+
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get('calzados')
+    if not isinstance(data, list):
+        raise FilaInvalida('Se esperaba una lista de calzados (JSON o NDJSON)')
+
+    for indice, fila in enumerate(data):
+        yield indice, fila
+
+
+def _valor_numerico(fila, campo):
+    valor = fila.get(campo)
+    if valor is None or valor == '':
+        return None
+    try:
+        return float(valor)
+    except (TypeError, ValueError):
+        raise FilaInvalida(f'El campo {campo} debe ser numérico')
+
+
+def _valor_entero(valor, campo):
+    if valor is None or valor == '':
+        return None
+    if isinstance(valor, bool):
+        raise FilaInvalida(f'El campo {campo} debe ser un entero')
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        raise FilaInvalida(f'El campo {campo} debe ser un entero')
+
+
+def _normalizar_fila(fila):
+    if isinstance(fila, FilaInvalida):
+        raise fila
+    if not isinstance(fila, dict):
+        raise FilaInvalida('Cada calzado debe ser un objeto JSON')
+
+    tipo_registro = fila.get('tipo_registro')
+    if tipo_registro is not None and tipo_registro not in TIPOS_REGISTRO:
+        raise FilaInvalida(f'tipo_registro inválido. Valores permitidos: {", ".join(TIPOS_REGISTRO)}')
+
+    talle = fila.get('talle')
+    if talle is not None:
+        talle = str(talle)
+        if len(talle) > 10:
+            raise FilaInvalida('El talle no puede superar los 10 caracteres')
+
+    colores = fila.get('id_colores') or []
+    if not isinstance(colores, list):
+        raise FilaInvalida('id_colores debe ser una lista')
+
+    return {
+        'valores': {
+            'talle': talle,
+            'ancho': _valor_numerico(fila, 'ancho'),
+            'alto': _valor_numerico(fila, 'alto'),
+            'tipo_registro': tipo_registro,
+            'id_marca': _valor_entero(fila.get('id_marca'), 'id_marca'),
+            'id_modelo': _valor_entero(fila.get('id_modelo'), 'id_modelo'),
+            'id_categoria': _valor_entero(fila.get('id_categoria'), 'id_categoria'),
+        },
+        'colores': list(dict.fromkeys(_valor_entero(c, 'id_colores') for c in colores))
+    }
+
+
+def _existentes(columna, ids):
+    ids = {i for i in ids if i is not None}
+    if not ids:
+        return set()
+    return {valor for (valor,) in db.session.query(columna).filter(columna.in_(ids))}
+
+
+def _insertar_con_ids(filas):
+    tabla = Calzado.__table__
+    if not filas:
+        return []
+
+    # Con RETURNING ordenado (SQLite, MariaDB, PostgreSQL) alcanza un solo executemany.
+    if db.engine.dialect.insert_executemany_returning_sort_by_parameter_order:
+        resultado = db.session.execute(
+            insert(tabla).returning(tabla.c.id_calzado, sort_by_parameter_order=True), filas
+        )
+        return list(resultado.scalars())
+
+    # MySQL no tiene RETURNING: un solo INSERT de varias filas. Es un "simple insert"
+    # (InnoDB conoce la cantidad de filas de antemano), asi que los ids que genera son
+    # consecutivos y LAST_INSERT_ID() es el de la primera fila.
+    if db.engine.dialect.name == 'mysql':
+        resultado = db.session.execute(insert(tabla).values(filas))
+        paso = db.session.execute(text('SELECT @@auto_increment_increment')).scalar()
+        return [resultado.lastrowid + i * paso for i in range(len(filas))]
+
+    return [db.session.execute(insert(tabla), fila).inserted_primary_key[0] for fila in filas]
+
+
+def _insertar(aceptadas):
+    sin_colores = [v['valores'] for _, v in aceptadas if not v['colores']]
+    con_colores = [v for _, v in aceptadas if v['colores']]
+
+    if sin_colores:
+        db.session.execute(insert(Calzado.__table__), sin_colores)
+
+    ids = _insertar_con_ids([v['valores'] for v in con_colores])
+    enlaces = [
+        {'id_calzado': id_calzado, 'id_color': id_color}
+        for id_calzado, valida in zip(ids, con_colores)
+        for id_color in valida['colores']
+    ]
+    if enlaces:
+        db.session.execute(insert(calzado_color), enlaces)
+
+
+def _insertar_de_a_una(aceptadas, resumen):
+    # Cuando el lote falla en la base se reintenta cada fila en su propio savepoint:
+    # solo se informan las filas que fallan y el resto se guarda igual
+    insertadas = []
+    for indice, valida in aceptadas:
+        try:
+            with db.session.begin_nested():
+                _insertar([(indice, valida)])
+            insertadas.append(indice)
+        except Exception as e:
+            _registrar_error(resumen, indice, str(e))
+
+    try:
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        for indice in insertadas:
+            _registrar_error(resumen, indice, str(e))
+        return
+
+    resumen['insertados'] += len(insertadas)
+
+
+def _registrar_error(resumen, indice, error):
+    resumen['total_errores'] += 1
+    if len(resumen['errores']) < MAXIMO_ERRORES_INFORMADOS:
+        resumen['errores'].append({'indice': indice, 'error': error})
+
+
+def _procesar_lote(lote, resumen):
+    validas = []
+    for indice, fila in lote:
+        try:
+            validas.append((indice, _normalizar_fila(fila)))
+        except FilaInvalida as e:
+            _registrar_error(resumen, indice, str(e))
+
+    # Una consulta IN por tabla para validar todas las claves foraneas del lote
+    existentes = {
+        campo: _existentes(columna, (v['valores'][campo] for _, v in validas))
+        for campo, (columna, _) in CLAVES_FORANEAS.items()
+    }
+    existentes['id_colores'] = _existentes(Color.id_color, (c for _, v in validas for c in v['colores']))
+
+    aceptadas = []
+    for indice, valida in validas:
+        error = None
+        for campo, (_, mensaje) in CLAVES_FORANEAS.items():
+            valor = valida['valores'][campo]
+            if valor is not None and valor not in existentes[campo]:
+                error = mensaje
+                break
+        if error is None:
+            faltante = next((c for c in valida['colores'] if c not in existentes['id_colores']), None)
+            if faltante is not None:
+                error = f'Color con ID {faltante} no encontrado'
+
+        if error is None:
+            aceptadas.append((indice, valida))
+        else:
+            _registrar_error(resumen, indice, error)
+
+    if not aceptadas:
+        return
+
+    try:
+        _insertar(aceptadas)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        _insertar_de_a_una(aceptadas, resumen)
+        return
+
+    resumen['insertados'] += len(aceptadas)
+
+
+def cargar_calzados(filas):
+    # Procesa las filas en lotes de TAMANO_LOTE con un commit por lote: un lote que
+    # falla en la base no deshace los anteriores.
+    resumen = {'insertados': 0, 'total_errores': 0, 'errores': []}
+    lote = []
+
+    for indice, fila in filas:
+        lote.append((indice, fila))
+        if len(lote) >= TAMANO_LOTE:
+            _procesar_lote(lote, resumen)
+            lote = []
+    if lote:
+        _procesar_lote(lote, resumen)
+
+    resumen['errores'].sort(key=lambda error: error['indice'])
+    return resumen
@@ -0,0 +1,176 @@
+import hashlib
+import os
+import threading
+import time
+import unicodedata
+
+from flask import Response, abort, json, jsonify, request
+
+from models import Categoria, Color, Cuadrante, FormaGeometrica, Marca, Modelo
+
+TABLAS = {
+    'marca': (Marca, 'id_marca'),
+    'modelo': (Modelo, 'id_modelo'),
+    'categoria': (Categoria, 'id_categoria'),
+    'color': (Color, 'id_color'),
+    'forma': (FormaGeometrica, 'id_forma'),
+    'cuadrante': (Cuadrante, 'id_cuadrante'),
+}
+
+# Cada worker tiene su propia copia; los cambios hechos por otro proceso se ven
+# como mucho despues de este tiempo.
+SEGUNDOS_DE_VIDA = int(os.getenv('CATALOGO_TTL', '60'))
+
+
+def normalizar(texto):
+    # Igual que la collation de MySQL (utf8mb4_0900_ai_ci): sin mayusculas ni acentos
+    texto = unicodedata.normalize('NFKD', (texto or '').strip().casefold())
+    return ''.join(c for c in texto if not unicodedata.combining(c))
+
+
+class IdInvalido(ValueError):
+
+    def __init__(self, valor):
+        super().__init__(f'ID inválido: {valor!r}')
+        self.valor = valor
+
+
+def a_id(valor):
+    # Los ids llegan del JSON o de la query string como int o como texto ("3"); las
+    # claves del cache son int
+    if isinstance(valor, bool):
+        raise IdInvalido(valor)
+    try:
+        entero = int(valor)
+    except (TypeError, ValueError):
+        raise IdInvalido(valor)
+    if isinstance(valor, float) and valor != entero:
+        raise IdInvalido(valor)
+    return entero
+
+
+class _Tabla:
+
+    def __init__(self, filas, clave):
+        self.filas = filas
+        self.por_id = {fila[clave]: fila for fila in filas}
+        self.por_nombre = {normalizar(fila['nombre']): fila[clave] for fila in filas}
+        contenido = json.dumps(filas).encode('utf-8')
+        self.etag = hashlib.sha1(contenido).hexdigest()[:16]
+        self.cargada_en = time.monotonic()
+
+
+class CacheCatalogo:
+    # Cache de lectura de las tablas de catalogo. Los handlers que escriben llaman a
+    # invalidar(); el contador de version evita guardar una lectura que empezo antes
+    # de una invalidacion.
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tablas = {}
+        self._versiones = {tabla: 0 for tabla in TABLAS}
+
+    def _obtener(self, tabla):
+        cacheada = self._tablas.get(tabla)
+        if cacheada is not None and time.monotonic() - cacheada.cargada_en < SEGUNDOS_DE_VIDA:
+            return cacheada
+
+        with self._lock:
+            version = self._versiones[tabla]
+
+        modelo, clave = TABLAS[tabla]
+        filas = [fila.to_dict() for fila in modelo.query.order_by(getattr(modelo, clave)).all()]
+        cargada = _Tabla(filas, clave)
+
+        with self._lock:
+            if self._versiones[tabla] == version:
+                self._tablas[tabla] = cargada
+        return cargada
+
+    def version(self, tabla):
+        return self._versiones[tabla]
+
+    def invalidar(self, *tablas):
+        with self._lock:
+            for tabla in tablas or TABLAS:
+                self._versiones[tabla] += 1
+                self._tablas.pop(tabla, None)
+
+    def precargar(self):
+        for tabla in TABLAS:
+            self._obtener(tabla)
+
+    def filas(self, tabla):
+        return self._obtener(tabla).filas
+
+    def por_id(self, tabla, id_fila):
+        return self._obtener(tabla).por_id.get(id_fila)
+
+    def existe(self, tabla, id_fila):
+        # Lanza IdInvalido si id_fila no es un entero
+        id_fila = a_id(id_fila)
+        if id_fila in self._obtener(tabla).por_id:
+            return True
+
+        # Un id desconocido puede haberse creado en otro worker: se confirma en la base
+        modelo, _ = TABLAS[tabla]
+        if modelo.query.get(id_fila) is None:
+            return False
+        self.invalidar(tabla)
+        return True
+
+    def faltantes(self, tabla, ids):
+        # Como existe() pero para varios ids: los que no estan en el cache se
+        # confirman en la base con un solo IN. Devuelve los que no existen.
+        por_id = self._obtener(tabla).por_id
+        desconocidos = {i for i in map(a_id, ids) if i not in por_id}
+        if not desconocidos:
+            return set()
+
+        modelo, clave = TABLAS[tabla]
+        columna = getattr(modelo, clave)
+        encontrados = {valor for (valor,) in modelo.query.with_entities(columna).filter(columna.in_(desconocidos))}
+        if encontrados:
+            self.invalidar(tabla)
+        return desconocidos - encontrados
+
+    def id_por_nombre(self, tabla, nombre):
+        return self._obtener(tabla).por_nombre.get(normalizar(nombre))
+
+    def ids_que_contienen(self, tabla, texto):
+        # Equivalente a nombre ILIKE '%texto%'
+        buscado = normalizar(texto)
+        return [id_fila for nombre, id_fila in self._obtener(tabla).por_nombre.items() if buscado in nombre]
+
+    def etag(self, tabla):
+        return self._obtener(tabla).etag
+
+    def listado(self, tabla):
+        # Filas y ETag de la misma carga (pedirlos por separado puede mezclar dos)
+        cargada = self._obtener(tabla)
+        return cargada.filas, cargada.etag
+
+
+catalogo = CacheCatalogo()
+
+
+def respuesta_listado(tabla):
+    filas, etag = catalogo.listado(tabla)
+    if request.if_none_match.contains_weak(etag):
+        respuesta = Response(status=304)
+    else:
+        respuesta = jsonify(filas)
+    respuesta.set_etag(etag)
+    return respuesta
+
+
+def respuesta_por_id(tabla, id_fila):
+    fila = catalogo.por_id(tabla, id_fila)
+    if fila is None:
+        modelo, _ = TABLAS[tabla]
+        encontrada = modelo.query.get(id_fila)
+        if encontrada is None:
+            abort(404)
+        catalogo.invalidar(tabla)
+        fila = encontrada.to_dict()
+    return jsonify(fila)
@@ -0,0 +1,168 @@
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from models import db
+from services.reportes import generar_pdf
+
+DIRECTORIO = os.getenv('REPORTES_DIR', os.path.join(tempfile.gettempdir(), 'reportes_calzados'))
+TRABAJADORES = int(os.getenv('REPORTES_WORKERS', '2'))
+MAXIMO_PENDIENTES = int(os.getenv('REPORTES_MAX_PENDIENTES', '20'))
+SEGUNDOS_DE_VIDA = int(os.getenv('REPORTES_TTL', '3600'))
+# Un trabajo en cola o en proceso cuyo estado no se actualiza hace mas que esto
+# quedo huerfano: el worker que lo tenia se reinicio (max_requests) o murio (timeout)
+SEGUNDOS_SIN_AVANCE = int(os.getenv('REPORTES_MAX_SIN_AVANCE', '900'))
+
+PENDIENTE = 'pendiente'
+EN_PROCESO = 'en_proceso'
+TERMINADO = 'terminado'
+ERROR = 'error'
+
+_ID_VALIDO = re.compile(r'^[0-9a-f]{32}$')
+
+
+class ColaLlena(Exception):
+    pass
+
+
+class ColaReportes:
+    # El estado de cada trabajo se guarda como JSON en DIRECTORIO junto al PDF, asi
+    # cualquier worker del servidor puede responder la consulta de estado o la descarga.
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ejecutor = None
+        self._pendientes = 0
+
+    def _obtener_ejecutor(self):
+        # Se crea recien al primer uso para no arrancar hilos antes del fork de los workers
+        with self._lock:
+            if self._ejecutor is None:
+                os.makedirs(DIRECTORIO, exist_ok=True)
+                self._ejecutor = ThreadPoolExecutor(max_workers=TRABAJADORES, thread_name_prefix='reportes')
+            return self._ejecutor
+
+    def _ruta(self, id_reporte, extension):
+        return os.path.join(DIRECTORIO, f'{id_reporte}.{extension}')
+
+    def _guardar_estado(self, estado):
+        estado['actualizado_en'] = time.time()
+        ruta = self._ruta(estado['id'], 'json')
+        temporal = ruta + '.tmp'
+        with open(temporal, 'w', encoding='utf-8') as archivo:
+            json.dump(estado, archivo)
+        os.replace(temporal, ruta)
+
+    def _leer_estado(self, id_reporte):
+        try:
+            with open(self._ruta(id_reporte, 'json'), encoding='utf-8') as archivo:
+                return json.load(archivo)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def estado(self, id_reporte):
+        if not _ID_VALIDO.match(id_reporte):
+            return None
+        estado = self._leer_estado(id_reporte)
+        if estado is not None and self._abandonado(estado):
+            estado.update(
+                estado=ERROR, error='El reporte se interrumpió, vuelva a solicitarlo', terminado_en=time.time()
+            )
+            self._guardar_estado(estado)
+            for extension in ('pdf', 'pdf.tmp'):
+                try:
+                    os.remove(self._ruta(id_reporte, extension))
+                except FileNotFoundError:
+                    pass
+        return estado
+
+    def _abandonado(self, estado):
+        if estado['estado'] not in (PENDIENTE, EN_PROCESO):
+            return False
+        return time.time() - estado.get('actualizado_en', estado['creado_en']) > SEGUNDOS_SIN_AVANCE
+
+    def ruta_pdf(self, id_reporte):
+        return self._ruta(id_reporte, 'pdf')
+
+    def encolar(self, app, criterios):
+        ejecutor = self._obtener_ejecutor()
+        with self._lock:
+            if self._pendientes >= MAXIMO_PENDIENTES:
+                raise ColaLlena('Hay demasiados reportes en cola, intente nuevamente en unos minutos')
+            self._pendientes += 1
+
+        estado = {
+            'id': uuid.uuid4().hex,
+            'estado': PENDIENTE,
+            'progreso': 0,
+            'criterios': criterios,
+            'creado_en': time.time(),
+            'error': None
+        }
+        self._guardar_estado(estado)
+        self._limpiar_vencidos()
+
+        ejecutor.submit(self._ejecutar, app, dict(estado))
+        return estado
+
+    def _ejecutar(self, app, estado):
+        pdf = self.ruta_pdf(estado['id'])
+        temporal = pdf + '.tmp'
+        ultimo_guardado = [0.0]
+
+        def progreso(hechas, total):
+            # Se escribe el estado como maximo una vez por segundo
+            ahora = time.monotonic()
+            if total and ahora - ultimo_guardado[0] >= 1:
+                ultimo_guardado[0] = ahora
+                estado['progreso'] = min(99, int(hechas * 100 / total))
+                self._guardar_estado(estado)
+
+        try:
+            with app.app_context():
+                estado['estado'] = EN_PROCESO
+                self._guardar_estado(estado)
+                try:
+                    generar_pdf(estado['criterios'], temporal, progreso)
+                finally:
+                    db.session.remove()
+
+            os.replace(temporal, pdf)
+            estado.update(estado=TERMINADO, progreso=100, terminado_en=time.time())
+            self._guardar_estado(estado)
+        except Exception as e:
+            app.logger.exception('Error al generar el reporte %s', estado['id'])
+            estado.update(estado=ERROR, error=str(e), terminado_en=time.time())
+            self._guardar_estado(estado)
+            if os.path.exists(temporal):
+                os.remove(temporal)
+        finally:
+            with self._lock:
+                self._pendientes -= 1
+
+    def _limpiar_vencidos(self):
+        # Borra los archivos de reportes de mas de SEGUNDOS_DE_VIDA, tambien los .tmp
+        # que dejo una escritura interrumpida, salvo los de trabajos que siguen en
+        # cola o en proceso y siguen avanzando
+        limite = time.time() - SEGUNDOS_DE_VIDA
+        for nombre in os.listdir(DIRECTORIO):
+            id_reporte = nombre.split('.', 1)[0]
+            ruta = os.path.join(DIRECTORIO, nombre)
+            try:
+                if not _ID_VALIDO.match(id_reporte) or os.path.getmtime(ruta) >= limite:
+                    continue
+                estado = self._leer_estado(id_reporte)
+                if estado is not None and estado['estado'] in (PENDIENTE, EN_PROCESO) \
+                        and not self._abandonado(estado):
+                    continue
+                os.remove(ruta)
+            except OSError:
+                pass
+
+
+cola_reportes = ColaReportes()
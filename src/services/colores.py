@@ -0,0 +1,55 @@
+from sqlalchemy import delete, insert, select
+
+from models import db
+from models.calzado import calzado_color
+from services.catalogo import catalogo
+
+
+class ColorInexistente(ValueError):
+
+    def __init__(self, id_color):
+        super().__init__(f'Color con ID {id_color} no encontrado')
+        self.id_color = id_color
+
+
+def _ids_de_color(ids_colores):
+    ids = []
+    for id_color in ids_colores or []:
+        try:
+            ids.append(int(id_color))
+        except (TypeError, ValueError):
+            raise ColorInexistente(id_color)
+    return list(dict.fromkeys(ids))
+
+
+def asignar_colores(id_calzado, ids_colores, nuevo=False):
+    # Deja al calzado con exactamente `ids_colores`. Los ids se validan juntos contra el
+    # catalogo y en calzado_color solo se borra y se inserta la diferencia, cada una en
+    # una sentencia. Con nuevo=True no se leen los colores actuales (no tiene).
+    # No actualiza la coleccion calzado.colores ya cargada: se relee despues del commit.
+    pedidos = _ids_de_color(ids_colores)
+    faltantes = catalogo.faltantes('color', pedidos)
+    if faltantes:
+        raise ColorInexistente(next(i for i in pedidos if i in faltantes))
+
+    actuales = set()
+    if not nuevo:
+        actuales = set(db.session.scalars(
+            select(calzado_color.c.id_color).where(calzado_color.c.id_calzado == id_calzado)
+        ))
+
+    quitar = actuales.difference(pedidos)
+    agregar = [id_color for id_color in pedidos if id_color not in actuales]
+
+    if quitar:
+        db.session.execute(
+            delete(calzado_color).where(
+                calzado_color.c.id_calzado == id_calzado,
+                calzado_color.c.id_color.in_(quitar)
+            )
+        )
+    if agregar:
+        db.session.execute(
+            insert(calzado_color),
+            [{'id_calzado': id_calzado, 'id_color': id_color} for id_color in agregar]
+        )
@@ -0,0 +1,185 @@
+import hashlib
+import zlib
+
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:  # sin brotli solo se ofrece zstd y gzip
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Por debajo de esto comprimir no ahorra nada (los headers pesan mas que la ganancia)
+MINIMO_BYTES = 1024
+MIMETYPES_COMPRIMIBLES = {
+    'application/json',
+    'application/x-ndjson',
+    'application/msgpack',
+    'application/javascript',
+    'image/svg+xml',
+}
+
+
+class _Gzip:
+    def __init__(self, nivel=6):
+        # wbits=31: formato gzip (header y crc), no zlib crudo
+        self._compresor = zlib.compressobj(nivel, zlib.DEFLATED, 31)
+
+    def comprimir(self, datos):
+        return self._compresor.compress(datos) + self._compresor.flush(zlib.Z_SYNC_FLUSH)
+
+    def terminar(self):
+        return self._compresor.flush()
+
+
+class _Brotli:
+    def __init__(self, nivel=5):
+        self._compresor = brotli.Compressor(quality=nivel)
+
+    def comprimir(self, datos):
+        return self._compresor.process(datos) + self._compresor.flush()
+
+    def terminar(self):
+        return self._compresor.finish()
+
+
+class _Zstd:
+    def __init__(self, nivel=6):
+        self._compresor = zstandard.ZstdCompressor(level=nivel).compressobj()
+
+    def comprimir(self, datos):
+        return self._compresor.compress(datos) + self._compresor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def terminar(self):
+        return self._compresor.flush()
+
+
+# Content-Encoding -> (compresor, nivel para respuestas precomprimidas), en orden de
+# preferencia del servidor cuando el cliente acepta varias con la misma q. Con los
+# niveles por defecto, sobre GET /calzados/ (1k filas, 225 KB) zstd y brotli dejan
+# un cuerpo mas chico que gzip 6 en menos tiempo.
+CODIFICACIONES = {}
+if zstandard is not None:
+    CODIFICACIONES['zstd'] = (_Zstd, 19)
+if brotli is not None:
+    CODIFICACIONES['br'] = (_Brotli, 11)
+CODIFICACIONES['gzip'] = (_Gzip, 9)
+
+
+def comprimir(datos, codificacion, nivel=None):
+    clase, _ = CODIFICACIONES[codificacion]
+    compresor = clase() if nivel is None else clase(nivel)
+    return compresor.comprimir(datos) + compresor.terminar()
+
+
+def elegir_codificacion():
+    # La que prefiera el cliente segun Accept-Encoding; None si no acepta ninguna
+    return request.accept_encodings.best_match(list(CODIFICACIONES))
+
+
+def _comprimible(respuesta):
+    return (
+        200 <= respuesta.status_code < 300
+        and respuesta.status_code not in (204, 206)
+        and request.method != 'HEAD'
+        and 'Content-Encoding' not in respuesta.headers
+        and (respuesta.mimetype in MIMETYPES_COMPRIMIBLES or respuesta.mimetype.startswith('text/'))
+    )
+
+
+def _comprimir_stream(original, partes, compresor):
+    # Si el cliente corta la conexion se cierra tambien el iterable original (el
+    # generador de stream_with_context libera ahi su contexto de peticion)
+    try:
+        for parte in partes:
+            comprimida = compresor.comprimir(parte)
+            if comprimida:
+                yield comprimida
+        yield compresor.terminar()
+    finally:
+        if hasattr(original, 'close'):
+            original.close()
+
+
+def _debilitar_etag(respuesta):
+    # El ETag identifica la representacion sin comprimir; con otra codificacion solo
+    # puede usarse como ETag debil (las comparaciones de If-None-Match son debiles)
+    etag, debil = respuesta.get_etag()
+    if etag and not debil:
+        respuesta.set_etag(etag, weak=True)
+
+
+def instalar_compresion(app, minimo=MINIMO_BYTES):
+    # Comprime las respuestas de texto/JSON/MessagePack con zstd, brotli o gzip segun
+    # Accept-Encoding. Las respuestas en streaming (NDJSON, CSV) se comprimen por
+    # partes a medida que se envian, sin esperar el cuerpo completo.
+
+    @app.after_request
+    def _comprimir_respuesta(respuesta):
+        if not _comprimible(respuesta):
+            return respuesta
+        respuesta.vary.add('Accept-Encoding')
+
+        codificacion = elegir_codificacion()
+        if codificacion is None:
+            return respuesta
+
+        if respuesta.is_streamed:
+            clase, _ = CODIFICACIONES[codificacion]
+            respuesta.response = _comprimir_stream(respuesta.response, respuesta.iter_encoded(), clase())
+            respuesta.direct_passthrough = False
+            respuesta.headers.pop('Content-Length', None)
+        else:
+            datos = respuesta.get_data()
+            if len(datos) < minimo:
+                return respuesta
+            respuesta.set_data(comprimir(datos, codificacion))
+
+        respuesta.headers['Content-Encoding'] = codificacion
+        _debilitar_etag(respuesta)
+        return respuesta
+
+
+class Precomprimida:
+    # Cuerpo fijo (la especificacion de swagger) comprimido una sola vez con el nivel
+    # maximo de cada codificacion; despues cada peticion solo elige la variante.
+
+    def __init__(self, datos, mimetype):
+        self.mimetype = mimetype
+        self.etag = hashlib.sha1(datos).hexdigest()[:16]
+        self.variantes = {None: datos}
+        for codificacion, (_, nivel) in CODIFICACIONES.items():
+            self.variantes[codificacion] = comprimir(datos, codificacion, nivel)
+
+    def respuesta(self):
+        codificacion = elegir_codificacion()
+        if request.if_none_match.contains_weak(self.etag):
+            respuesta = current_app.response_class(status=304)
+        else:
+            respuesta = current_app.response_class(self.variantes[codificacion], mimetype=self.mimetype)
+        if codificacion is not None:
+            respuesta.headers['Content-Encoding'] = codificacion
+        respuesta.set_etag(self.etag, weak=codificacion is not None)
+        respuesta.vary.add('Accept-Encoding')
+        return respuesta
+
+
+def servir_precomprimida(app, endpoint):
+    # Reemplaza la vista por una que arma el cuerpo la primera vez y despues sirve la
+    # variante precomprimida que corresponda
+    vista = app.view_functions[endpoint]
+    guardada = []
+
+    def vista_precomprimida(*args, **kwargs):
+        if not guardada:
+            original = current_app.make_response(vista(*args, **kwargs))
+            if original.status_code != 200:
+                return original
+            guardada.append(Precomprimida(original.get_data(), original.mimetype))
+        return guardada[0].respuesta()
+
+    app.view_functions[endpoint] = vista_precomprimida
@@ -0,0 +1,99 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as EsperaVencida
+
+import bcrypt
+
+from services.metricas import BCRYPT_RECHAZADOS, DURACION_BCRYPT
+
+# bcrypt se calcula en un pool de procesos por worker de gunicorn: el hilo de la
+# peticion solo espera el resultado. Con BCRYPT_WORKERS=0 se calcula en el mismo hilo.
+# Los tamaños salen de las mismas variables que lee gunicorn.conf.py.
+WORKERS_GUNICORN = int(os.getenv('GUNICORN_WORKERS', str(os.cpu_count() or 1)))
+HILOS_POR_WORKER = int(os.getenv('GUNICORN_THREADS', '4'))
+# Entre todos los workers, un proceso de bcrypt por nucleo
+TRABAJADORES = int(os.getenv('BCRYPT_WORKERS', str(max(1, (os.cpu_count() or 1) // WORKERS_GUNICORN))))
+# Cada hilo de peticion espera como maximo un calculo: el limite tiene que ser menor
+# que los hilos del worker para que alguna vez se alcance. Con la mitad, los logins
+# en cola nunca ocupan todos los hilos y el resto de los endpoints sigue atendiendo.
+MAXIMO_PENDIENTES = int(os.getenv('BCRYPT_MAX_PENDIENTES', str(max(1, HILOS_POR_WORKER // 2))))
+SEGUNDOS_DE_ESPERA = float(os.getenv('BCRYPT_TIMEOUT', '10'))
+
+
+class BcryptSaturado(Exception):
+    pass
+
+
+class PoolBcrypt:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ejecutor = None
+        self._pendientes = 0
+
+    def _obtener_ejecutor(self):
+        # Se crea al primer uso (despues del fork de los workers). spawn en lugar de
+        # fork: el worker tiene hilos y un fork podria heredar locks tomados.
+        with self._lock:
+            if self._ejecutor is None:
+                self._ejecutor = ProcessPoolExecutor(
+                    max_workers=TRABAJADORES,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._ejecutor
+
+    def ejecutar(self, funcion, *args):
+        if TRABAJADORES <= 0:
+            return funcion(*args)
+
+        # Limite de cola: si hay demasiados calculos esperando se rechaza enseguida
+        # en lugar de acumular peticiones que igual van a vencer
+        with self._lock:
+            if self._pendientes >= MAXIMO_PENDIENTES:
+                BCRYPT_RECHAZADOS.inc()
+                raise BcryptSaturado('Demasiados inicios de sesión en curso, intente nuevamente')
+            self._pendientes += 1
+        try:
+            futuro = self._obtener_ejecutor().submit(funcion, *args)
+        except Exception:
+            self._terminado(None)
+            raise
+
+        # Un calculo sigue ocupando el pool hasta que termina, aunque ya nadie lo espere
+        futuro.add_done_callback(self._terminado)
+        try:
+            return futuro.result(timeout=SEGUNDOS_DE_ESPERA)
+        except EsperaVencida:
+            # Si todavia no habia empezado no se llega a calcular
+            futuro.cancel()
+            raise BcryptSaturado('El inicio de sesión tardó demasiado, intente nuevamente')
+
+    def _terminado(self, futuro):
+        with self._lock:
+            self._pendientes -= 1
+
+    def pendientes(self):
+        return self._pendientes
+
+
+pool_bcrypt = PoolBcrypt()
+
+
+# Se envian las funciones de bcrypt directamente: el proceso hijo solo importa
+# bcrypt, no este modulo ni la app
+def verificar_password(password, password_hash):
+    inicio = time.perf_counter()
+    try:
+        return pool_bcrypt.ejecutar(bcrypt.checkpw, password.encode(), password_hash.encode())
+    finally:
+        DURACION_BCRYPT.labels('verificar').observe(time.perf_counter() - inicio)
+
+
+def hashear_password(password):
+    inicio = time.perf_counter()
+    try:
+        return pool_bcrypt.ejecutar(bcrypt.hashpw, password.encode(), bcrypt.gensalt()).decode('utf-8')
+    finally:
+        DURACION_BCRYPT.labels('hashear').observe(time.perf_counter() - inicio)
@@ -0,0 +1,158 @@
+import csv
+import io
+import numbers
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+from services.busqueda import figuras_de
+
+COLUMNAS = ['ID', 'Marca', 'Modelo', 'Categoría', 'Talle', 'Ancho', 'Alto', 'Tipo Registro', 'Colores', 'Figuras']
+
+TAMANO_BLOQUE = 64 * 1024
+FILAS_POR_BLOQUE_CSV = 500
+
+
+def fila_exportacion(c):
+    figuras = [f"{figura['cuadrante']}: {figura['forma']}" for figura in figuras_de(c)]
+
+    return [
+        c.id_calzado,
+        c.marca.nombre if c.marca else None,
+        c.modelo.nombre if c.modelo else None,
+        c.categoria.nombre if c.categoria else None,
+        c.talle,
+        c.ancho,
+        c.alto,
+        c.tipo_registro,
+        ", ".join(color.nombre for color in c.colores),
+        "; ".join(figuras)
+    ]
+
+
+def generar_csv(filas):
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    # BOM para que Excel abra el archivo como UTF-8
+    buffer.write('﻿')
+    escritor.writerow(COLUMNAS)
+
+    pendientes = 0
+    for fila in filas:
+        escritor.writerow(fila)
+        pendientes += 1
+        if pendientes >= FILAS_POR_BLOQUE_CSV:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pendientes = 0
+
+    yield buffer.getvalue()
+
+
+class _SalidaPorBloques:
+    # Destino de escritura para ZipFile sin seek/tell: zipfile lo detecta y escribe
+    # cada archivo con data descriptor, asi el .xlsx se puede enviar mientras se arma.
+
+    def __init__(self):
+        self._bloques = []
+        self.tamano = 0
+
+    def write(self, datos):
+        self._bloques.append(bytes(datos))
+        self.tamano += len(datos)
+        return len(datos)
+
+    def flush(self):
+        pass
+
+    def vaciar(self):
+        datos = b''.join(self._bloques)
+        self._bloques = []
+        self.tamano = 0
+        return datos
+
+
+_CARACTERES_INVALIDOS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+_PARTES_XLSX = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Calzados" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+_INICIO_HOJA = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_FIN_HOJA = '</sheetData></worksheet>'
+
+
+def _celda(valor):
+    if valor is None:
+        return '<c/>'
+    if isinstance(valor, bool) or not isinstance(valor, numbers.Number):
+        texto = escape(_CARACTERES_INVALIDOS.sub('', str(valor)))
+        return f'<c t="inlineStr"><is><t xml:space="preserve">{texto}</t></is></c>'
+    return f'<c><v>{valor}</v></c>'
+
+
+def _fila_xml(valores):
+    return ('<row>' + ''.join(_celda(valor) for valor in valores) + '</row>').encode('utf-8')
+
+
+def generar_xlsx(filas):
+    # Escribe un .xlsx minimo (una hoja, textos inline, sin estilos) directamente en
+    # la respuesta: la memoria usada no depende de la cantidad de filas.
+    salida = _SalidaPorBloques()
+    with zipfile.ZipFile(salida, 'w', compression=zipfile.ZIP_DEFLATED) as libro:
+        for nombre, contenido in _PARTES_XLSX.items():
+            libro.writestr(nombre, contenido)
+
+        with libro.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as hoja:
+            hoja.write(_INICIO_HOJA.encode('utf-8'))
+            hoja.write(_fila_xml(COLUMNAS))
+            for fila in filas:
+                hoja.write(_fila_xml(fila))
+                if salida.tamano >= TAMANO_BLOQUE:
+                    yield salida.vaciar()
+            hoja.write(_FIN_HOJA.encode('utf-8'))
+
+    yield salida.vaciar()
+
+
+FORMATOS = {
+    'csv': (generar_csv, 'text/csv; charset=utf-8'),
+    'xlsx': (generar_xlsx, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+}
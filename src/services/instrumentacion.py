@@ -0,0 +1,100 @@
+import logging
+import time
+
+from flask import g, has_app_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Una sentencia que se repite al menos UMBRAL_N1 veces en la misma peticion con
+# parametros distintos se reporta como posible N+1 (un bucle que consulta por fila)
+UMBRAL_N1 = 5
+# Las cargas por lotes no son N+1: las de selectinload pasan muchos ids en un IN y
+# las de iterar_por_lotes se marcan con execution_options(por_lotes=True)
+MAXIMO_PARAMETROS_POR_FILA = 20
+
+
+class ConsultasPeticion:
+    # Lo que se acumula durante una peticion. Por sentencia se guarda
+    # [veces, parametros de la primera ejecucion, si hubo parametros distintos].
+    __slots__ = ('cantidad', 'segundos', 'por_sentencia')
+
+    def __init__(self):
+        self.cantidad = 0
+        self.segundos = 0.0
+        self.por_sentencia = {}
+
+    def registrar(self, sentencia, parametros, segundos, por_lotes=False):
+        self.cantidad += 1
+        self.segundos += segundos
+        if por_lotes or len(parametros) > MAXIMO_PARAMETROS_POR_FILA:
+            return
+        datos = self.por_sentencia.get(sentencia)
+        if datos is None:
+            self.por_sentencia[sentencia] = [1, parametros, False]
+        else:
+            datos[0] += 1
+            if not datos[2] and parametros != datos[1]:
+                datos[2] = True
+
+    def repetidas(self, umbral):
+        return [
+            (veces, sentencia)
+            for sentencia, (veces, _, distintos) in self.por_sentencia.items()
+            if distintos and veces >= umbral
+        ]
+
+
+def _consultas_actuales():
+    # Fuera de una peticion (CLI, migraciones, calentar) no se mide nada
+    if not has_app_context():
+        return None
+    return g.get('_consultas')
+
+
+# El inicio se guarda en el contexto de ejecucion de la sentencia: si falla,
+# after_cursor_execute no se llama y el valor se descarta con el contexto, sin
+# quedar en la conexion del pool para la consulta siguiente.
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _antes_de_ejecutar(conexion, cursor, sentencia, parametros, contexto, executemany):
+    if contexto is not None:
+        contexto._inicio_consulta = time.perf_counter()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _despues_de_ejecutar(conexion, cursor, sentencia, parametros, contexto, executemany):
+    inicio = getattr(contexto, '_inicio_consulta', None)
+    if inicio is None:
+        return
+    consultas = _consultas_actuales()
+    if consultas is not None:
+        por_lotes = executemany or (contexto is not None and contexto.execution_options.get('por_lotes', False))
+        consultas.registrar(sentencia, parametros or (), time.perf_counter() - inicio, por_lotes)
+
+
+def instalar_instrumentacion(app, umbral_n1=UMBRAL_N1):
+    # Cuenta consultas y tiempo de base de datos por peticion. Lo informa en el header
+    # Server-Timing (visible en la pestaña Network del navegador) y avisa en el log
+    # de los posibles N+1.
+
+    @app.before_request
+    def _iniciar_medicion():
+        g._consultas = ConsultasPeticion()
+
+    @app.after_request
+    def _informar_consultas(respuesta):
+        consultas = g.pop('_consultas', None)
+        if consultas is None:
+            return respuesta
+
+        respuesta.headers.add(
+            'Server-Timing', f'db;dur={consultas.segundos * 1000:.2f}, sql;desc={consultas.cantidad}'
+        )
+        for veces, sentencia in consultas.repetidas(umbral_n1):
+            logger.warning(
+                'Posible N+1 en %s: la misma consulta se ejecuto %d veces con parametros distintos: %s',
+                request.endpoint, veces, ' '.join(sentencia.split())[:300]
+            )
+        return respuesta
@@ -0,0 +1,111 @@
+import os
+import time
+
+from flask import g, request
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest
+from sqlalchemy.pool import QueuePool
+
+from models import db
+
+# Metricas en formato Prometheus. Con gunicorn cada worker es un proceso: si esta
+# definida PROMETHEUS_MULTIPROC_DIR (gunicorn.conf.py la define) prometheus_client
+# guarda los valores en archivos de ese directorio y /metrics suma los de todos los
+# workers. Sin la variable (servidor de desarrollo) se usa el registro en memoria.
+
+DURACION_PETICION = Histogram(
+    'http_request_duration_seconds', 'Duracion de las peticiones HTTP',
+    ['blueprint', 'endpoint', 'method'],
+)
+PETICIONES = Counter(
+    'http_requests_total', 'Peticiones HTTP atendidas',
+    ['blueprint', 'endpoint', 'method', 'status'],
+)
+PETICIONES_EN_CURSO = Gauge(
+    'http_requests_in_progress', 'Peticiones HTTP en curso',
+    ['blueprint', 'endpoint'], multiprocess_mode='livesum',
+)
+
+POOL_EN_USO = Gauge('db_pool_checked_out', 'Conexiones del pool en uso', multiprocess_mode='livesum')
+POOL_TAMANO = Gauge('db_pool_size', 'Tamano configurado del pool', multiprocess_mode='livesum')
+POOL_OVERFLOW = Gauge('db_pool_overflow', 'Conexiones abiertas por encima de pool_size', multiprocess_mode='livesum')
+POOL_ESPERA = Histogram(
+    'db_pool_wait_seconds', 'Espera por una conexion libre del pool',
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10),
+)
+POOL_TIMEOUTS = Counter('db_pool_timeouts_total', 'Checkouts que vencieron esperando una conexion')
+
+DURACION_REPORTE = Histogram(
+    'report_render_duration_seconds', 'Tiempo de armado de los reportes PDF',
+    ['resultado'], buckets=(0.1, 0.5, 1, 2, 5, 10, 30, 60, 120, 300),
+)
+
+DURACION_BCRYPT = Histogram(
+    'bcrypt_duration_seconds', 'Tiempo de bcrypt, incluida la espera en el pool de procesos',
+    ['operacion'], buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 1, 2, 5, 10),
+)
+BCRYPT_RECHAZADOS = Counter('bcrypt_rejected_total', 'Calculos de bcrypt rechazados por cola llena')
+
+BUSQUEDA_CACHE = Counter('search_cache_requests_total', 'Consultas al cache de /calzados/buscar', ['resultado'])
+
+
+def registro_de_lectura():
+    # Registro con el que se arma la respuesta de /metrics
+    if 'PROMETHEUS_MULTIPROC_DIR' not in os.environ:
+        return REGISTRY
+    from prometheus_client import multiprocess
+
+    registro = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registro)
+    return registro
+
+
+def exponer():
+    return generate_latest(registro_de_lectura()), CONTENT_TYPE_LATEST
+
+
+def _etiquetas():
+    # 404 y 405 no tienen endpoint; se agrupan para no crear una serie por URL
+    return request.blueprint or 'app', request.endpoint or 'sin_ruta'
+
+
+def _medir_pool(pool):
+    if isinstance(pool, QueuePool):
+        POOL_EN_USO.set(pool.checkedout())
+        POOL_TAMANO.set(pool.size())
+        POOL_OVERFLOW.set(max(pool.overflow(), 0))
+
+
+def instalar_metricas(app):
+    # Latencia, cantidad y peticiones en curso por blueprint y endpoint; el estado
+    # del pool se actualiza al terminar cada peticion
+
+    @app.before_request
+    def _iniciar_peticion():
+        blueprint, endpoint = _etiquetas()
+        PETICIONES_EN_CURSO.labels(blueprint, endpoint).inc()
+        g._metricas = (time.perf_counter(), blueprint, endpoint)
+
+    @app.after_request
+    def _registrar_peticion(respuesta):
+        inicio = g.get('_metricas')
+        if inicio is not None:
+            _registrar(inicio, respuesta.status_code)
+            g._metricas_registradas = True
+        return respuesta
+
+    @app.teardown_request
+    def _terminar_peticion(error):
+        inicio = g.pop('_metricas', None)
+        if inicio is None:
+            return
+        # Una excepcion no manejada no pasa por after_request
+        if not g.pop('_metricas_registradas', False):
+            _registrar(inicio, 500)
+        PETICIONES_EN_CURSO.labels(inicio[1], inicio[2]).dec()
+        _medir_pool(db.engine.pool)
+
+
+def _registrar(inicio, status):
+    comienzo, blueprint, endpoint = inicio
+    DURACION_PETICION.labels(blueprint, endpoint, request.method).observe(time.perf_counter() - comienzo)
+    PETICIONES.labels(blueprint, endpoint, request.method, str(status)).inc()
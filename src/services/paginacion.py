@@ -0,0 +1,78 @@
+from flask import Response, json, request, stream_with_context
+
+LIMITE_POR_DEFECTO = 100
+LIMITE_MAXIMO = 1000
+TAMANO_LOTE = 500
+
+
+class ParametroInvalido(ValueError):
+    pass
+
+
+def leer_paginacion():
+    # Devuelve (after, limit). Si el cliente no pidio paginacion devuelve (None, None)
+    # para que los endpoints mantengan la respuesta original (lista completa).
+    after = request.args.get('after', '').strip()
+    limit = request.args.get('limit', '').strip()
+    if not after and not limit:
+        return None, None
+
+    try:
+        after = int(after) if after else 0
+        limit = int(limit) if limit else LIMITE_POR_DEFECTO
+    except ValueError:
+        raise ParametroInvalido('Los parámetros after y limit deben ser números enteros')
+
+    if limit < 1:
+        raise ParametroInvalido('El parámetro limit debe ser mayor a 0')
+
+    return after, min(limit, LIMITE_MAXIMO)
+
+
+def paginar_keyset(query, columna, after, limit, serializar):
+    # Se pide una fila de mas para saber si existe una pagina siguiente
+    filas = query.filter(columna > after).order_by(columna).limit(limit + 1).all()
+    hay_mas = len(filas) > limit
+    filas = filas[:limit]
+
+    return {
+        'items': [serializar(fila) for fila in filas],
+        'limit': limit,
+        'next_cursor': getattr(filas[-1], columna.key) if hay_mas else None
+    }
+
+
+def iterar_por_lotes(query, columna, after=0, limit=None, tamano_lote=TAMANO_LOTE):
+    # Recorre la consulta en lotes por keyset (WHERE columna > ultimo ORDER BY columna LIMIT n).
+    # Cada lote es una consulta independiente, asi la memoria no depende del tamaño
+    # de la tabla aunque el driver (mysqlconnector) bufferee el resultado completo.
+    ultimo = after or 0
+    restantes = limit
+    while restantes is None or restantes > 0:
+        tamano = tamano_lote if restantes is None else min(tamano_lote, restantes)
+        lote = query.filter(columna > ultimo).order_by(columna).limit(tamano).execution_options(por_lotes=True).all()
+        if not lote:
+            return
+
+        for fila in lote:
+            yield fila
+
+        ultimo = getattr(lote[-1], columna.key)
+        if restantes is not None:
+            restantes -= len(lote)
+        if len(lote) < tamano:
+            return
+
+
+def stream_ndjson(query, columna, serializar, after=0, limit=None):
+    def generar():
+        lineas = []
+        for fila in iterar_por_lotes(query, columna, after, limit):
+            lineas.append(json.dumps(serializar(fila)))
+            if len(lineas) >= TAMANO_LOTE:
+                yield '\n'.join(lineas) + '\n'
+                lineas = []
+        if lineas:
+            yield '\n'.join(lineas) + '\n'
+
+    return Response(stream_with_context(generar()), mimetype='application/x-ndjson')
@@ -0,0 +1,160 @@
+import threading
+
+from sqlalchemy import event, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models import db, DetalleSuela, PatronBit, Suela
+from models.patron_bit import CANTIDAD_MAXIMA_BITS
+
+_lock = threading.Lock()
+# Solo pares con el bit ya confirmado. Los que asigna una transaccion en curso
+# quedan en sesion.info['bits_pendientes'] hasta el commit: si se deshace, otro
+# proceso puede tomar el mismo bit para otro par.
+_bits = {}
+
+
+def _pendientes():
+    return db.session.info.setdefault('bits_pendientes', {})
+
+
+def _recargar():
+    # La lectura ve tambien las filas que esta transaccion agrego sin confirmar
+    global _bits
+    pendientes = _pendientes()
+    _bits = {
+        (p.id_cuadrante, p.id_forma): p.bit for p in PatronBit.query.all()
+        if (p.id_cuadrante, p.id_forma) not in pendientes
+    }
+
+
+def _marcar_suelas(par, bit):
+    # Un par que recibe bit despues de haber quedado sin uno ya puede estar en suelas
+    # guardadas: se les agrega el bit para que la mascara las encuentre
+    id_cuadrante, id_forma = par
+    suelas = db.session.query(DetalleSuela.id_suela).filter(
+        DetalleSuela.id_cuadrante == id_cuadrante, DetalleSuela.id_forma == id_forma
+    )
+    db.session.execute(
+        update(Suela)
+        .where(Suela.id_suela.in_(suelas))
+        .values(patron_bits=Suela.patron_bits.op('|')(1 << bit))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def asignar_bits(pares):
+    # Devuelve {(id_cuadrante, id_forma): bit} de los pares que tienen bit. Los que
+    # todavia no tienen toman los bits libres mas bajos (los que libero olvidar_forma
+    # se reutilizan). Si no alcanzan, los pares que sobran quedan sin bit: la
+    # escritura sigue y filtrar_busqueda los resuelve contra DetalleSuela.
+    pares = set(pares)
+    pendientes = _pendientes()
+    with _lock:
+        if not pares.issubset(_bits.keys() | pendientes.keys()):
+            _recargar()
+
+        faltantes = sorted(pares - _bits.keys() - pendientes.keys())
+        for intento in range(3):
+            if not faltantes:
+                break
+            usados = {bit for (bit,) in db.session.query(PatronBit.bit)}
+            libres = [bit for bit in range(CANTIDAD_MAXIMA_BITS) if bit not in usados]
+            nuevos = list(zip(faltantes, libres))
+            if not nuevos:
+                break
+
+            try:
+                with db.session.begin_nested():
+                    for (id_cuadrante, id_forma), bit in nuevos:
+                        db.session.add(PatronBit(id_cuadrante=id_cuadrante, id_forma=id_forma, bit=bit))
+                    db.session.flush()
+                    for par, bit in nuevos:
+                        _marcar_suelas(par, bit)
+                pendientes.update(nuevos)
+                break
+            except IntegrityError:
+                # Otro proceso tomo los mismos bits al mismo tiempo: se relee el mapa y se reintenta
+                _recargar()
+                faltantes = sorted(pares - _bits.keys() - pendientes.keys())
+
+        conocidos = {**_bits, **pendientes}
+        return {par: conocidos[par] for par in pares if par in conocidos}
+
+
+def calcular_patron(pares):
+    bits = asignar_bits(pares)
+    patron = 0
+    for bit in bits.values():
+        patron |= 1 << bit
+    return patron
+
+
+def mascara(id_cuadrante, ids_forma):
+    # Devuelve (mascara, ids de forma sin bit). Solo consulta el mapa; las formas sin
+    # bit en ese cuadrante hay que buscarlas en DetalleSuela.
+    with _lock:
+        if not all((id_cuadrante, id_forma) in _bits for id_forma in ids_forma):
+            _recargar()
+        bits = [_bits[(id_cuadrante, id_forma)] for id_forma in ids_forma if (id_cuadrante, id_forma) in _bits]
+        sin_bit = [id_forma for id_forma in ids_forma if (id_cuadrante, id_forma) not in _bits]
+
+    valor = 0
+    for bit in bits:
+        valor |= 1 << bit
+    return valor, sin_bit
+
+
+def olvidar_forma(id_forma):
+    # Libera los bits de la forma para que los tomen otros pares
+    PatronBit.query.filter_by(id_forma=id_forma).delete()
+    pendientes = _pendientes()
+    with _lock:
+        for mapa in (_bits, pendientes):
+            for par in [par for par in mapa if par[1] == id_forma]:
+                del mapa[par]
+
+
+def recalcular_patrones():
+    # Recalcula patron_bits de todas las suelas a partir de sus detalles
+    pares_por_suela = {}
+    for id_suela, id_cuadrante, id_forma in db.session.query(
+        DetalleSuela.id_suela, DetalleSuela.id_cuadrante, DetalleSuela.id_forma
+    ):
+        pares_por_suela.setdefault(id_suela, set()).add((id_cuadrante, id_forma))
+
+    todos = set()
+    for pares in pares_por_suela.values():
+        todos |= pares
+    bits = asignar_bits(todos)
+
+    actualizaciones = []
+    for (id_suela,) in db.session.query(Suela.id_suela):
+        patron = 0
+        for par in pares_por_suela.get(id_suela, ()):
+            if par in bits:
+                patron |= 1 << bits[par]
+        actualizaciones.append({'id_suela': id_suela, 'patron_bits': patron})
+
+    if actualizaciones:
+        db.session.execute(update(Suela), actualizaciones)
+    db.session.commit()
+    return len(actualizaciones)
+
+
+@event.listens_for(Session, 'after_commit')
+def _al_hacer_commit(sesion):
+    # Tambien se llama al liberar un savepoint: solo cuenta el commit de la transaccion
+    if sesion.in_nested_transaction():
+        return
+    pendientes = sesion.info.pop('bits_pendientes', None)
+    if pendientes:
+        with _lock:
+            _bits.update(pendientes)
+
+
+@event.listens_for(Session, 'after_transaction_end')
+def _al_terminar(sesion, transaccion):
+    # Si la transaccion se deshizo, los bits que asigno vuelven a estar libres
+    if transaccion.parent is None:
+        sesion.info.pop('bits_pendientes', None)
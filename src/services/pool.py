@@ -0,0 +1,131 @@
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as TimeoutPool
+from sqlalchemy.pool import QueuePool
+
+from services.metricas import POOL_ESPERA, POOL_TIMEOUTS
+
+# Cuantas esperas recientes se guardan para calcular percentiles
+MUESTRAS_ESPERA = 1000
+
+
+class MetricasPool:
+    # Contadores del pool de este proceso. Los alimentan los eventos del pool y
+    # PoolMedido (la espera por una conexion no tiene evento propio).
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self):
+        with self._lock:
+            self.conexiones_abiertas = 0
+            self.conexiones_cerradas = 0
+            self.checkouts = 0
+            self.checkins = 0
+            self.invalidadas = 0
+            self.timeouts = 0
+            self.esperas_medidas = 0
+            self.espera_total = 0.0
+            self.espera_maxima = 0.0
+            self.esperas = []
+            self.desde = time.time()
+
+    def sumar(self, contador):
+        with self._lock:
+            setattr(self, contador, getattr(self, contador) + 1)
+
+    def registrar_espera(self, segundos):
+        with self._lock:
+            self.esperas_medidas += 1
+            self.espera_total += segundos
+            self.espera_maxima = max(self.espera_maxima, segundos)
+            self.esperas.append(segundos)
+            if len(self.esperas) > MUESTRAS_ESPERA:
+                del self.esperas[:len(self.esperas) - MUESTRAS_ESPERA]
+
+    def resumen(self, pool=None):
+        with self._lock:
+            esperas = sorted(self.esperas)
+            datos = {
+                'conexiones_abiertas': self.conexiones_abiertas,
+                'conexiones_cerradas': self.conexiones_cerradas,
+                'checkouts': self.checkouts,
+                'checkins': self.checkins,
+                'invalidadas': self.invalidadas,
+                'timeouts': self.timeouts,
+                'espera_ms': {
+                    'promedio': round(self.espera_total * 1000 / self.esperas_medidas, 3) if self.esperas_medidas else 0.0,
+                    'p95': round(_percentil(esperas, 0.95) * 1000, 3),
+                    'maxima': round(self.espera_maxima * 1000, 3),
+                },
+                'desde': self.desde,
+            }
+
+        if isinstance(pool, QueuePool):
+            datos.update({
+                'tamano': pool.size(),
+                'en_uso': pool.checkedout(),
+                'libres': pool.checkedin(),
+                # overflow() es negativo mientras el pool no llego a pool_size
+                'overflow': max(pool.overflow(), 0),
+                'max_overflow': pool._max_overflow,
+                'timeout': pool.timeout(),
+            })
+        elif pool is not None:
+            datos['estado'] = pool.status()
+        return datos
+
+
+def _percentil(valores, fraccion):
+    if not valores:
+        return 0.0
+    return valores[min(len(valores) - 1, int(len(valores) * fraccion))]
+
+
+metricas_pool = MetricasPool()
+
+
+class PoolMedido(QueuePool):
+    # QueuePool que mide cuanto espera cada checkout por una conexion libre
+    # (incluye abrir una conexion nueva cuando hace falta).
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            return super()._do_get()
+        except TimeoutPool:
+            metricas_pool.sumar('timeouts')
+            POOL_TIMEOUTS.inc()
+            raise
+        finally:
+            espera = time.perf_counter() - inicio
+            metricas_pool.registrar_espera(espera)
+            POOL_ESPERA.observe(espera)
+
+
+@event.listens_for(PoolMedido, 'connect')
+def _al_conectar(conexion, registro):
+    metricas_pool.sumar('conexiones_abiertas')
+
+
+@event.listens_for(PoolMedido, 'close')
+def _al_cerrar(conexion, registro):
+    metricas_pool.sumar('conexiones_cerradas')
+
+
+@event.listens_for(PoolMedido, 'checkout')
+def _al_pedir(conexion, registro, proxy):
+    metricas_pool.sumar('checkouts')
+
+
+@event.listens_for(PoolMedido, 'checkin')
+def _al_devolver(conexion, registro):
+    metricas_pool.sumar('checkins')
+
+
+@event.listens_for(PoolMedido, 'invalidate')
+def _al_invalidar(conexion, registro, excepcion):
+    metricas_pool.sumar('invalidadas')
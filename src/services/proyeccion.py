@@ -0,0 +1,94 @@
+from sqlalchemy.orm import joinedload, load_only, selectinload
+
+from models import Calzado, Suela
+from services.paginacion import ParametroInvalido
+
+# campo de ?fields= -> (columnas de Calzado que necesita, relacion a cargar, valor).
+# Los valores son los mismos que arma Calzado.to_dict.
+CAMPOS = {
+    'id_calzado': ((), None, lambda c: c.id_calzado),
+    'talle': ((Calzado.talle,), None, lambda c: c.talle),
+    'ancho': ((Calzado.ancho,), None, lambda c: c.ancho if c.ancho else None),
+    'alto': ((Calzado.alto,), None, lambda c: c.alto if c.alto else None),
+    'tipo_registro': ((Calzado.tipo_registro,), None, lambda c: c.tipo_registro),
+    'id_marca': ((Calzado.id_marca,), None, lambda c: c.id_marca),
+    'marca': ((Calzado.id_marca,), Calzado.marca, lambda c: c.marca.nombre if c.marca else None),
+    'id_modelo': ((Calzado.id_modelo,), None, lambda c: c.id_modelo),
+    'modelo': ((Calzado.id_modelo,), Calzado.modelo, lambda c: c.modelo.nombre if c.modelo else None),
+    'id_categoria': ((Calzado.id_categoria,), None, lambda c: c.id_categoria),
+    'categoria': ((Calzado.id_categoria,), Calzado.categoria, lambda c: c.categoria.nombre if c.categoria else None),
+    'colores': ((), Calzado.colores, lambda c: [color.nombre for color in c.colores]),
+}
+
+# valor de ?include= -> carga por lotes (un SELECT ... IN por coleccion)
+INCLUIBLES = {
+    'suelas': lambda: selectinload(Calzado.suelas).selectinload(Suela.detalles),
+    'imputados': lambda: selectinload(Calzado.imputados),
+}
+
+
+def _lista(args, nombre, validos):
+    valores = []
+    for valor in args.get(nombre, '').split(','):
+        valor = valor.strip()
+        if valor and valor not in valores:
+            valores.append(valor)
+
+    desconocidos = [valor for valor in valores if valor not in validos]
+    if desconocidos:
+        raise ParametroInvalido(
+            f"Valores inválidos en {nombre}: {', '.join(desconocidos)}. Opciones: {', '.join(validos)}"
+        )
+    return valores
+
+
+class Proyeccion:
+    # ?fields=id_calzado,talle,marca elige las claves de cada calzado e
+    # ?include=suelas,imputados agrega colecciones. Solo se leen las columnas y se
+    # cargan las relaciones que hacen falta para eso.
+
+    def __init__(self, campos=None, incluir=()):
+        # campos None: todas las claves de Calzado.to_dict
+        self.campos = campos
+        self.incluir = incluir
+
+    def opciones(self, completas):
+        # `completas` son las opciones del endpoint cuando no se pide ?fields=
+        opciones = list(completas) if self.campos is None else self._opciones_campos()
+        opciones.extend(INCLUIBLES[nombre]() for nombre in self.incluir)
+        return opciones
+
+    def _opciones_campos(self):
+        columnas = {}
+        relaciones = []
+        for campo in self.campos:
+            cols, relacion, _ = CAMPOS[campo]
+            columnas.update((col.key, col) for col in cols)
+            if relacion is not None:
+                relaciones.append(relacion)
+
+        # load_only siempre incluye la clave primaria (id_calzado)
+        opciones = [load_only(*columnas.values())] if columnas else [load_only(Calzado.id_calzado)]
+        for relacion in relaciones:
+            # Las colecciones en un IN aparte para no multiplicar filas en el JOIN
+            cargar = selectinload if relacion.property.uselist else joinedload
+            opciones.append(cargar(relacion))
+        return opciones
+
+    def serializar(self, calzado):
+        if self.campos is None:
+            datos = calzado.to_dict()
+        else:
+            datos = {campo: CAMPOS[campo][2](calzado) for campo in self.campos}
+
+        if 'suelas' in self.incluir:
+            datos['suelas'] = [suela.to_dict() for suela in calzado.suelas]
+        if 'imputados' in self.incluir:
+            datos['imputados'] = [imputado.to_dict() for imputado in calzado.imputados]
+        return datos
+
+
+def leer_proyeccion(args):
+    campos = _lista(args, 'fields', CAMPOS)
+    incluir = _lista(args, 'include', INCLUIBLES)
+    return Proyeccion(campos or None, incluir)
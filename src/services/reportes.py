@@ -0,0 +1,206 @@
+import time
+
+from sqlalchemy.orm import joinedload, selectinload
+
+from models import Calzado, Categoria, Color, Marca, Modelo
+from services.metricas import DURACION_REPORTE
+from services.paginacion import iterar_por_lotes
+
+CRITERIOS = ('categoria', 'marca', 'modelo', 'talle', 'color')
+
+ENCABEZADO = ['ID', 'Marca', 'Modelo', 'Categoría', 'Talle', 'Alto', 'Ancho', 'Tipo Registro', 'Colores']
+# Anchos fijos para que todos los bloques de la tabla queden alineados (total = ancho util de carta)
+ANCHOS_COLUMNAS = [30, 55, 55, 55, 30, 30, 30, 90, 93]
+FILAS_POR_TABLA = 500
+
+# reportlab se importa dentro de las funciones que arman el PDF: tarda en cargar y
+# ocupa memoria en cada worker, y la mayoria nunca genera un reporte.
+
+
+def _estilo_tabla():
+    from reportlab.lib import colors
+    from reportlab.platypus import TableStyle
+
+    return TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 8),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ])
+
+
+def leer_criterios(origen):
+    criterios_busqueda = {criterio: origen.get(criterio) for criterio in CRITERIOS}
+    return {k: v for k, v in criterios_busqueda.items() if v is not None and v != ''}
+
+
+def consulta_reporte(criterios_busqueda):
+    query = Calzado.query.options(
+        joinedload(Calzado.marca),
+        joinedload(Calzado.modelo),
+        joinedload(Calzado.categoria),
+        selectinload(Calzado.colores)
+    )
+
+    if 'categoria' in criterios_busqueda and criterios_busqueda['categoria']:
+        query = query.join(Categoria).filter(Categoria.nombre.ilike(f"%{criterios_busqueda['categoria']}%"))
+
+    if 'marca' in criterios_busqueda and criterios_busqueda['marca']:
+        query = query.join(Marca).filter(Marca.nombre.ilike(f"%{criterios_busqueda['marca']}%"))
+
+    if 'modelo' in criterios_busqueda and criterios_busqueda['modelo']:
+        query = query.join(Modelo).filter(Modelo.nombre.ilike(f"%{criterios_busqueda['modelo']}%"))
+
+    if 'talle' in criterios_busqueda and criterios_busqueda['talle']:
+        query = query.filter(Calzado.talle.ilike(f"%{criterios_busqueda['talle']}%"))
+
+    if 'color' in criterios_busqueda and criterios_busqueda['color']:
+        query = query.filter(Calzado.colores.any(Color.nombre.ilike(f"%{criterios_busqueda['color']}%")))
+
+        if 'talle' in criterios_busqueda:
+            try:
+                talle_int = int(criterios_busqueda['talle'])
+                query = query.filter(Calzado.talle == talle_int)
+            except ValueError:
+                pass
+
+    return query
+
+
+def fila_reporte(c):
+    colores_str = ", ".join([color.nombre for color in c.colores]) if c.colores else "N/A"
+    return [
+        str(c.id_calzado),
+        c.marca.nombre if c.marca else 'N/A',
+        c.modelo.nombre if c.modelo else 'N/A',
+        c.categoria.nombre if c.categoria else 'N/A',
+        str(c.talle) if c.talle else 'N/A',
+        f'{c.alto:.2f}' if c.alto else 'N/A',
+        f'{c.ancho:.2f}' if c.ancho else 'N/A',
+        c.tipo_registro if c.tipo_registro else 'N/A',
+        colores_str
+    ]
+
+
+def _estilos():
+    from reportlab.lib.enums import TA_LEFT, TA_CENTER
+    from reportlab.lib.styles import ParagraphStyle
+
+    return {
+        'h1': ParagraphStyle(
+            name='h1',
+            fontSize=24,
+            leading=28,
+            alignment=TA_CENTER,
+            fontName='Helvetica-Bold'
+        ),
+        'h3': ParagraphStyle(
+            name='h3',
+            fontSize=18,
+            leading=20,
+            alignment=TA_CENTER,
+            fontName='Helvetica-Bold'
+        ),
+        'Normal': ParagraphStyle(
+            name='Normal',
+            fontSize=12,
+            leading=14,
+            alignment=TA_LEFT,
+            fontName='Helvetica'
+        )
+    }
+
+
+class _HistoriaPerezosa(list):
+    # Lista de flowables que reportlab consume desde el frente (build hace
+    # len()/[0]/del [0]). Se rellena de a un bloque cuando se vacia, asi nunca
+    # hay mas de FILAS_POR_TABLA filas armadas en memoria.
+
+    def __init__(self, iniciales, bloques):
+        super().__init__(iniciales)
+        self._bloques = bloques
+
+    def _rellenar(self):
+        if self._bloques is not None and list.__len__(self) < 2:
+            siguiente = next(self._bloques, None)
+            if siguiente is None:
+                self._bloques = None
+            else:
+                self.append(siguiente)
+
+    def __len__(self):
+        self._rellenar()
+        return list.__len__(self)
+
+    def __getitem__(self, indice):
+        self._rellenar()
+        return list.__getitem__(self, indice)
+
+
+def _tablas(query, progreso, total, styles):
+    from reportlab.platypus import LongTable, Paragraph
+
+    estilo = _estilo_tabla()
+    hechas = 0
+    data = [ENCABEZADO]
+    for c in iterar_por_lotes(query, Calzado.id_calzado, tamano_lote=FILAS_POR_TABLA):
+        data.append(fila_reporte(c))
+        if len(data) > FILAS_POR_TABLA:
+            hechas += len(data) - 1
+            yield LongTable(data, colWidths=ANCHOS_COLUMNAS, repeatRows=1, style=estilo)
+            data = [ENCABEZADO]
+            if progreso:
+                progreso(hechas, total)
+
+    if len(data) > 1:
+        hechas += len(data) - 1
+        yield LongTable(data, colWidths=ANCHOS_COLUMNAS, repeatRows=1, style=estilo)
+    elif hechas == 0:
+        yield Paragraph("No se encontraron calzados con los criterios especificados.", styles['Normal'])
+
+
+def generar_pdf(criterios_busqueda, destino, progreso=None):
+    # destino puede ser una ruta o un archivo binario abierto. Las filas se leen por
+    # lotes y se agregan al documento en tablas de FILAS_POR_TABLA filas a medida que
+    # reportlab las va ubicando. progreso(hechas, total) lo usa la cola de reportes.
+    inicio = time.perf_counter()
+    try:
+        _armar_pdf(criterios_busqueda, destino, progreso)
+    except Exception:
+        DURACION_REPORTE.labels('error').observe(time.perf_counter() - inicio)
+        raise
+    DURACION_REPORTE.labels('ok').observe(time.perf_counter() - inicio)
+
+
+def _armar_pdf(criterios_busqueda, destino, progreso):
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+
+    query = consulta_reporte(criterios_busqueda)
+    total = query.count() if progreso else None
+
+    doc = SimpleDocTemplate(destino, pagesize=letter)
+    styles = _estilos()
+    story = []
+
+    story.append(Paragraph("Reporte de Calzados", styles['h1']))
+    story.append(Spacer(1, 0.2 * inch))
+
+    criterios_aplicados = [f"{k.capitalize()}: {v}" for k, v in criterios_busqueda.items()]
+    if criterios_aplicados:
+        story.append(Paragraph("Criterios de Búsqueda Aplicados:", styles['h3']))
+        for criterio in criterios_aplicados:
+            story.append(Paragraph(criterio, styles['Normal']))
+        story.append(Spacer(1, 0.2 * inch))
+    else:
+        story.append(Paragraph("Mostrando todos los calzados (sin filtros).", styles['Normal']))
+        story.append(Spacer(1, 0.2 * inch))
+
+    doc.build(_HistoriaPerezosa(story, _tablas(query, progreso, total, styles)))
+    if progreso:
+        progreso(total, total)
@@ -0,0 +1,79 @@
+import decimal
+
+from flask import current_app, request
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # sin orjson se usa el json de la libreria estandar
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+MIMETYPE_MSGPACK = 'application/msgpack'
+
+
+def _decimal_como_numero(o):
+    # Por si llega algun Decimal (ancho y alto ya se leen como float, ver Calzado)
+    if isinstance(o, decimal.Decimal):
+        return float(o)
+    return DefaultJSONProvider.default(o)
+
+
+class ProveedorJson(DefaultJSONProvider):
+    # Reemplaza el encoder de jsonify/json.dumps por orjson (en C). Se mantiene lo del
+    # proveedor de Flask: claves ordenadas, fechas en formato HTTP y sangria solo en
+    # modo debug. orjson no escapa los caracteres no ASCII (el cuerpo es UTF-8).
+
+    def codificar(self, obj, sangria=False):
+        # Devuelve bytes (json.dumps de Flask devuelve str); la sangria es solo para respuestas
+        if orjson is None:
+            if sangria:
+                return self.dumps(obj, indent=2).encode('utf-8')
+            return self.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+        opciones = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            opciones |= orjson.OPT_SORT_KEYS
+        if sangria:
+            opciones |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=_decimal_como_numero, option=opciones)
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs:
+            kwargs.setdefault('default', _decimal_como_numero)
+            return super().dumps(obj, **kwargs)
+        return self.codificar(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        sangria = self.compact is False or (self.compact is None and self._app.debug)
+        return self._app.response_class(self.codificar(obj, sangria) + b'\n', mimetype=self.mimetype)
+
+
+def acepta_msgpack():
+    if msgpack is None:
+        return False
+    mejor = request.accept_mimetypes.best_match(['application/json', MIMETYPE_MSGPACK])
+    return mejor == MIMETYPE_MSGPACK
+
+
+def responder(datos, status=200):
+    # Negociacion de contenido para los listados: con `Accept: application/msgpack`
+    # se responde en MessagePack (mas chico y rapido de decodificar), si no en JSON
+    if acepta_msgpack():
+        cuerpo = msgpack.packb(datos, default=_decimal_como_numero, use_bin_type=True)
+        respuesta = current_app.response_class(cuerpo, status=status, mimetype=MIMETYPE_MSGPACK)
+    else:
+        respuesta = current_app.json.response(datos)
+        respuesta.status_code = status
+    respuesta.vary.add('Accept')
+    return respuesta
@@ -0,0 +1,71 @@
+import datetime
+import hashlib
+import os
+import secrets
+import uuid
+
+from models import db, RefreshToken
+
+DIAS_REFRESH = int(os.getenv('REFRESH_TOKEN_DIAS', '14'))
+
+
+class RefreshInvalido(Exception):
+    pass
+
+
+def _ahora():
+    # Fechas sin zona horaria en UTC, como las guarda la columna DateTime
+    return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+
+
+def _digest(token):
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def emitir_refresh(id_usuario, familia=None):
+    # Devuelve el token en claro; en la base queda solo su hash. No hace commit.
+    token = secrets.token_urlsafe(32)
+    ahora = _ahora()
+    db.session.add(RefreshToken(
+        id_usuario=id_usuario,
+        token_hash=_digest(token),
+        familia=familia or uuid.uuid4().hex,
+        creado_en=ahora,
+        expira_en=ahora + datetime.timedelta(days=DIAS_REFRESH)
+    ))
+    return token
+
+
+def rotar_refresh(token):
+    # Revoca el token recibido y emite otro de la misma familia. Devuelve
+    # (id_usuario, nuevo_token). No hace commit.
+    registro = RefreshToken.query.filter_by(token_hash=_digest(token)).with_for_update().first()
+    if registro is None:
+        raise RefreshInvalido('Refresh token inválido')
+
+    ahora = _ahora()
+    if registro.revocado_en is not None:
+        # Reutilizacion de un token ya rotado: se corta toda la sesion
+        revocar_familia(registro.familia)
+        raise RefreshInvalido('Refresh token revocado')
+    if registro.expira_en <= ahora:
+        raise RefreshInvalido('Refresh token expirado')
+
+    registro.revocado_en = ahora
+    return registro.id_usuario, emitir_refresh(registro.id_usuario, registro.familia)
+
+
+def revocar_familia(familia):
+    RefreshToken.query.filter(
+        RefreshToken.familia == familia, RefreshToken.revocado_en.is_(None)
+    ).update({'revocado_en': _ahora()}, synchronize_session=False)
+
+
+def revocar_de_usuario(id_usuario):
+    RefreshToken.query.filter(
+        RefreshToken.id_usuario == id_usuario, RefreshToken.revocado_en.is_(None)
+    ).update({'revocado_en': _ahora()}, synchronize_session=False)
+
+
+def borrar_de_usuario(id_usuario):
+    RefreshToken.query.filter_by(id_usuario=id_usuario).delete(synchronize_session=False)
@@ -0,0 +1,231 @@
+import math
+import os
+import threading
+import time
+
+import numpy as np
+from flask import current_app
+
+from models import db, Calzado, Suela, DetalleSuela
+
+TIPOS_INDUBITADA = ('indubitada_proveedor', 'indubitada_comisaria')
+
+PESO_JACCARD = 0.7
+PESO_SOLAPAMIENTO = 0.3
+TOLERANCIA_POR_DEFECTO = 1.0
+
+# Cada worker mantiene su propia copia del indice; las escrituras hechas en otro
+# proceso se ven como mucho despues de este tiempo, cuando se reconstruye.
+SEGUNDOS_ANTES_DE_RECONSTRUIR = int(os.getenv('SIMILITUD_TTL', '300'))
+
+
+class IndiceSuelas:
+    # Matriz en memoria de indubitadas x (cuadrante, forma). Cada fila es un calzado
+    # indubitado y cada columna un par cuadrante/forma presente en alguna de sus suelas.
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cargado_en = None
+        self._reiniciar()
+
+    def _reiniciar(self):
+        self._columnas = {}
+        self._filas = {}
+        self._libres = []
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._matriz = np.zeros((0, 0), dtype=np.float32)
+        self._ancho = np.zeros(0, dtype=np.float64)
+        self._alto = np.zeros(0, dtype=np.float64)
+        self._activos = np.zeros(0, dtype=bool)
+        self._frecuencias = np.zeros(0, dtype=np.float64)
+
+    def _cargar(self):
+        self._reiniciar()
+
+        calzados = db.session.query(Calzado.id_calzado, Calzado.ancho, Calzado.alto)\
+            .filter(Calzado.tipo_registro.in_(TIPOS_INDUBITADA))\
+            .all()
+        pares = db.session.query(Suela.id_calzado, DetalleSuela.id_cuadrante, DetalleSuela.id_forma)\
+            .join(DetalleSuela, Suela.id_suela == DetalleSuela.id_suela)\
+            .join(Calzado, Calzado.id_calzado == Suela.id_calzado)\
+            .filter(Calzado.tipo_registro.in_(TIPOS_INDUBITADA))\
+            .all()
+
+        patrones = {}
+        for id_calzado, id_cuadrante, id_forma in pares:
+            patrones.setdefault(id_calzado, set()).add((id_cuadrante, id_forma))
+
+        for id_calzado, ancho, alto in calzados:
+            self._guardar_fila(id_calzado, ancho, alto, patrones.get(id_calzado, set()))
+
+        self._cargado_en = time.monotonic()
+
+    def _asegurar_cargado(self):
+        vencido = self._cargado_en is None or \
+            time.monotonic() - self._cargado_en > SEGUNDOS_ANTES_DE_RECONSTRUIR
+        if vencido:
+            self._cargar()
+
+    def _columna(self, par):
+        columna = self._columnas.get(par)
+        if columna is None:
+            columna = len(self._columnas)
+            self._columnas[par] = columna
+            self._matriz = np.hstack([self._matriz, np.zeros((self._matriz.shape[0], 1), dtype=np.float32)])
+            self._frecuencias = np.append(self._frecuencias, 0.0)
+        return columna
+
+    def _nueva_fila(self):
+        if self._libres:
+            return self._libres.pop()
+
+        fila = len(self._ids)
+        capacidad = max(64, fila * 2)
+        self._matriz = np.vstack([self._matriz, np.zeros((capacidad - fila, self._matriz.shape[1]), dtype=np.float32)])
+        self._ids = np.concatenate([self._ids, np.zeros(capacidad - fila, dtype=np.int64)])
+        self._ancho = np.concatenate([self._ancho, np.full(capacidad - fila, np.nan)])
+        self._alto = np.concatenate([self._alto, np.full(capacidad - fila, np.nan)])
+        self._activos = np.concatenate([self._activos, np.zeros(capacidad - fila, dtype=bool)])
+        self._libres.extend(range(capacidad - 1, fila, -1))
+        return fila
+
+    def _guardar_fila(self, id_calzado, ancho, alto, pares):
+        fila = self._filas.get(id_calzado)
+        if fila is None:
+            fila = self._nueva_fila()
+            self._filas[id_calzado] = fila
+        else:
+            self._frecuencias -= self._matriz[fila]
+
+        columnas = [self._columna(par) for par in pares]
+        self._matriz[fila] = 0
+        self._matriz[fila, columnas] = 1
+        self._frecuencias += self._matriz[fila]
+        self._ids[fila] = id_calzado
+        self._ancho[fila] = float(ancho) if ancho is not None else np.nan
+        self._alto[fila] = float(alto) if alto is not None else np.nan
+        self._activos[fila] = True
+
+    def _quitar_fila(self, id_calzado):
+        fila = self._filas.pop(id_calzado, None)
+        if fila is None:
+            return
+        self._frecuencias -= self._matriz[fila]
+        self._matriz[fila] = 0
+        self._activos[fila] = False
+        self._libres.append(fila)
+
+    def refrescar_calzados(self, ids_calzado):
+        # Relee de la base solo los calzados indicados. Se llama despues de cada
+        # escritura sobre suelas o calzados; si el indice aun no se cargo no hace nada.
+        ids_calzado = {i for i in ids_calzado if i is not None}
+        if not ids_calzado:
+            return
+
+        with self._lock:
+            if self._cargado_en is None:
+                return
+
+            calzados = db.session.query(Calzado.id_calzado, Calzado.ancho, Calzado.alto)\
+                .filter(Calzado.id_calzado.in_(ids_calzado), Calzado.tipo_registro.in_(TIPOS_INDUBITADA))\
+                .all()
+            pares = db.session.query(Suela.id_calzado, DetalleSuela.id_cuadrante, DetalleSuela.id_forma)\
+                .join(DetalleSuela, Suela.id_suela == DetalleSuela.id_suela)\
+                .filter(Suela.id_calzado.in_(ids_calzado))\
+                .all()
+
+            patrones = {}
+            for id_calzado, id_cuadrante, id_forma in pares:
+                patrones.setdefault(id_calzado, set()).add((id_cuadrante, id_forma))
+
+            vigentes = set()
+            for id_calzado, ancho, alto in calzados:
+                self._guardar_fila(id_calzado, ancho, alto, patrones.get(id_calzado, set()))
+                vigentes.add(id_calzado)
+
+            for id_calzado in ids_calzado - vigentes:
+                self._quitar_fila(id_calzado)
+
+    def invalidar(self):
+        with self._lock:
+            self._cargado_en = None
+            self._reiniciar()
+
+    def precargar(self):
+        with self._lock:
+            self._asegurar_cargado()
+
+    def buscar_candidatos(self, pares, ancho=None, alto=None, top=10, tolerancia=TOLERANCIA_POR_DEFECTO):
+        # Puntaje = Jaccard ponderado y coeficiente de solapamiento sobre los pares
+        # cuadrante/forma. Los pares poco frecuentes pesan mas (idf). Los candidatos con
+        # ancho o alto fuera de la tolerancia se descartan; si falta la medida no se filtra.
+        with self._lock:
+            self._asegurar_cargado()
+
+            activos = self._activos
+            if not activos.any() or not pares:
+                return []
+
+            total = float(activos.sum())
+            pesos = np.log((1.0 + total) / (1.0 + self._frecuencias)) + 1.0
+            peso_desconocido = math.log(1.0 + total) + 1.0
+
+            consulta = np.zeros(len(self._columnas), dtype=np.float32)
+            tam_consulta = 0.0
+            for par in set(pares):
+                columna = self._columnas.get(par)
+                if columna is None:
+                    tam_consulta += peso_desconocido
+                else:
+                    consulta[columna] = pesos[columna]
+                    tam_consulta += pesos[columna]
+
+            interseccion = self._matriz @ consulta
+            tam_filas = self._matriz @ pesos.astype(np.float32)
+            union = tam_filas + tam_consulta - interseccion
+            menor = np.minimum(tam_filas, tam_consulta)
+
+            with np.errstate(divide='ignore', invalid='ignore'):
+                jaccard = np.where(union > 0, interseccion / union, 0.0)
+                solapamiento = np.where(menor > 0, interseccion / menor, 0.0)
+            puntaje = PESO_JACCARD * jaccard + PESO_SOLAPAMIENTO * solapamiento
+
+            validos = activos & (interseccion > 0)
+            if tolerancia is not None:
+                if ancho is not None:
+                    diferencia = np.abs(self._ancho - float(ancho))
+                    validos &= np.isnan(diferencia) | (diferencia <= tolerancia)
+                if alto is not None:
+                    diferencia = np.abs(self._alto - float(alto))
+                    validos &= np.isnan(diferencia) | (diferencia <= tolerancia)
+
+            filas = np.flatnonzero(validos)
+            if len(filas) > top:
+                mejores = np.argpartition(-puntaje[filas], top - 1)[:top]
+                filas = filas[mejores]
+            filas = filas[np.argsort(-puntaje[filas], kind='stable')]
+
+            return [
+                {
+                    'id_calzado': int(self._ids[fila]),
+                    'puntaje': round(float(puntaje[fila]), 4),
+                    'jaccard': round(float(jaccard[fila]), 4),
+                    'solapamiento': round(float(solapamiento[fila]), 4)
+                }
+                for fila in filas
+            ]
+
+
+indice_suelas = IndiceSuelas()
+
+
+def refrescar_indice(ids_calzado):
+    # Para llamar despues del commit: la escritura ya quedo hecha y un error al releer
+    # el indice no debe devolver un 500. Se descarta el indice entero para que la
+    # proxima busqueda lo reconstruya desde la base.
+    try:
+        indice_suelas.refrescar_calzados(ids_calzado)
+    except Exception:
+        current_app.logger.exception("Error al refrescar el indice de suelas")
+        db.session.rollback()
+        indice_suelas.invalidar()
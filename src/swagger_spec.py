@@ -190,12 +190,27 @@ SWAGGER_SPEC = {
             },
             "required": ["username", "password"]
         },
+        "RefreshInput": {
+            "type": "object",
+            "properties": {
+                "refresh_token": {"type": "string", "description": "Refresh token recibido en el login o en la última renovación"}
+            },
+            "required": ["refresh_token"]
+        },
+        "RefreshResponse": {
+            "type": "object",
+            "properties": {
+                "token": {"type": "string", "description": "Token JWT nuevo"},
+                "refresh_token": {"type": "string", "description": "Refresh token nuevo; el anterior queda revocado"}
+            }
+        },
         "LoginResponse": {
             "type": "object",
             "properties": {
                 "success": {"type": "boolean", "description": "Indica si el inicio de sesión fue exitoso"},
                 "message": {"type": "string", "description": "Mensaje de resultado"},
                 "token": {"type": "string", "description": "Token JWT para autenticación"},
+                "refresh_token": {"type": "string", "description": "Token para renovar el JWT en /auth/refresh"},
                 "user": {
                     "type": "object",
                     "properties": {
@@ -303,7 +318,8 @@ SWAGGER_SPEC = {
                     "200": {"description": "Inicio de sesión exitoso.", "schema": {"$ref": "#/definitions/LoginResponse"}},
                     "400": {"description": "Usuario o contraseña obligatorios.", "schema": {"$ref": "#/definitions/ErrorResponse"}},
                     "401": {"description": "Credenciales incorrectas.", "schema": {"$ref": "#/definitions/ErrorResponse"}},
-                    "500": {"description": "Error interno del servidor.", "schema": {"$ref": "#/definitions/ErrorResponse"}}
+                    "500": {"description": "Error interno del servidor.", "schema": {"$ref": "#/definitions/ErrorResponse"}},
+                    "503": {"description": "Demasiados inicios de sesión en curso; reintentar según Retry-After.", "schema": {"$ref": "#/definitions/ErrorResponse"}}
                 }
             },
             "options": {
@@ -314,6 +330,27 @@ SWAGGER_SPEC = {
                 }
             }
         },
+        "/auth/refresh": {
+            "post": {
+                "tags": ["Autenticación"],
+                "summary": "Renovar el token JWT con un refresh token.",
+                "description": "Cada refresh token sirve una sola vez. Si se reutiliza uno ya revocado se revocan todos los de la misma sesión.",
+                "parameters": [
+                    {
+                        "in": "body",
+                        "name": "refresh",
+                        "required": True,
+                        "schema": {"$ref": "#/definitions/RefreshInput"}
+                    }
+                ],
+                "responses": {
+                    "200": {"description": "Tokens renovados.", "schema": {"$ref": "#/definitions/RefreshResponse"}},
+                    "400": {"description": "Falta el refresh_token.", "schema": {"$ref": "#/definitions/ErrorResponse"}},
+                    "401": {"description": "Refresh token inválido, vencido o revocado.", "schema": {"$ref": "#/definitions/ErrorResponse"}},
+                    "500": {"description": "Error interno del servidor.", "schema": {"$ref": "#/definitions/ErrorResponse"}}
+                }
+            }
+        },
         "/usuarios": {
             "post": {
                 "tags": ["Usuarios"],
@@ -455,9 +492,19 @@ SWAGGER_SPEC = {
             "get": {
                 "tags": ["Calzados"],
                 "summary": "Obtener todos los calzados registrados.",
+                "description": "Sin parámetros devuelve la lista completa. Con after/limit devuelve una página ({items, limit, next_cursor}); con stream=ndjson envía un calzado por línea. Con Accept: application/msgpack la lista o la página se envía en MessagePack.",
+                "produces": ["application/json", "application/msgpack"],
                 "security": [{"JWT": []}],
+                "parameters": [
+                    {"in": "query", "name": "after", "type": "integer", "required": False, "description": "Cursor: devuelve calzados con id_calzado mayor a este valor."},
+                    {"in": "query", "name": "limit", "type": "integer", "required": False, "description": "Cantidad máxima de calzados por página (máximo 1000)."},
+                    {"in": "query", "name": "stream", "type": "string", "enum": ["ndjson"], "required": False, "description": "Envía la respuesta como NDJSON por lotes."},
+                    {"in": "query", "name": "fields", "type": "string", "required": False, "description": "Claves a devolver de cada calzado, separadas por coma (ej. id_calzado,talle,marca). Sin este parámetro se devuelven todas."},
+                    {"in": "query", "name": "include", "type": "string", "required": False, "description": "Colecciones a agregar a cada calzado, separadas por coma: suelas (con sus detalles), imputados."}
+                ],
                 "responses": {
                     "200": {"description": "Lista de calzados.", "schema": {"type": "array", "items": {"$ref": "#/definitions/Calzado"}}},
+                    "400": {"description": "Parámetros de paginación inválidos.", "schema": {"$ref": "#/definitions/ErrorResponse"}},
                     "500": {"description": "Error interno del servidor.", "schema": {"$ref": "#/definitions/ErrorResponse"}}
                 }
             },
@@ -502,10 +549,13 @@ SWAGGER_SPEC = {
                         "type": "integer",
                         "required": True,
                         "description": "ID único del calzado a obtener."
-                    }
+                    },
+                    {"in": "query", "name": "fields", "type": "string", "required": False, "description": "Claves a devolver de cada calzado, separadas por coma (ej. id_calzado,talle,marca). Sin este parámetro se devuelven todas."},
+                    {"in": "query", "name": "include", "type": "string", "required": False, "description": "Colecciones a agregar a cada calzado, separadas por coma: suelas (con sus detalles), imputados."}
                 ],
                 "responses": {
                     "200": {"description": "Detalles del calzado.", "schema": {"$ref": "#/definitions/Calzado"}},
+                    "400": {"description": "Valores inválidos en fields o include.", "schema": {"$ref": "#/definitions/ErrorResponse"}},
                     "404": {"description": "Calzado no encontrado.", "schema": {"$ref": "#/definitions/ErrorResponse"}},
                     "500": {"description": "Error interno del servidor.", "schema": {"$ref": "#/definitions/ErrorResponse"}}
                 }
@@ -567,6 +617,119 @@ SWAGGER_SPEC = {
                 }
             }
         },
+        "/calzados/bulk": {
+            "post": {
+                "tags": ["Calzados"],
+                "summary": "Carga masiva de calzados.",
+                "description": "Acepta una lista JSON de calzados (o {\"calzados\": [...]}) o un cuerpo NDJSON (Content-Type: application/x-ndjson) con un calzado por línea. Las claves foráneas se validan por lote y cada lote de 500 filas se confirma por separado.",
+                "security": [{"JWT": []}],
+                "consumes": ["application/json", "application/x-ndjson"],
+                "parameters": [
+                    {
+                        "in": "body",
+                        "name": "calzados",
+                        "required": True,
+                        "schema": {"type": "array", "items": {"$ref": "#/definitions/CalzadoInput"}}
+                    }
+                ],
+                "responses": {
+                    "201": {
+                        "description": "Se insertó al menos un calzado. Las filas rechazadas se informan con su índice.",
+                        "schema": {
+                            "type": "object",
+                            "properties": {
+                                "insertados": {"type": "integer"},
+                                "total_errores": {"type": "integer"},
+                                "errores": {
+                                    "type": "array",
+                                    "items": {
+                                        "type": "object",
+                                        "properties": {"indice": {"type": "integer"}, "error": {"type": "string"}}
+                                    }
+                                }
+                            }
+                        }
+                    },
+                    "400": {"description": "Cuerpo inválido o ninguna fila pudo insertarse.", "schema": {"$ref": "#/definitions/ErrorResponse"}}
+                }
+            }
+        },
+        "/calzados/exportar": {
+            "get": {
+                "tags": ["Calzados"],
+                "summary": "Exporta los calzados encontrados a CSV o XLSX.",
+                "description": "Acepta los mismos criterios que /calzados/buscar (categoria, marca, modelo, talle y figuras por cuadrante, p. ej. figurasCentral[]). El archivo se envía por partes a medida que se leen las filas.",
+                "security": [{"JWT": []}],
+                "produces": ["text/csv", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"],
+                "parameters": [
+                    {"in": "query", "name": "formato", "type": "string", "enum": ["csv", "xlsx"], "default": "csv"},
+                    {"in": "query", "name": "categoria", "type": "string"},
+                    {"in": "query", "name": "marca", "type": "string"},
+                    {"in": "query", "name": "modelo", "type": "string"},
+                    {"in": "query", "name": "talle", "type": "string"}
+                ],
+                "responses": {
+                    "200": {"description": "Archivo CSV o XLSX."},
+                    "400": {"description": "Formato inválido.", "schema": {"$ref": "#/definitions/ErrorResponse"}}
+                }
+            }
+        },
+        "/calzados/reportes": {
+            "post": {
+                "tags": ["Calzados"],
+                "summary": "Encola la generación de un reporte PDF de calzados.",
+                "description": "Acepta los mismos criterios que /calzados/generar_reporte_pdf (categoria, marca, modelo, talle, color) en el cuerpo JSON o en la query string. El PDF se genera en segundo plano.",
+                "security": [{"JWT": []}],
+                "responses": {
+                    "202": {"description": "Reporte encolado. Devuelve el id y la URL para consultar el estado."},
+                    "503": {"description": "La cola de reportes está llena.", "schema": {"$ref": "#/definitions/ErrorResponse"}}
+                }
+            }
+        },
+        "/calzados/reportes/{id_reporte}": {
+            "get": {
+                "tags": ["Calzados"],
+                "summary": "Estado y progreso de un reporte encolado.",
+                "security": [{"JWT": []}],
+                "parameters": [{"in": "path", "name": "id_reporte", "type": "string", "required": True}],
+                "responses": {
+                    "200": {"description": "Estado del reporte (pendiente, en_proceso, terminado o error) y progreso en porcentaje."},
+                    "404": {"description": "Reporte no encontrado.", "schema": {"$ref": "#/definitions/ErrorResponse"}}
+                }
+            }
+        },
+        "/calzados/reportes/{id_reporte}/pdf": {
+            "get": {
+                "tags": ["Calzados"],
+                "summary": "Descarga el PDF de un reporte terminado.",
+                "security": [{"JWT": []}],
+                "produces": ["application/pdf"],
+                "parameters": [{"in": "path", "name": "id_reporte", "type": "string", "required": True}],
+                "responses": {
+                    "200": {"description": "Archivo PDF."},
+                    "404": {"description": "Reporte no encontrado.", "schema": {"$ref": "#/definitions/ErrorResponse"}},
+                    "409": {"description": "El reporte todavía no está listo.", "schema": {"$ref": "#/definitions/ErrorResponse"}}
+                }
+            }
+        },
+        "/calzados/{id}/candidatos": {
+            "get": {
+                "tags": ["Calzados"],
+                "summary": "Ranking de indubitadas similares a una dubitada.",
+                "description": "Compara los pares cuadrante/forma de la suela dubitada contra todas las indubitadas (Jaccard ponderado y solapamiento) y descarta las que superan la tolerancia de ancho/alto.",
+                "security": [{"JWT": []}],
+                "parameters": [
+                    {"in": "path", "name": "id", "type": "integer", "required": True, "description": "ID del calzado dubitado."},
+                    {"in": "query", "name": "top", "type": "integer", "required": False, "description": "Cantidad de candidatos a devolver (por defecto 10, máximo 100)."},
+                    {"in": "query", "name": "tolerancia", "type": "number", "required": False, "description": "Diferencia máxima de ancho y alto (por defecto 1.0)."}
+                ],
+                "responses": {
+                    "200": {"description": "Candidatos ordenados por puntaje."},
+                    "400": {"description": "El calzado no es dubitado, no tiene suela cargada o parámetros inválidos.", "schema": {"$ref": "#/definitions/ErrorResponse"}},
+                    "404": {"description": "Calzado no encontrado.", "schema": {"$ref": "#/definitions/ErrorResponse"}}
+                }
+            }
+        },
         "/calzados/{id}/imputados": {
             "post": {
                 "tags": ["Calzados", "Imputados"],
@@ -1436,6 +1599,7 @@ SWAGGER_SPEC = {
             "get": {
                 "tags": ["Imputados"],
                 "summary": "Obtener todos los imputados registrados.",
+                "produces": ["application/json", "application/msgpack"],
                 "security": [{"JWT": []}],
                 "responses": {
                     "200": {"description": "Lista de imputados.", "schema": {"type": "array", "items": {"$ref": "#/definitions/Imputado"}}},
@@ -1545,6 +1709,30 @@ SWAGGER_SPEC = {
                     "500": {"description": "Error interno del servidor.", "schema": {"$ref": "#/definitions/ErrorResponse"}}
                 }
             }
+        },
+        "/admin/pool": {
+            "get": {
+                "tags": ["Administración"],
+                "summary": "Estado y métricas del pool de conexiones de este proceso.",
+                "description": "Conexiones en uso, libres y de overflow, contadores de eventos del pool y tiempo de espera por conexión (promedio, p95 y máximo en ms). Solo para administradores.",
+                "security": [{"JWT": []}],
+                "responses": {
+                    "200": {"description": "Métricas del pool."},
+                    "401": {"description": "Token faltante o inválido.", "schema": {"$ref": "#/definitions/ErrorResponse"}},
+                    "403": {"description": "El usuario no es administrador.", "schema": {"$ref": "#/definitions/ErrorResponse"}}
+                }
+            }
+        },
+        "/metrics": {
+            "get": {
+                "tags": ["Administración"],
+                "summary": "Métricas en formato de texto de Prometheus.",
+                "description": "Latencia, cantidad y peticiones en curso por blueprint y endpoint, estado del pool de conexiones, duración de los reportes PDF y de bcrypt. Con gunicorn suma los valores de todos los workers.",
+                "produces": ["text/plain"],
+                "responses": {
+                    "200": {"description": "Métricas."}
+                }
+            }
         }
     }
 }
\ No newline at end of file
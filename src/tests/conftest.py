@@ -0,0 +1,63 @@
+import pytest
+
+from app import create_app
+from config import PruebasConfig
+from models import db, Categoria, Color, Cuadrante, FormaGeometrica, Marca, Modelo
+from services import patrones
+from services.busqueda import CUADRANTES
+from services.cache_busqueda import cache_busqueda
+from services.catalogo import catalogo
+from services.similitud import indice_suelas
+
+FORMAS = ['Círculo', 'Rombo', 'Pirámide', 'Texto', 'Logo', 'Triángulo', 'Rectángulo']
+
+
+def _vaciar_caches():
+    # Los caches son del proceso, no de la app: se vacian entre pruebas
+    catalogo.invalidar()
+    indice_suelas.invalidar()
+    cache_busqueda.invalidar()
+    patrones._bits.clear()
+
+
+def cargar_catalogos():
+    db.session.add_all(Cuadrante(nombre=nombre) for nombre in CUADRANTES.values())
+    db.session.add_all(FormaGeometrica(nombre=nombre) for nombre in FORMAS)
+    db.session.add_all(Marca(nombre=nombre) for nombre in ('Nike', 'Adidas', 'Topper'))
+    db.session.add_all(Modelo(nombre=nombre) for nombre in ('Air', 'Superstar'))
+    db.session.add_all(Categoria(nombre=nombre) for nombre in ('Deportivo', 'Urbano'))
+    db.session.add_all(Color(nombre=nombre) for nombre in ('Negro', 'Blanco', 'Rojo'))
+    db.session.commit()
+
+
+@pytest.fixture
+def app():
+    # SQLite en memoria: Flask-SQLAlchemy usa una unica conexion compartida
+    config = PruebasConfig()
+    config.SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    config.SQLALCHEMY_ENGINE_OPTIONS = {}
+    config.MONTAR_SWAGGER = False
+    app = create_app(config)
+
+    _vaciar_caches()
+    with app.app_context():
+        db.create_all()
+        cargar_catalogos()
+
+    yield app
+
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+    _vaciar_caches()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def contexto(app):
+    with app.app_context():
+        yield
@@ -0,0 +1,120 @@
+import pytest
+from werkzeug.datastructures import MultiDict
+
+from models import db, Marca
+from services.busqueda import leer_criterios_busqueda
+from services.cache_busqueda import CacheBusqueda, cache_busqueda, clave_busqueda
+
+
+@pytest.fixture(autouse=True)
+def archivo_generacion(tmp_path, monkeypatch):
+    # Cada prueba con su propio archivo compartido, fuera del directorio real
+    archivo = str(tmp_path / 'generacion')
+    monkeypatch.setattr(cache_busqueda, 'archivo_generacion', archivo)
+    cache_busqueda.invalidar()
+    return archivo
+
+
+def clave(args):
+    return clave_busqueda(leer_criterios_busqueda(MultiDict(args)), None, None, False)
+
+
+def estado_cache(client, query='/calzados/buscar?marca=nike'):
+    respuesta = client.get(query)
+    assert respuesta.status_code == 200, respuesta.get_json()
+    return respuesta.headers['Cache-Status']
+
+
+def crear_calzado(client, **datos):
+    respuesta = client.post('/calzados/', json={'talle': '40', 'tipo_registro': 'indubitada_proveedor', **datos})
+    assert respuesta.status_code == 201, respuesta.get_json()
+    return respuesta.get_json()['calzado']['id_calzado']
+
+
+def test_clave_normaliza_textos_y_figuras():
+    assert clave([('marca', 'Nike '), ('categoria', 'DEPÓRTIVO')]) == clave([('marca', 'nike'), ('categoria', 'deportivo')])
+    assert clave([('figurasCentral[]', 'Círculo'), ('figurasCentral[]', 'Logo')]) == \
+        clave([('figurasCentral[]', 'logo'), ('figurasCentral[]', 'circulo'), ('figurasCentral[]', 'Logo')])
+
+    # La misma figura en otro cuadrante o un criterio distinto no comparten clave
+    assert clave([('figurasCentral[]', 'Logo')]) != clave([('figurasSuperiorIzquierdo[]', 'Logo')])
+    assert clave([('marca', 'nike')]) != clave([('modelo', 'nike')])
+
+
+def test_segunda_busqueda_sale_del_cache(client):
+    assert estado_cache(client).endswith('fwd=miss; stored')
+    assert '; hit; ' in estado_cache(client)
+    # Mayusculas y acentos dan la misma entrada
+    assert '; hit; ' in estado_cache(client, '/calzados/buscar?marca=NÍKE')
+
+
+def test_escritura_orm_invalida(client, contexto):
+    id_nike = Marca.query.filter_by(nombre='Nike').one().id_marca
+    estado_cache(client)
+
+    id_calzado = crear_calzado(client)
+    assert 'fwd=miss' in estado_cache(client)
+
+    # El calzado nuevo aparece en cuanto pasa a ser Nike
+    assert client.patch(f'/calzados/{id_calzado}', json={'id_marca': id_nike}).status_code == 200
+    respuesta = client.get('/calzados/buscar?marca=nike')
+    assert 'fwd=miss' in respuesta.headers['Cache-Status']
+    assert [c['id'] for c in respuesta.get_json()] == [id_calzado]
+
+
+def test_carga_masiva_invalida(client, contexto):
+    id_nike = Marca.query.filter_by(nombre='Nike').one().id_marca
+    assert client.get('/calzados/buscar?marca=nike').get_json() == []
+
+    respuesta = client.post('/calzados/bulk', json=[{'talle': '41', 'id_marca': id_nike}] * 3)
+    assert respuesta.status_code == 201, respuesta.get_json()
+
+    respuesta = client.get('/calzados/buscar?marca=nike')
+    assert 'fwd=miss' in respuesta.headers['Cache-Status']
+    assert len(respuesta.get_json()) == 3
+
+
+def test_escritura_de_catalogo_invalida(client, contexto):
+    id_nike = Marca.query.filter_by(nombre='Nike').one().id_marca
+    crear_calzado(client, id_marca=id_nike)
+    assert len(client.get('/calzados/buscar?marca=nike').get_json()) == 1
+
+    assert client.post('/marcas/', json={'nombre': 'Reebok'}).status_code == 201
+    assert 'fwd=miss' in estado_cache(client)
+
+    # Renombrar la marca cambia lo que encuentra la misma busqueda
+    assert client.patch(f'/marcas/{id_nike}', json={'nombre': 'Puma'}).status_code == 200
+    respuesta = client.get('/calzados/buscar?marca=nike')
+    assert 'fwd=miss' in respuesta.headers['Cache-Status']
+    assert respuesta.get_json() == []
+
+
+def test_invalidar_en_otro_worker(archivo_generacion):
+    # Dos caches sobre el mismo archivo hacen de dos workers
+    local = CacheBusqueda(archivo_generacion=archivo_generacion)
+    otro = CacheBusqueda(archivo_generacion=archivo_generacion)
+
+    assert local.obtener('clave') is None
+    assert local.guardar('clave', local.generacion, ['viejo'])
+    assert local.obtener('clave')[0] == ['viejo']
+
+    otro.invalidar()
+    assert local.obtener('clave') is None
+
+    # Un resultado que se empezo a calcular antes de la escritura no se guarda
+    generacion = local.generacion
+    otro.invalidar()
+    assert not local.guardar('clave', generacion, ['viejo'])
+    assert local.guardar('clave', local.generacion, ['nuevo'])
+    assert local.obtener('clave')[0] == ['nuevo']
+
+
+def test_savepoint_no_adelanta_la_invalidacion(contexto):
+    db.session.add(Marca(nombre='Reebok'))
+    with db.session.begin_nested():
+        db.session.add(Marca(nombre='Fila'))
+
+    # Una busqueda que leyo antes del commit no puede quedar guardada despues
+    assert cache_busqueda.guardar('clave', cache_busqueda.generacion, ['viejo'])
+    db.session.commit()
+    assert cache_busqueda.obtener('clave') is None
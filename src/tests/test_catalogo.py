@@ -0,0 +1,44 @@
+import pytest
+
+from models import db, Color, Marca
+from services.catalogo import IdInvalido, catalogo
+
+
+def test_ids_como_texto_salen_del_cache(contexto):
+    id_nike = Marca.query.filter_by(nombre='Nike').one().id_marca
+    ids_color = [c.id_color for c in Color.query.all()]
+    catalogo.precargar()
+    version = catalogo.version('marca'), catalogo.version('color')
+
+    assert catalogo.existe('marca', str(id_nike))
+    assert catalogo.existe('marca', float(id_nike))
+    assert not catalogo.existe('marca', '999')
+    assert catalogo.faltantes('color', [str(i) for i in ids_color] + ['999']) == {999}
+
+    # Ninguna consulta encontro un id nuevo: el cache no se invalido
+    assert (catalogo.version('marca'), catalogo.version('color')) == version
+
+
+@pytest.mark.parametrize('valor', ['abc', '', None, True, 1.5, [1]])
+def test_id_invalido(contexto, valor):
+    with pytest.raises(IdInvalido):
+        catalogo.existe('marca', valor)
+
+
+def test_id_creado_en_otro_worker_invalida(contexto):
+    catalogo.precargar()
+    version = catalogo.version('marca')
+    # Insertada sin pasar por los handlers, como si la hubiera creado otro proceso
+    marca = Marca(nombre='Fila')
+    db.session.add(marca)
+    db.session.commit()
+
+    assert catalogo.existe('marca', str(marca.id_marca))
+    assert catalogo.version('marca') == version + 1
+
+
+def test_alta_de_calzado_con_id_invalido(client):
+    respuesta = client.post('/calzados/', json={'talle': '40', 'id_marca': 'nike'})
+
+    assert respuesta.status_code == 400
+    assert 'ID inválido' in respuesta.get_json()['error']
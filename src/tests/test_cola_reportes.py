@@ -0,0 +1,71 @@
+import json
+import os
+import time
+import uuid
+
+import pytest
+
+from services import cola_reportes as modulo
+from services.cola_reportes import EN_PROCESO, ERROR, PENDIENTE, ColaReportes
+
+
+@pytest.fixture
+def cola(tmp_path, monkeypatch):
+    monkeypatch.setattr(modulo, 'DIRECTORIO', str(tmp_path))
+    return ColaReportes()
+
+
+def crear_trabajo(cola, estado, hace):
+    # Un trabajo cuyo estado se escribio por ultima vez hace `hace` segundos, con su PDF a medias
+    id_reporte = uuid.uuid4().hex
+    with open(cola._ruta(id_reporte, 'json'), 'w', encoding='utf-8') as archivo:
+        json.dump({
+            'id': id_reporte, 'estado': estado, 'progreso': 40, 'criterios': {},
+            'creado_en': time.time() - hace, 'actualizado_en': time.time() - hace, 'error': None
+        }, archivo)
+    with open(cola._ruta(id_reporte, 'pdf.tmp'), 'wb') as archivo:
+        archivo.write(b'%PDF')
+    return id_reporte
+
+
+def envejecer(cola, id_reporte, segundos):
+    for extension in ('json', 'pdf.tmp'):
+        ruta = cola._ruta(id_reporte, extension)
+        if os.path.exists(ruta):
+            vencido = time.time() - segundos
+            os.utime(ruta, (vencido, vencido))
+
+
+@pytest.mark.parametrize('estado', [PENDIENTE, EN_PROCESO])
+def test_trabajo_sin_avance_queda_en_error(cola, estado):
+    id_reporte = crear_trabajo(cola, estado, modulo.SEGUNDOS_SIN_AVANCE + 60)
+
+    resultado = cola.estado(id_reporte)
+
+    assert resultado['estado'] == ERROR
+    assert resultado['error']
+    assert not os.path.exists(cola._ruta(id_reporte, 'pdf.tmp'))
+    # El error queda guardado para las consultas siguientes
+    assert cola.estado(id_reporte)['estado'] == ERROR
+
+
+def test_trabajo_en_curso_no_se_toca(cola):
+    id_reporte = crear_trabajo(cola, EN_PROCESO, 5)
+
+    assert cola.estado(id_reporte)['estado'] == EN_PROCESO
+    assert os.path.exists(cola._ruta(id_reporte, 'pdf.tmp'))
+
+
+def test_limpieza_borra_trabajos_huerfanos(cola):
+    huerfano = crear_trabajo(cola, EN_PROCESO, modulo.SEGUNDOS_DE_VIDA + 60)
+    envejecer(cola, huerfano, modulo.SEGUNDOS_DE_VIDA + 60)
+    # Un trabajo largo que sigue avanzando conserva sus archivos aunque sean viejos
+    vivo = crear_trabajo(cola, EN_PROCESO, 5)
+    envejecer(cola, vivo, modulo.SEGUNDOS_DE_VIDA + 60)
+
+    cola._limpiar_vencidos()
+
+    assert not os.path.exists(cola._ruta(huerfano, 'json'))
+    assert not os.path.exists(cola._ruta(huerfano, 'pdf.tmp'))
+    assert os.path.exists(cola._ruta(vivo, 'json'))
+    assert os.path.exists(cola._ruta(vivo, 'pdf.tmp'))
@@ -0,0 +1,19 @@
+import pytest
+
+from app import create_app
+from config import PruebasConfig
+
+
+@pytest.mark.parametrize('compresion', [True, False])
+def test_especificacion_swagger_respeta_compresion(compresion):
+    config = PruebasConfig()
+    config.SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    config.SQLALCHEMY_ENGINE_OPTIONS = {}
+    config.MONTAR_SWAGGER = True
+    config.COMPRESION = compresion
+    app = create_app(config)
+
+    respuesta = app.test_client().get('/apispec_1.json', headers={'Accept-Encoding': 'gzip'})
+
+    assert respuesta.status_code == 200
+    assert respuesta.headers.get('Content-Encoding') == ('gzip' if compresion else None)
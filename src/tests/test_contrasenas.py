@@ -0,0 +1,36 @@
+import time
+
+import pytest
+
+from services import contrasenas
+from services.contrasenas import BcryptSaturado, PoolBcrypt
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(contrasenas, 'TRABAJADORES', 1)
+    monkeypatch.setattr(contrasenas, 'MAXIMO_PENDIENTES', 1)
+    pool = PoolBcrypt()
+    yield pool
+    pool._ejecutor.shutdown(wait=True, cancel_futures=True)
+
+
+def test_espera_vencida_responde_saturado_y_el_calculo_sigue_contando(pool, monkeypatch):
+    # El primer calculo arranca el proceso del pool
+    assert pool.ejecutar(abs, -1) == 1
+    monkeypatch.setattr(contrasenas, 'SEGUNDOS_DE_ESPERA', 0.2)
+
+    with pytest.raises(BcryptSaturado):
+        pool.ejecutar(time.sleep, 1)
+
+    # Mientras el proceso siga ocupado el calculo cuenta como pendiente
+    assert pool.pendientes() == 1
+    with pytest.raises(BcryptSaturado):
+        pool.ejecutar(abs, -2)
+
+    limite = time.monotonic() + 10
+    while pool.pendientes() and time.monotonic() < limite:
+        time.sleep(0.05)
+    assert pool.pendientes() == 0
+    assert pool.ejecutar(abs, -3) == 3
+
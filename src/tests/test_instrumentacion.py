@@ -0,0 +1,24 @@
+import pytest
+from flask import g
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from models import db
+from services.instrumentacion import ConsultasPeticion
+
+
+def test_sentencia_fallida_no_deja_inicio_en_la_conexion(app):
+    with app.test_request_context():
+        g._consultas = ConsultasPeticion()
+
+        with pytest.raises(OperationalError):
+            db.session.execute(text('SELECT * FROM tabla_inexistente'))
+        db.session.rollback()
+
+        # Con SQLite en memoria el pool devuelve la misma conexion
+        conexion = db.session.connection()
+        db.session.execute(text('SELECT 1'))
+
+        assert not conexion.info.get('inicio_consulta')
+        assert g._consultas.cantidad == 1
+        assert 0 <= g._consultas.segundos < 1
@@ -0,0 +1,22 @@
+from sqlalchemy import create_engine, inspect
+
+import migraciones
+
+
+def test_base_nueva_queda_igual_a_los_modelos():
+    engine = create_engine('sqlite://')
+
+    aplicadas = migraciones.aplicar(engine)
+
+    assert aplicadas == [nombre for _, nombre in migraciones.migraciones()]
+    assert migraciones.diferencias(engine) == []
+    assert migraciones.aplicar(engine) == []
+
+
+def test_revertir_todo_deja_solo_schema_version():
+    engine = create_engine('sqlite://')
+    migraciones.aplicar(engine)
+
+    migraciones.revertir(engine, 0)
+
+    assert inspect(engine).get_table_names() == ['schema_version']
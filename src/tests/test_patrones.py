@@ -0,0 +1,201 @@
+import random
+
+import pytest
+from werkzeug.datastructures import MultiDict
+
+from models import db, Calzado, Cuadrante, DetalleSuela, FormaGeometrica, PatronBit, Suela
+from services import patrones
+from services.busqueda import CUADRANTES, filtrar_busqueda, leer_criterios_busqueda
+
+
+def ids_por_nombre(modelo, clave):
+    return {fila.nombre: getattr(fila, clave) for fila in modelo.query.all()}
+
+
+def crear_calzado():
+    calzado = Calzado(talle='40', tipo_registro='indubitada_proveedor')
+    db.session.add(calzado)
+    db.session.commit()
+    return calzado.id_calzado
+
+
+def crear_suela(client, id_calzado, pares):
+    respuesta = client.post('/suelas/', json={
+        'id_calzado': id_calzado,
+        'detalles': [{'id_cuadrante': c, 'id_forma': f} for c, f in pares],
+    })
+    assert respuesta.status_code == 201, respuesta.get_json()
+    return respuesta.get_json()['suela']['id_suela']
+
+
+def bits_asignados():
+    return {(p.id_cuadrante, p.id_forma): p.bit for p in PatronBit.query.all()}
+
+
+def buscar_con_join(criterios):
+    # La busqueda por figuras anterior a patron_bits: un JOIN con DetalleSuela por cuadrante
+    query = db.session.query(Calzado.id_calzado)
+    for param, cuadrante_nombre in CUADRANTES.items():
+        figuras = criterios[param]
+        if figuras:
+            formas_ids = [f.id_forma for f in FormaGeometrica.query.filter(FormaGeometrica.nombre.in_(figuras))]
+            if len(formas_ids) != len(figuras):
+                continue
+            subquery = db.session.query(Calzado.id_calzado)\
+                .join(Suela, Calzado.id_calzado == Suela.id_calzado)\
+                .join(DetalleSuela, Suela.id_suela == DetalleSuela.id_suela)\
+                .filter(
+                    DetalleSuela.cuadrante.has(Cuadrante.nombre == cuadrante_nombre),
+                    DetalleSuela.id_forma.in_(formas_ids)
+                )
+            query = query.filter(Calzado.id_calzado.in_(subquery))
+    return {id_calzado for (id_calzado,) in query}
+
+
+def buscar_con_patron(criterios):
+    query = filtrar_busqueda(db.session.query(Calzado.id_calzado), criterios)
+    return {id_calzado for (id_calzado,) in query}
+
+
+def test_crear_forma_no_reserva_bits(client, contexto):
+    respuesta = client.post('/formas/', json={'nombre': 'Estrella'})
+
+    assert respuesta.status_code == 201
+    assert PatronBit.query.count() == 0
+
+
+def test_bits_se_asignan_al_usar_el_par(client, contexto):
+    cuadrantes = ids_por_nombre(Cuadrante, 'id_cuadrante')
+    formas = ids_por_nombre(FormaGeometrica, 'id_forma')
+    central, logo, texto = cuadrantes['Cuadrante Central'], formas['Logo'], formas['Texto']
+
+    id_suela = crear_suela(client, crear_calzado(), [(central, logo), (central, texto)])
+
+    bits = bits_asignados()
+    assert set(bits) == {(central, logo), (central, texto)}
+    assert sorted(bits.values()) == [0, 1]
+    assert db.session.get(Suela, id_suela).patron_bits == 0b11
+
+
+def test_olvidar_forma_libera_bits(client, contexto):
+    cuadrantes = ids_por_nombre(Cuadrante, 'id_cuadrante')
+    formas = ids_por_nombre(FormaGeometrica, 'id_forma')
+    central = cuadrantes['Cuadrante Central']
+    id_estrella = client.post('/formas/', json={'nombre': 'Estrella'}).get_json()['forma']['id_forma']
+
+    patrones.asignar_bits([(central, id_estrella), (central, formas['Logo'])])
+    db.session.commit()
+    bit_estrella = bits_asignados()[(central, id_estrella)]
+
+    assert client.delete(f'/formas/{id_estrella}').status_code == 200
+    crear_suela(client, crear_calzado(), [(central, formas['Texto'])])
+
+    assert bits_asignados()[(central, formas['Texto'])] == bit_estrella
+
+
+def test_bits_se_publican_al_confirmar(contexto):
+    cuadrantes = ids_por_nombre(Cuadrante, 'id_cuadrante')
+    formas = ids_por_nombre(FormaGeometrica, 'id_forma')
+    par = (cuadrantes['Cuadrante Central'], formas['Logo'])
+
+    # Como en una carga de suela: la transaccion ya escribio algo antes de asignar
+    db.session.add(Calzado(talle='40', tipo_registro='dubitada'))
+    db.session.flush()
+    assert patrones.asignar_bits([par]) == {par: 0}
+    assert par not in patrones._bits
+    db.session.rollback()
+
+    # Deshecha la transaccion el bit no quedo en el mapa y se vuelve a asignar
+    assert par not in patrones._bits
+    assert PatronBit.query.count() == 0
+    otro = (cuadrantes['Cuadrante Central'], formas['Texto'])
+    assert patrones.asignar_bits([otro]) == {otro: 0}
+    db.session.commit()
+    assert patrones._bits == {otro: 0}
+
+
+def test_sin_bits_libres_la_suela_se_guarda_sin_bit(client, contexto, monkeypatch):
+    monkeypatch.setattr(patrones, 'CANTIDAD_MAXIMA_BITS', 2)
+    cuadrantes = ids_por_nombre(Cuadrante, 'id_cuadrante')
+    formas = ids_por_nombre(FormaGeometrica, 'id_forma')
+    central = cuadrantes['Cuadrante Central']
+    pares = [(central, formas['Círculo']), (central, formas['Logo']), (central, formas['Texto'])]
+
+    id_calzado = crear_calzado()
+    id_suela = crear_suela(client, id_calzado, pares)
+
+    bits = bits_asignados()
+    assert len(bits) == 2
+    sin_bit = [par for par in pares if par not in bits]
+    assert len(sin_bit) == 1
+    assert db.session.get(Suela, id_suela).patron_bits == 0b11
+    crear_suela(client, crear_calzado(), [pares[0]])
+
+    # El par sin bit se encuentra igual, a traves de DetalleSuela
+    nombre_forma = {v: k for k, v in formas.items()}[sin_bit[0][1]]
+    criterios = leer_criterios_busqueda(MultiDict({'figurasCentral[]': nombre_forma}))
+    assert buscar_con_patron(criterios) == {id_calzado}
+
+
+def test_par_sin_bit_que_recibe_uno_marca_las_suelas_existentes(client, contexto, monkeypatch):
+    monkeypatch.setattr(patrones, 'CANTIDAD_MAXIMA_BITS', 1)
+    cuadrantes = ids_por_nombre(Cuadrante, 'id_cuadrante')
+    formas = ids_por_nombre(FormaGeometrica, 'id_forma')
+    central = cuadrantes['Cuadrante Central']
+    id_estrella = client.post('/formas/', json={'nombre': 'Estrella'}).get_json()['forma']['id_forma']
+
+    patrones.asignar_bits([(central, id_estrella)])
+    db.session.commit()
+    id_suela = crear_suela(client, crear_calzado(), [(central, formas['Logo'])])
+    assert db.session.get(Suela, id_suela).patron_bits == 0
+
+    assert client.delete(f'/formas/{id_estrella}').status_code == 200
+    crear_suela(client, crear_calzado(), [(central, formas['Logo'])])
+
+    db.session.expire_all()
+    assert bits_asignados() == {(central, formas['Logo']): 0}
+    assert db.session.get(Suela, id_suela).patron_bits == 0b1
+
+
+@pytest.mark.parametrize('bits_disponibles', [patrones.CANTIDAD_MAXIMA_BITS, 1])
+def test_cada_cuadrante_puede_estar_en_otra_suela(client, contexto, monkeypatch, bits_disponibles):
+    monkeypatch.setattr(patrones, 'CANTIDAD_MAXIMA_BITS', bits_disponibles)
+    cuadrantes = ids_por_nombre(Cuadrante, 'id_cuadrante')
+    formas = ids_por_nombre(FormaGeometrica, 'id_forma')
+    izquierdo = cuadrantes['Cuadrante Superior Izquierdo']
+    derecho = cuadrantes['Cuadrante Superior Derecho']
+
+    id_calzado = crear_calzado()
+    crear_suela(client, id_calzado, [(izquierdo, formas['Círculo'])])
+    crear_suela(client, id_calzado, [(derecho, formas['Rombo'])])
+    crear_suela(client, crear_calzado(), [(izquierdo, formas['Círculo'])])
+
+    criterios = leer_criterios_busqueda(MultiDict([
+        ('figurasSuperiorIzquierdo[]', 'Círculo'), ('figurasSuperiorDerecho[]', 'Rombo'),
+    ]))
+    assert buscar_con_patron(criterios) == buscar_con_join(criterios) == {id_calzado}
+
+
+@pytest.mark.parametrize('bits_disponibles', [patrones.CANTIDAD_MAXIMA_BITS, 8])
+def test_busqueda_igual_al_join(client, contexto, monkeypatch, bits_disponibles):
+    # Con un bit por par o con la mayoria de los pares sin bit, filtrar_busqueda
+    # devuelve lo mismo que el JOIN. Los calzados tienen de una a tres suelas.
+    monkeypatch.setattr(patrones, 'CANTIDAD_MAXIMA_BITS', bits_disponibles)
+    azar = random.Random(7)
+    cuadrantes = ids_por_nombre(Cuadrante, 'id_cuadrante')
+    formas = ids_por_nombre(FormaGeometrica, 'id_forma')
+    pares = [(c, f) for c in cuadrantes.values() for f in formas.values()]
+
+    for _ in range(40):
+        id_calzado = crear_calzado()
+        for _ in range(azar.randint(1, 3)):
+            crear_suela(client, id_calzado, azar.sample(pares, azar.randint(1, 4)))
+
+    nombres_forma = list(formas) + ['Inexistente']
+    for _ in range(60):
+        args = MultiDict()
+        for param in azar.sample(list(CUADRANTES), azar.randint(1, 3)):
+            for figura in azar.sample(nombres_forma, azar.randint(1, 2)):
+                args.add(f'{param}[]', figura)
+        criterios = leer_criterios_busqueda(args)
+        assert buscar_con_patron(criterios) == buscar_con_join(criterios), args
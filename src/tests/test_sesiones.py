@@ -0,0 +1,99 @@
+import datetime
+
+import bcrypt
+import pytest
+
+from controllers import login_controller
+from models import db, RefreshToken, Usuario
+from services import contrasenas
+from services.sesiones import emitir_refresh
+
+
+@pytest.fixture(autouse=True)
+def sin_pool(monkeypatch):
+    # bcrypt en el mismo hilo y una clave para firmar los access tokens
+    monkeypatch.setattr(contrasenas, 'TRABAJADORES', 0)
+    monkeypatch.setattr(login_controller, 'secret_key', 'clave-de-pruebas')
+
+
+@pytest.fixture
+def usuario(contexto):
+    usuario = Usuario(
+        username='perito',
+        password_hash=bcrypt.hashpw(b'secreto', bcrypt.gensalt(4)).decode('utf-8'),
+        role='user'
+    )
+    db.session.add(usuario)
+    db.session.commit()
+    return usuario
+
+
+def iniciar_sesion(client):
+    respuesta = client.post('/auth/login', json={'username': 'perito', 'password': 'secreto'})
+    assert respuesta.status_code == 200
+    return respuesta.get_json()['refresh_token']
+
+
+def refrescar(client, refresh_token):
+    return client.post('/auth/refresh', json={'refresh_token': refresh_token})
+
+
+def test_refresh_rota_el_token(client, usuario):
+    primero = iniciar_sesion(client)
+
+    respuesta = refrescar(client, primero)
+
+    assert respuesta.status_code == 200
+    datos = respuesta.get_json()
+    assert datos['token']
+    assert datos['refresh_token'] != primero
+    assert refrescar(client, datos['refresh_token']).status_code == 200
+
+
+def test_reutilizar_un_token_revocado_corta_la_familia(client, usuario):
+    primero = iniciar_sesion(client)
+    segundo = refrescar(client, primero).get_json()['refresh_token']
+
+    reutilizado = refrescar(client, primero)
+
+    assert reutilizado.status_code == 401
+    assert reutilizado.get_json()['error'] == 'Refresh token revocado'
+    # El token que se habia emitido en la rotacion tambien queda revocado
+    assert refrescar(client, segundo).status_code == 401
+    db.session.expire_all()
+    assert RefreshToken.query.filter(RefreshToken.revocado_en.is_(None)).count() == 0
+
+
+def test_otra_sesion_del_usuario_no_se_revoca(client, usuario):
+    primero = iniciar_sesion(client)
+    otra = iniciar_sesion(client)
+    refrescar(client, primero)
+
+    assert refrescar(client, primero).status_code == 401
+    assert refrescar(client, otra).status_code == 200
+
+
+def test_token_desconocido_o_expirado(client, usuario):
+    assert refrescar(client, 'no-existe').status_code == 401
+
+    token = emitir_refresh(usuario.id)
+    RefreshToken.query.update({'expira_en': datetime.datetime(2000, 1, 1)})
+    db.session.commit()
+
+    respuesta = refrescar(client, token)
+    assert respuesta.status_code == 401
+    assert respuesta.get_json()['error'] == 'Refresh token expirado'
+
+
+def test_usuario_borrado_no_guarda_el_token_rotado(client, usuario):
+    token = iniciar_sesion(client)
+    db.session.delete(usuario)
+    db.session.commit()
+
+    respuesta = refrescar(client, token)
+
+    assert respuesta.status_code == 401
+    db.session.expire_all()
+    registros = RefreshToken.query.all()
+    assert len(registros) == 1
+    assert registros[0].revocado_en is None
@@ -0,0 +1,15 @@
+import os
+
+from app import create_app, calentar
+from models import db
+
+# Punto de entrada para el servidor de produccion: gunicorn -c gunicorn.conf.py wsgi:app
+app = create_app(os.getenv('APP_CONFIG', 'produccion'))
+
+# Con preload_app el calentamiento corre una sola vez en el proceso maestro y los
+# workers heredan los caches por copy-on-write. Las conexiones abiertas aca se
+# cierran antes del fork; cada worker abre las suyas en post_fork.
+if os.getenv('CALENTAR_AL_INICIAR', 'true').lower() in ('1', 'true', 'si', 'yes'):
+    calentar(app)
+    with app.app_context():
+        db.engine.dispose()